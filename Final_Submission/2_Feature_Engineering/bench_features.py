@@ -0,0 +1,765 @@
+"""
+Feature-engineering benchmarks.
+
+Times the feature builders on synthetic fixture lists (20-team double
+round-robin seasons, stats drawn like real PL matches) at several sizes and
+checks that each vectorized builder reproduces the per-row loop it replaced.
+The old loops are quadratic, so they only run up to ``--legacy-max`` matches.
+
+    python Final_Submission/2_Feature_Engineering/bench_features.py
+    python Final_Submission/2_Feature_Engineering/bench_features.py --sizes 380 3000 30000 --legacy-max 3000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ewma import EWMAFamily, ewma_features, ewma_grid  # noqa: E402
+from feature_store import FeatureStore  # noqa: E402
+from h2h_index import H2HIndex, h2h_features  # noqa: E402
+from history_scan import scan_features  # noqa: E402
+from league_so_far import league_so_far  # noqa: E402
+from season_rolling import ALL_SEASONS_STATS, league_average, season_rolling_features  # noqa: E402
+from standings import standings_features  # noqa: E402
+from team_long import (  # noqa: E402
+    ExtremeFamily, FormFamily, FormHistory, RollingFamily, StreakFamily, StyleFamily, extreme_result_features,
+    rolling_team_features, streak_features, style_features, to_team_long,
+)
+from team_strength import (  # noqa: E402
+    OPPONENT_TABLE_FEATURES, OpponentTableFamily, StrengthFamily, TeamStrength, opponent_table_features,
+    team_strength_features,
+)
+from windowed_stats import WindowedStatsFamily, windowed_features  # noqa: E402
+
+N_TEAMS = 20
+
+
+def make_matches(n: int, seed: int = 0) -> pd.DataFrame:
+    """``n`` matches in consecutive 380-match seasons; ``round`` keeps
+    counting across seasons so one team history spans the whole table."""
+    rng = np.random.default_rng(seed)
+    teams = np.arange(8450, 8450 + N_TEAMS)
+    fixtures = []
+    # circle method: every team once per round, 38 rounds per season
+    half = N_TEAMS // 2
+    for rnd in range(2 * (N_TEAMS - 1)):
+        order = np.concatenate([[0], np.roll(np.arange(1, N_TEAMS), rnd % (N_TEAMS - 1))])
+        for i in range(half):
+            a, b = order[i], order[-1 - i]
+            fixtures.append((rnd, a, b) if rnd < N_TEAMS - 1 else (rnd, b, a))
+    rows = []
+    season = 0
+    while len(rows) < n:
+        for rnd, h, a in fixtures:
+            rows.append((season, season * 38 + rnd, teams[h], teams[a]))
+            if len(rows) == n:
+                break
+        season += 1
+    df = pd.DataFrame(rows, columns=['season', 'round', 'homeTeamId', 'awayTeamId'])
+    df.insert(1, 'matchId', 4_800_000 + np.arange(n))
+    for side, mu in (('home', 1.55), ('away', 1.25)):
+        df[f'xG_{side}'] = np.round(rng.gamma(3.0, mu / 3.0, n), 2)
+        df[f'shots_{side}'] = rng.poisson(mu * 8, n).astype(float)
+        df[f'sot_{side}'] = np.minimum(rng.poisson(mu * 3, n), df[f'shots_{side}']).astype(float)
+        df[f'bigch_{side}'] = rng.poisson(mu * 1.6, n).astype(float)
+        df[f'corners_{side}'] = rng.poisson(5.0, n).astype(float)
+        df[f'tob_{side}'] = rng.poisson(mu * 18, n).astype(float)
+        df[f'goals_{side}_count'] = rng.poisson(mu, n)
+    return df
+
+
+def timed(fn: Callable[[], object], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(name: str, sizes: List[int], new: List[float], old: List[float], baseline: str = "per-row loop") -> None:
+    print(f"\n{name}")
+    print(f"  {'matches':>8s} {'new':>12s} {'us/match':>9s} {baseline:>13s} {'speedup':>8s}")
+    for n, t_new, t_old in zip(sizes, new, old):
+        old_s = f"{t_old * 1e3:10.1f} ms" if t_old == t_old else f"{'skipped':>13s}"
+        speed = f"{t_old / t_new:7.0f}x" if t_old == t_old else f"{'-':>8s}"
+        print(f"  {n:8d} {t_new * 1e3:9.1f} ms {t_new / n * 1e6:9.2f} {old_s} {speed}")
+
+
+def check_equal(name: str, expected: pd.DataFrame, got: pd.DataFrame, reference: str = "the per-row loop") -> None:
+    pd.testing.assert_frame_equal(expected, got[expected.columns], check_exact=True, check_dtype=False)
+    print(f"  {name}: identical to {reference}")
+
+
+# ============================================================================
+# ROLLING TEAM FEATURES (create_features.py)
+# ============================================================================
+
+def legacy_rolling_features(df: pd.DataFrame, team_col: str, prefix: str) -> pd.DataFrame:
+    # the per-row loop create_features.py used before team_long
+    df_sorted = df.sort_values('round').copy()
+    features = {}
+    for idx, row in df_sorted.iterrows():
+        team_id = row[team_col]
+        prev = df_sorted[
+            ((df_sorted['homeTeamId'] == team_id) | (df_sorted['awayTeamId'] == team_id)) &
+            (df_sorted['round'] < row['round'])
+        ].tail(5)
+        if len(prev) < 5:
+            features[idx] = dict.fromkeys(['xG_att_90', 'SoT_att_90', 'BigCh_att_90', 'Corn_att_90',
+                                           'ToB_att_90', 'xGA_def_90', 'SoT_agst_90', 'BigCh_agst_90'], np.nan)
+            continue
+        own = {k: [] for k in ('xG', 'sot', 'bigch', 'corners', 'tob')}
+        opp = {k: [] for k in ('xG', 'sot', 'bigch')}
+        for _, m in prev.iterrows():
+            s, o = ('home', 'away') if m['homeTeamId'] == team_id else ('away', 'home')
+            for k in own:
+                own[k].append(m[f'{k}_{s}'])
+            for k in opp:
+                opp[k].append(m[f'{k}_{o}'])
+        features[idx] = {
+            'xG_att_90': np.mean(own['xG']), 'SoT_att_90': np.mean(own['sot']),
+            'BigCh_att_90': np.mean(own['bigch']), 'Corn_att_90': np.mean(own['corners']),
+            'ToB_att_90': np.mean(own['tob']), 'xGA_def_90': np.mean(opp['xG']),
+            'SoT_agst_90': np.mean(opp['sot']), 'BigCh_agst_90': np.mean(opp['bigch']),
+        }
+    out = pd.DataFrame.from_dict(features, orient='index')
+    out.columns = [f'{prefix}_{c}' for c in out.columns]
+    return out
+
+
+def bench_rolling(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: rolling_team_features(df)))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = df[[]].join(legacy_rolling_features(df, 'homeTeamId', 'home'))
+            expected = expected.join(legacy_rolling_features(df, 'awayTeamId', 'away'))
+            old.append(time.perf_counter() - t0)
+            check_equal(f"rolling_team_features n={n}", expected, rolling_team_features(df))
+        else:
+            old.append(float('nan'))
+    report("rolling_team_features: 8 rolling features x 2 sides (window 5)", sizes, new, old)
+
+
+# ============================================================================
+# LEAGUE AVERAGES SO FAR (create_features.py)
+# ============================================================================
+
+LEAGUE_TOTALS = {'xG_total': ('xG_home', 'xG_away'), 'SoT_total': ('sot_home', 'sot_away'),
+                 'Corners_total': ('corners_home', 'corners_away')}
+
+
+def with_totals(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for name, (h, a) in LEAGUE_TOTALS.items():
+        df[name] = df[h] + df[a]
+    return df
+
+
+def legacy_league_avg(df: pd.DataFrame) -> pd.DataFrame:
+    # the per-row re-slice create_features.py used before league_so_far
+    out = {name: [] for name in LEAGUE_TOTALS}
+    for _, row in df.iterrows():
+        prior = df[df['round'] < row['round']]
+        for name in LEAGUE_TOTALS:
+            out[name].append(np.nan if row['round'] == 0 else prior[name].mean())
+    return pd.DataFrame({f'{k}_sofar_mean': v for k, v in out.items()}, index=df.index)
+
+
+def bench_league_avg(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = with_totals(make_matches(n))
+        new.append(timed(lambda: league_so_far(df, list(LEAGUE_TOTALS), aggs=('mean', 'std', 'count'))))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_league_avg(df)
+            old.append(time.perf_counter() - t0)
+            # per-round sums are added in a different order than one long sum
+            got = league_so_far(df, list(LEAGUE_TOTALS))
+            pd.testing.assert_frame_equal(expected, got[expected.columns], rtol=1e-12)
+            print(f"  league_so_far n={n}: matches the per-row loop (rtol 1e-12)")
+        else:
+            old.append(float('nan'))
+    report("league_so_far: mean/std/count of 3 match totals (loop: mean only)", sizes, new, old)
+
+
+# ============================================================================
+# FORM TRAJECTORY (extra_features.py)
+# ============================================================================
+
+def legacy_form(df: pd.DataFrame) -> pd.DataFrame:
+    # the per-row loop extra_features.py used before FormHistory, for the
+    # team in homeTeamId; goals are read from that team's own side
+    df = df.sort_values('round').copy()
+    rows = []
+    for _, row in df.iterrows():
+        team_id = row['homeTeamId']
+        prev = df[((df['homeTeamId'] == team_id) | (df['awayTeamId'] == team_id)) & (df['round'] < row['round'])]
+        rec = {'matchId': row['matchId']}
+        if len(prev) < 3:
+            rows.append(dict(rec, last3_points=np.nan, last3_goals=np.nan, prev5_points=np.nan,
+                             prev5_goals=np.nan, form_trend=np.nan))
+            continue
+        last3 = prev.tail(3)
+        prev5 = prev.iloc[-8:-3] if len(prev) >= 8 else (prev.iloc[:-3] if len(prev) > 3 else prev.iloc[:0])
+
+        def tally(matches):
+            points = goals = 0
+            for _, m in matches.iterrows():
+                gf, ga = ((m['goals_home_count'], m['goals_away_count']) if m['homeTeamId'] == team_id
+                          else (m['goals_away_count'], m['goals_home_count']))
+                goals += gf
+                points += 3 if gf > ga else (1 if gf == ga else 0)
+            return points, goals
+
+        l_pts, l_goals = tally(last3)
+        if len(prev5):
+            p_pts, p_goals = tally(prev5)
+            p_pts, p_goals = p_pts / len(prev5) * 3, p_goals / len(prev5) * 3
+        else:
+            p_pts = p_goals = np.nan
+        rows.append(dict(rec, last3_points=l_pts, last3_goals=l_goals, prev5_points=p_pts,
+                         prev5_goals=p_goals, form_trend=l_pts - p_pts))
+    out = pd.DataFrame(rows)
+    return out.set_index(out['matchId'].astype('int64')).drop(columns='matchId')
+
+
+def swapped(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for a, b in (('homeTeamId', 'awayTeamId'), ('goals_home_count', 'goals_away_count')):
+        out[a], out[b] = df[b], df[a]
+    return out
+
+
+def bench_form(sizes: List[int], legacy_max: int) -> None:
+    new, old, sweep = [], [], []
+    pairs = [(k1, k2) for k1 in range(2, 7) for k2 in range(3, 11)]
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: FormHistory(df).features(3, 5)))
+        hist = FormHistory(df)
+        sweep.append(timed(lambda: [hist.features(k1, k2) for k1, k2 in pairs], repeat=1))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            ref = {'home': legacy_form(df), 'away': legacy_form(swapped(df))}
+            old.append(time.perf_counter() - t0)
+            got = hist.features(3, 5).set_index(df['matchId'])
+            expected = pd.concat({side: r.add_prefix(f'{side}_') for side, r in ref.items()}, axis=1).droplevel(0, axis=1)
+            check_equal(f"FormHistory n={n}", expected.astype(float), got.loc[expected.index])
+        else:
+            old.append(float('nan'))
+    report("FormHistory: last-3 vs previous-5 form, both sides", sizes, new, old)
+    for n, t in zip(sizes, sweep):
+        print(f"  sweep of {len(pairs)} (last, prev) pairs on one history, n={n}: {t * 1e3:.1f} ms")
+
+
+# ============================================================================
+# HEAD-TO-HEAD (advanced_features.py)
+# ============================================================================
+
+def with_labels(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['Goals_total'] = df['goals_home_count'] + df['goals_away_count']
+    df['xG_total'] = df['xG_home'] + df['xG_away']
+    df['Liveliness_xG'] = df['xG_total'] + df[['xG_home', 'xG_away']].min(axis=1)
+    return df
+
+
+def legacy_h2h(df: pd.DataFrame) -> pd.DataFrame:
+    # the per-row four-way mask advanced_features.py used before H2HIndex
+    rows = []
+    for _, row in df.iterrows():
+        h, a = row['homeTeamId'], row['awayTeamId']
+        m = df[(df['round'] < row['round']) & (((df['homeTeamId'] == h) & (df['awayTeamId'] == a)) |
+                                               ((df['homeTeamId'] == a) & (df['awayTeamId'] == h)))]
+        if len(m) == 0:
+            rows.append(dict(dict.fromkeys(['h2h_avg_goals', 'h2h_avg_xG', 'h2h_avg_liveliness',
+                                            'h2h_home_win_pct', 'h2h_high_scoring_pct'], np.nan), h2h_count=0))
+            continue
+        r = m.tail(5)
+        wins = sum((x['goals_home_count'] > x['goals_away_count']) if x['homeTeamId'] == h
+                   else (x['goals_away_count'] > x['goals_home_count']) for _, x in r.iterrows())
+        rows.append({'h2h_count': len(m), 'h2h_avg_goals': r['Goals_total'].mean(),
+                     'h2h_avg_xG': r['xG_total'].mean(), 'h2h_avg_liveliness': r['Liveliness_xG'].mean(),
+                     'h2h_home_win_pct': wins / len(r), 'h2h_high_scoring_pct': (r['Goals_total'] >= 4).sum() / len(r)})
+    return pd.DataFrame(rows, index=df.index)
+
+
+def bench_h2h(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = with_labels(make_matches(n))
+        new.append(timed(lambda: h2h_features(df)))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_h2h(df)
+            old.append(time.perf_counter() - t0)
+            check_equal(f"h2h_features n={n}", expected, h2h_features(df))
+            # an index extended round by round answers the same as one built at once
+            index = H2HIndex()
+            for _, chunk in df.groupby(df['round'] // 10):
+                index.extend(chunk)
+            pd.testing.assert_frame_equal(h2h_features(df, index), h2h_features(df), check_exact=True)
+        else:
+            old.append(float('nan'))
+    report("h2h_features: pair index + bisect (6 features)", sizes, new, old)
+
+
+# ============================================================================
+# EXPONENTIALLY WEIGHTED FORM (advanced_features.py)
+# ============================================================================
+
+def legacy_weighted_form(df: pd.DataFrame, team_col: str) -> pd.DataFrame:
+    # the fixed 4-match window advanced_features.py used before EWMAState
+    weights = np.array([0.4, 0.3, 0.2, 0.1])
+    rows = []
+    for _, row in df.iterrows():
+        t = row[team_col]
+        prev = df[((df['homeTeamId'] == t) | (df['awayTeamId'] == t)) & (df['round'] < row['round'])].tail(4)
+        if len(prev) < 4:
+            rows.append([np.nan] * 3)
+            continue
+        vals = []
+        for _, m in prev.iterrows():
+            s, o = ('home', 'away') if m['homeTeamId'] == t else ('away', 'home')
+            gf, ga = m[f'goals_{s}_count'], m[f'goals_{o}_count']
+            vals.append([m[f'xG_{s}'], gf, 3 if gf > ga else (1 if gf == ga else 0)])
+        rows.append(list(np.average(np.array(vals, dtype=float), axis=0, weights=weights)))
+    return pd.DataFrame(rows, index=df.index)
+
+
+def bench_ewma(sizes: List[int], legacy_max: int) -> None:
+    new, old, grid = [], [], []
+    half_lives = [0.5, 1, 1.5, 2, 3, 4, 6, 8]
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: ewma_features(df)))
+        grid.append(timed(lambda: ewma_grid(df, half_lives), repeat=1))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            legacy_weighted_form(df, 'homeTeamId')
+            legacy_weighted_form(df, 'awayTeamId')
+            old.append(time.perf_counter() - t0)
+            # the recursion is Series.ewm(halflife, adjust=True) over each team's history
+            long = to_team_long(df, ['xG'])
+            ewm = long.groupby('teamId')['xG_for'].transform(
+                lambda x: x.ewm(halflife=2.0, adjust=True, min_periods=4).mean().shift(1))
+            ref = np.full(n, np.nan)
+            home = (long['side'] == 'home').to_numpy()
+            ref[long['row'].to_numpy()[home]] = ewm.to_numpy()[home]
+            np.testing.assert_allclose(ewma_features(df)['home_weighted_xG'].to_numpy(), ref, rtol=1e-12)
+            print(f"  ewma_features n={n}: matches Series.ewm(halflife=2, adjust=True) (rtol 1e-12)")
+        else:
+            old.append(float('nan'))
+    report("ewma_features: EWMA xG/goals/points, both sides (loop: fixed 4-match weights)", sizes, new, old)
+    for n, t in zip(sizes, grid):
+        print(f"  grid of {len(half_lives)} half-lives in one pass, n={n}: {t * 1e3:.1f} ms")
+
+
+# ============================================================================
+# STREAKS (advanced_features.py)
+# ============================================================================
+
+def legacy_streaks(df: pd.DataFrame, team_col: str) -> pd.DataFrame:
+    # the reverse walk advanced_features.py used before streak_features; every
+    # count stopped at the first non-win, so only win_streak is comparable
+    rows = []
+    for _, row in df.iterrows():
+        t = row[team_col]
+        prev = df[((df['homeTeamId'] == t) | (df['awayTeamId'] == t)) & (df['round'] < row['round'])]
+        win = 0
+        for _, m in prev.sort_values('round').iloc[::-1].iterrows():
+            s, o = ('home', 'away') if m['homeTeamId'] == t else ('away', 'home')
+            if m[f'goals_{s}_count'] <= m[f'goals_{o}_count']:
+                break
+            win += 1
+        rows.append(win)
+    return pd.DataFrame({f"{team_col[:4]}_win_streak": rows}, index=df.index)
+
+
+def bench_streaks(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: streak_features(df)))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_streaks(df, 'homeTeamId').join(legacy_streaks(df, 'awayTeamId'))
+            old.append(time.perf_counter() - t0)
+            check_equal(f"streak_features win_streak n={n}", expected, streak_features(df))
+        else:
+            old.append(float('nan'))
+    report("streak_features: run lengths of 6 predicates, both sides", sizes, new, old)
+
+
+# ============================================================================
+# TEAM STRENGTH (advanced_features.py)
+# ============================================================================
+
+def legacy_opponent_quality(df: pd.DataFrame, team_col: str) -> pd.DataFrame:
+    # the last-5-opponents table average advanced_features.py used before TeamStrength
+    rows = []
+    for _, row in df.iterrows():
+        t = row[team_col]
+        prev = df[((df['homeTeamId'] == t) | (df['awayTeamId'] == t)) & (df['round'] < row['round'])].tail(5)
+        if len(prev) == 0:
+            rows.append([np.nan] * 3)
+            continue
+        pos, pts, tough = [], [], 0
+        for _, m in prev.iterrows():
+            o = 'away' if m['homeTeamId'] == t else 'home'
+            if not pd.isna(m[f'{o}_position']):
+                pos.append(m[f'{o}_position'])
+            if not pd.isna(m[f'{o}_points_before']):
+                pts.append(m[f'{o}_points_before'])
+                if m[f'{o}_position'] <= 6:
+                    tough += 1
+        rows.append([np.mean(pos) if pos else np.nan, np.mean(pts) if pts else np.nan, tough / len(prev)])
+    side = team_col[:4]
+    return pd.DataFrame(rows, index=df.index, columns=[f'{side}_{c}' for c in OPPONENT_TABLE_FEATURES])
+
+
+def check_strength(df: pd.DataFrame, rnd: int, ridge: float = 5.0) -> None:
+    # the carried-forward normal equations give the direct sparse ridge solve
+    # on every match before ``rnd``
+    feats = team_strength_features(df, ridge=ridge)
+    prior = df[df['round'] < rnd]
+    s = TeamStrength(pd.unique(np.concatenate([df['homeTeamId'], df['awayTeamId']])))
+    x = s.design(prior['homeTeamId'], prior['awayTeamId'])
+    y = np.concatenate([prior['xG_home'], prior['xG_away']])
+    p, n = s.n_params, len(s.teams)
+    penalty = sparse.hstack([sparse.csr_matrix((p - 2, 2)), np.sqrt(ridge) * sparse.eye(p - 2)])
+    sol = lsqr(sparse.vstack([x, penalty]), np.concatenate([y, np.zeros(p - 2)]),
+               atol=1e-14, btol=1e-14, iter_lim=100_000)[0]
+    rows = df[df['round'] == rnd]
+    idx = np.array([s.index[t] for t in rows['homeTeamId']])
+    np.testing.assert_allclose(feats.loc[rows.index, 'home_att_strength'], sol[2 + idx], atol=1e-8)
+    np.testing.assert_allclose(feats.loc[rows.index, 'home_def_strength'], sol[2 + n + idx], atol=1e-8)
+    print(f"  team_strength_features n={len(df)}: round {rnd} matches a direct sparse lsqr solve")
+
+
+def bench_strength(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: team_strength_features(df)))
+        if n <= legacy_max:
+            df = df.join(standings_features(df))
+            t0 = time.perf_counter()
+            expected = legacy_opponent_quality(df, 'homeTeamId').join(legacy_opponent_quality(df, 'awayTeamId'))
+            old.append(time.perf_counter() - t0)
+            check_strength(df, int(df['round'].max()))
+            check_equal(f"opponent_table_features n={n}", expected, opponent_table_features(df))
+        else:
+            old.append(float('nan'))
+    report("team_strength_features: per-round ridge fit, both sides (loop: last-5 opponent table)", sizes, new, old)
+
+
+# ============================================================================
+# WINDOWED VARIANCE (advanced_features.py)
+# ============================================================================
+
+def legacy_variance(df: pd.DataFrame, team_col: str) -> pd.DataFrame:
+    # the per-row slice + np.std advanced_features.py used before WindowedStats
+    rows = []
+    for _, row in df.iterrows():
+        t = row[team_col]
+        prev = df[((df['homeTeamId'] == t) | (df['awayTeamId'] == t)) & (df['round'] < row['round'])].tail(5)
+        if len(prev) < 3:
+            rows.append([np.nan] * 4)
+            continue
+        vals = []
+        for _, m in prev.iterrows():
+            s, o = ('home', 'away') if m['homeTeamId'] == t else ('away', 'home')
+            gf, ga = m[f'goals_{s}_count'], m[f'goals_{o}_count']
+            vals.append([m[f'xG_{s}'], gf, m[f'xG_{o}'], 3 if gf > ga else (1 if gf == ga else 0)])
+        rows.append(list(np.std(np.array(vals, dtype=float), axis=0)))
+    prefix = team_col[:4]
+    names = ['xG_variance', 'goals_variance', 'xGA_variance', 'result_consistency']
+    return pd.DataFrame(rows, index=df.index, columns=[f'{prefix}_{c}' for c in names])
+
+
+def bench_variance(sizes: List[int], legacy_max: int) -> None:
+    new, old, every = [], [], []
+    aggs = {f'xG_{agg}': ('xG', agg) for agg in ('mean', 'var', 'std', 'min', 'max', 'cv')}
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: windowed_features(df)))
+        every.append(timed(lambda: windowed_features(df, aggs), repeat=1))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_variance(df, 'homeTeamId').join(legacy_variance(df, 'awayTeamId'))
+            old.append(time.perf_counter() - t0)
+            got = windowed_features(df)[expected.columns]
+            np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+            print(f"  windowed_features n={n}: matches the per-row np.std loop (rtol 1e-9)")
+            # min / max / mean over the window agree with a plain rolling window
+            long = to_team_long(df, ['xG'])
+            ref = long.groupby('teamId')['xG_for'].transform(lambda x: x.rolling(5, min_periods=3).max().shift(1))
+            home = (long['side'] == 'home').to_numpy()
+            want = np.full(n, np.nan)
+            want[long['row'].to_numpy()[home]] = ref.to_numpy()[home]
+            np.testing.assert_array_equal(windowed_features(df, aggs)['home_xG_max'].to_numpy(), want)
+        else:
+            old.append(float('nan'))
+    report("windowed_features: Welford std of xG/goals/xGA/points, both sides", sizes, new, old)
+    for n, t in zip(sizes, every):
+        print(f"  mean/var/std/min/max/cv of xG, n={n}: {t * 1e3:.1f} ms")
+
+
+# ============================================================================
+# POINT-IN-TIME STORE (train_and_save_model.py / app.py)
+# ============================================================================
+
+def with_kickoffs(df: pd.DataFrame) -> pd.DataFrame:
+    # weekly rounds, matches of a round spread over the day
+    df = df.copy()
+    df['matchTimeUTC'] = (pd.Timestamp('2000-08-01', tz='UTC') + pd.to_timedelta(df['round'] * 7, unit='D')
+                          + pd.to_timedelta(df.index % 10, unit='h'))
+    return df
+
+
+def bench_store(sizes: List[int], legacy_max: int) -> None:
+    build, lookup = [], []
+    for n in sizes:
+        df = with_kickoffs(make_matches(n))
+        build.append(timed(lambda: FeatureStore.from_matches(df), repeat=1))
+        store = FeatureStore.from_matches(df)
+        lookup.append(timed(lambda: store.lookup_many(df['homeTeamId'], df['matchTimeUTC'])))
+        if n <= legacy_max:
+            # features as of kick-off are the pre-match features of that match
+            got = store.lookup_many(df['homeTeamId'], df['matchTimeUTC']).add_prefix('home_')
+            got.index = df.index
+            expected = rolling_team_features(df)[[f'home_{f}' for f in ('xG_att_90', 'SoT_agst_90')]]
+            check_equal(f"FeatureStore.lookup_many n={n}", expected, got, "rolling_team_features")
+    print("\nFeatureStore: snapshots after every match, as-of lookups")
+    for n, b, q in zip(sizes, build, lookup):
+        print(f"  {n:8d} matches: build {b * 1e3:8.1f} ms, {n} lookups {q * 1e3:7.1f} ms ({q / n * 1e6:.2f} us each)")
+
+
+# ============================================================================
+# STYLE / EXTREME RESULTS (advanced_features.py)
+# ============================================================================
+
+def legacy_style_extremes(df: pd.DataFrame, team_col: str) -> pd.DataFrame:
+    # the two per-row slices advanced_features.py used before the team-long sums
+    rows = []
+    for _, row in df.iterrows():
+        t = row[team_col]
+        prev = df[((df['homeTeamId'] == t) | (df['awayTeamId'] == t)) & (df['round'] < row['round'])]
+        out = [np.nan] * 6
+        if len(prev):
+            shots = xg = bigch = goals = 0
+            for _, m in prev.tail(5).iterrows():
+                s = 'home' if m['homeTeamId'] == t else 'away'
+                shots += m[f'shots_{s}']
+                xg += m[f'xG_{s}']
+                bigch += m[f'bigch_{s}']
+                goals += m[f'goals_{s}_count']
+            out[:3] = [shots / xg if xg > 0 else np.nan, goals / bigch if bigch > 0 else np.nan,
+                       goals / shots if shots > 0 else np.nan]
+        last = prev.tail(10)
+        if len(last) >= 3:
+            diff = (last['goals_home_count'] - last['goals_away_count']).abs()
+            total = last['goals_home_count'] + last['goals_away_count']
+            out[3:] = [(diff >= 3).sum() / len(last), (diff <= 1).sum() / len(last), (total >= 4).sum() / len(last)]
+        rows.append(out)
+    prefix = team_col[:4]
+    names = ['shots_per_xG', 'bigch_conversion', 'shot_efficiency', 'blowout_rate', 'close_game_rate',
+             'high_scoring_rate']
+    return pd.DataFrame(rows, index=df.index, columns=[f'{prefix}_{c}' for c in names])
+
+
+def bench_style(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = make_matches(n)
+        new.append(timed(lambda: style_features(df).join(extreme_result_features(df))))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_style_extremes(df, 'homeTeamId').join(legacy_style_extremes(df, 'awayTeamId'))
+            old.append(time.perf_counter() - t0)
+            check_equal(f"style + extreme_result_features n={n}", expected,
+                        style_features(df).join(extreme_result_features(df)))
+        else:
+            old.append(float('nan'))
+    report("style_features + extreme_result_features: windowed sums, both sides", sizes, new, old)
+
+
+# ============================================================================
+# ALL-SEASONS ROLLING FEATURES (01_create_features_ALL_SEASONS.py)
+# ============================================================================
+
+def with_leagues(df: pd.DataFrame) -> pd.DataFrame:
+    """Two leagues (second-tier team ids +100) with three teams per season
+    "promoted" into the first: they carry their second-tier history from the
+    relegated teams' level, the teams they replace return later with only
+    that level to go on."""
+    seasons = []
+    for season, g in df.groupby('season', sort=True):
+        top = g.assign(league='PL')
+        if season:
+            swap = 8450 + (3 * season + np.arange(3)) % N_TEAMS
+            for col in ('homeTeamId', 'awayTeamId'):
+                top[col] = np.where(top[col].isin(swap), top[col] + 100, top[col])
+        second = g.assign(league='ELC', homeTeamId=g['homeTeamId'] + 100, awayTeamId=g['awayTeamId'] + 100)
+        second[ALL_SEASONS_STATS] = second[ALL_SEASONS_STATS] * 0.8
+        seasons += [top, second]
+    df = pd.concat(seasons, ignore_index=True)
+    df['season'] = df['season'].map(lambda s: f"{2000 + s}-{(s + 1) % 100:02d}")
+    return df.sort_values(['league', 'season', 'round'], kind='stable').reset_index(drop=True)
+
+
+def legacy_season_rolling(df: pd.DataFrame, carry_over: bool = True, carry_decay: float = 0.5,
+                          window: int = 5) -> pd.DataFrame:
+    # the per-row loop of 01_create_features_ALL_SEASONS.py (with carry-over)
+    df = df.copy()
+    stats = ALL_SEASONS_STATS
+    for stat in stats:
+        df[f'{stat}_rolling_home'] = np.nan
+        df[f'{stat}_rolling_away'] = np.nan
+    league_seasons = {league: sorted(g['season'].unique()) for league, g in df.groupby('league')}
+    season_end, season_avg = {}, {}
+    for (season, league), season_df in df.groupby(['season', 'league'], sort=True):
+        team_history = {}
+        seasons = league_seasons[league]
+        i = seasons.index(season)
+        prev = (league, seasons[i - 1]) if i else None
+        if carry_over and prev in season_end:
+            sources = [(season_end[key], season_avg[key]) for key in season_end
+                       if key[1] == prev[1] and key[0] != league]
+            teams = pd.unique(season_df[['homeTeamId', 'awayTeamId']].to_numpy().ravel())
+            target = season_avg[prev]
+            gone = [h for team_id, h in season_end[prev].items() if team_id not in set(teams)]
+            level = {}
+            for stat in stats:
+                values = np.array([v for h in gone for v in h[stat][-window:]], dtype=float)
+                level[stat] = np.nanmean(values) if np.isfinite(values).any() else target[stat]
+            for team_id in teams:
+                source = season_end[prev].get(team_id)
+                if source is not None:
+                    team_history[team_id] = {
+                        stat: [target[stat] + carry_decay * (v - target[stat]) for v in source[stat][-window:]]
+                        for stat in stats
+                    }
+                    continue
+                source, source_avg = next(((end[team_id], avg) for end, avg in sources if team_id in end),
+                                          (None, None))
+                if source is None:
+                    team_history[team_id] = {stat: [level[stat]] * window for stat in stats}
+                else:
+                    team_history[team_id] = {
+                        stat: [level[stat] + carry_decay * (target[stat] / source_avg[stat] if source_avg[stat] else 1.0)
+                               * (v - source_avg[stat]) for v in source[stat][-window:]]
+                        for stat in stats
+                    }
+        season_start = {team_id: len(h['xG_home']) for team_id, h in team_history.items()}
+        for idx in season_df.index:
+            row = df.loc[idx]
+            home_id, away_id = row['homeTeamId'], row['awayTeamId']
+            for team_id in (home_id, away_id):
+                if team_id not in team_history:
+                    team_history[team_id] = {stat: [] for stat in stats}
+            for stat in stats:
+                for side, team_id in (('home', home_id), ('away', away_id)):
+                    hist = team_history[team_id][stat]
+                    df.at[idx, f'{stat}_rolling_{side}'] = np.mean(hist[-window:]) if len(hist) > 0 else 0.0
+            for stat in stats:
+                base, side = stat.rsplit('_', 1)
+                other = f"{base}_{'away' if side == 'home' else 'home'}"
+                team_history[home_id][stat].append(row[stat])
+                team_history[away_id][stat].append(row[other])
+        season_end[(league, season)] = {
+            team_id: {stat: values[season_start.get(team_id, 0):] for stat, values in h.items()}
+            for team_id, h in team_history.items()
+        }
+        season_avg[(league, season)] = dict(zip(stats, league_average(season_df)))
+    return df[[c for c in df.columns if c.endswith(('_rolling_home', '_rolling_away'))]]
+
+
+def bench_season_rolling(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = with_leagues(make_matches(n))
+        new.append(timed(lambda: season_rolling_features(df)))
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_season_rolling(df)
+            old.append(time.perf_counter() - t0)
+            check_equal(f"season_rolling_features n={n}", expected, season_rolling_features(df)[0])
+            check_equal(f"season_rolling_features n={n} (no carry-over)",
+                        legacy_season_rolling(df, carry_over=False), season_rolling_features(df, carry_over=False)[0])
+        else:
+            old.append(float('nan'))
+    report("season_rolling_features: 10 stats x 2 sides, two leagues (sizes per league)", sizes, new, old)
+
+
+# ============================================================================
+# FUSED HISTORY SCAN (history_scan.py)
+# ============================================================================
+
+def separate_builders(df: pd.DataFrame) -> pd.DataFrame:
+    """The scan's families, one builder call (and one pass) each."""
+    return pd.concat([
+        windowed_features(df), ewma_features(df), team_strength_features(df), opponent_table_features(df),
+        streak_features(df), style_features(df), extreme_result_features(df), rolling_team_features(df),
+        FormHistory(df).features(3, 5),
+    ], axis=1)
+
+
+def bench_scan(sizes: List[int], legacy_max: int) -> None:
+    new, old = [], []
+    for n in sizes:
+        df = make_matches(n)
+        df = df.join(standings_features(df))
+
+        def fused() -> pd.DataFrame:
+            return scan_features(df, [
+                WindowedStatsFamily(), EWMAFamily(), StrengthFamily(), OpponentTableFamily(),
+                StreakFamily(), StyleFamily(), ExtremeFamily(), RollingFamily(), FormFamily(),
+            ])
+
+        new.append(timed(fused))
+        old.append(timed(lambda: separate_builders(df)))
+        check_equal(f"scan_features n={n}", separate_builders(df), fused(), "the separate builders")
+    report("scan_features: 9 families in one scan (baseline: one builder call each)", sizes, new, old, "builders")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[380, 3000, 30000], help="numbers of matches")
+    ap.add_argument("--legacy-max", type=int, default=3000, help="largest size the old loops run at")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("FEATURE BENCHMARKS")
+    print("=" * 80)
+    bench_rolling(args.sizes, args.legacy_max)
+    bench_league_avg(args.sizes, args.legacy_max)
+    bench_form(args.sizes, args.legacy_max)
+    bench_h2h(args.sizes, args.legacy_max)
+    bench_ewma(args.sizes, args.legacy_max)
+    bench_streaks(args.sizes, args.legacy_max)
+    bench_strength(args.sizes, args.legacy_max)
+    bench_store(args.sizes, args.legacy_max)
+    bench_variance(args.sizes, args.legacy_max)
+    bench_style(args.sizes, args.legacy_max)
+    bench_season_rolling(args.sizes, args.legacy_max)
+    bench_scan(args.sizes, args.legacy_max)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """
 Generate Labels Table from Raw FotMob JSON Files
 
-Reads from: data/24-25_PL_Data_raw/round_0/ through round_37/
+Reads from: data/24-25_PL_Data_raw/round_0/ through round_37/ (via data/match_store.py)
 Creates: tables/all_rounds.csv
 
 Generates three liveliness metrics:
@@ -10,106 +10,38 @@ Generates three liveliness metrics:
 3. Liveliness_xG: xG_total + min(xG_home, xG_away)
 """
 
-import json
 import pandas as pd
 import numpy as np
 import os
-import glob
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+from match_store import ensure_store, load_matches, validation_summary
+from raw_archive import resolve_raw_source
 
 print("="*80)
 print("CREATING LABELS TABLE FROM RAW JSON FILES")
 print("="*80)
 
 # ============================================================================
-# STEP 1: SCAN AND LOAD ALL JSON FILES
+# STEP 1: LOAD ALL MATCHES FROM THE MATCH STORE
 # ============================================================================
-print("\n[1/5] Scanning raw JSON files...")
+print("\n[1/5] Loading matches from the match store...")
 
-data_dir = 'data/24-25_PL_Data_raw/24-25_PL_Data_raw'
-all_matches = []
+# the season folder, or data/24-25_PL_Data_raw.zip if it has been repacked
+data_dir = resolve_raw_source('data/24-25_PL_Data_raw/24-25_PL_Data_raw')
+store_dir = 'data/24-25_PL_Data_store'
 
-for round_num in range(38):  # rounds 0-37
-    round_dir = os.path.join(data_dir, f'round_{round_num}')
-    
-    if not os.path.exists(round_dir):
-        print(f"  Warning: {round_dir} not found, skipping...")
-        continue
-    
-    # Get all JSON files in this round
-    json_files = glob.glob(os.path.join(round_dir, '*_matchDetails_*.json'))
-    
-    print(f"  Round {round_num}: Found {len(json_files)} matches")
-    
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                match_data = json.load(f)
-            
-            # Extract match info
-            general = match_data['general']
-            header = match_data['header']
-            stats_all = match_data['content']['stats']['Periods']['All']['stats']
-            
-            # Helper function to find stat by key
-            def get_stat(stats_list, key):
-                for category in stats_list:
-                    for stat in category['stats']:
-                        if stat['key'] == key:
-                            return stat['stats']
-                return [None, None]
-            
-            # Extract stats
-            xg = get_stat(stats_all, 'expected_goals')
-            sot = get_stat(stats_all, 'ShotsOnTarget')
-            bigch = get_stat(stats_all, 'big_chance')
-            corners = get_stat(stats_all, 'corners')
-            tob = get_stat(stats_all, 'touches_opp_box')
-            shots = get_stat(stats_all, 'total_shots')
-            
-            # Build match record
-            match = {
-                'round': int(general['matchRound']) - 1,  # Convert to 0-indexed
-                'matchId': general['matchId'],
-                'homeTeamName': general['homeTeam']['name'],
-                'awayTeamName': general['awayTeam']['name'],
-                'homeTeamId': general['homeTeam']['id'],
-                'awayTeamId': general['awayTeam']['id'],
-                'leagueName': general['leagueName'],
-                'matchTimeUTC': general['matchTimeUTC'],
-                'matchTimeUTCDate': general['matchTimeUTCDate'],
-                'finished': general['finished'],
-                'started': general['started'],
-                
-                # Scores
-                'goals_home_count': header['teams'][0]['score'],
-                'goals_away_count': header['teams'][1]['score'],
-                
-                # Stats (home, away)
-                'xG_home': float(xg[0]) if xg[0] is not None else 0.0,
-                'xG_away': float(xg[1]) if xg[1] is not None else 0.0,
-                'sot_home': int(sot[0]) if sot[0] is not None else 0,
-                'sot_away': int(sot[1]) if sot[1] is not None else 0,
-                'bigch_home': int(bigch[0]) if bigch[0] is not None else 0,
-                'bigch_away': int(bigch[1]) if bigch[1] is not None else 0,
-                'corners_home': int(corners[0]) if corners[0] is not None else 0,
-                'corners_away': int(corners[1]) if corners[1] is not None else 0,
-                'tob_home': int(tob[0]) if tob[0] is not None else 0,
-                'tob_away': int(tob[1]) if tob[1] is not None else 0,
-                'shots_home': int(shots[0]) if shots[0] is not None else 0,
-                'shots_away': int(shots[1]) if shots[1] is not None else 0,
-            }
-            
-            all_matches.append(match)
-            
-        except Exception as e:
-            print(f"    Error processing {json_file}: {e}")
-            continue
-
-print(f"\nTotal matches loaded: {len(all_matches)}")
-
-# Convert to DataFrame
-df = pd.DataFrame(all_matches)
-df = df.sort_values('round').reset_index(drop=True)
+# Parses the raw JSON once; later runs (and the other scripts) reuse the store
+ensure_store(data_dir, store_dir)
+# matches that failed the store's validation pass are quarantined and left out
+print(validation_summary(store_dir))
+df = load_matches(store_dir)
+
+for round_num, n in df.groupby('round').size().items():
+    print(f"  Round {round_num}: Found {n} matches")
+
+print(f"\nTotal matches loaded: {len(df)}")
 
 print(f"Matches by round: {df['round'].min()} to {df['round'].max()}")
 
@@ -0,0 +1,145 @@
+"""
+Exponentially weighted team form as a recursive per-team state.
+
+Each team keeps a decayed sum and a decayed weight per stat; a result
+updates both in O(1) and the form is their ratio, i.e. the weighted mean
+over the team's whole history with weight ``0.5 ** (age / half_life)``
+(``age`` in matches, 0 for the latest). Memory is arbitrarily long at
+constant cost, and the same object serves the offline build
+(``ewma_features``) and online serving (update after every result, read
+before kick-off; it pickles as plain dicts and arrays).
+
+Several half-lives are carried side by side, so a grid search over them is
+one pass over the data:
+
+    grid = ewma_grid(labels_df, half_lives=[1, 2, 4, 8])   # {half_life: features}
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from history_scan import MatchRounds, RoundFamily, scan_rounds
+from team_long import result_points
+
+EWMA_STATS = ('xG', 'goals', 'points')
+
+
+class EWMAState:
+    """Per-team exponentially weighted means of ``stats`` for each half-life.
+
+    A NaN stat leaves that stat's sums only decayed (the match still ages
+    the older ones), like ``Series.ewm(adjust=True)``.
+    """
+
+    def __init__(self, half_lives: Iterable[float] = (2.0,), stats: Sequence[str] = EWMA_STATS) -> None:
+        self.half_lives = [float(h) for h in half_lives]
+        self.stats = list(stats)
+        # (half-lives, 1) so one multiply decays every stat
+        self.decay = (0.5 ** (1.0 / np.array(self.half_lives)))[:, None]
+        self.num: Dict[Hashable, np.ndarray] = {}
+        self.den: Dict[Hashable, np.ndarray] = {}
+        self.played: Dict[Hashable, int] = {}
+
+    def update(self, team: Hashable, values: Sequence[float]) -> None:
+        """Add one match of ``team``; ``values`` in ``stats`` order."""
+        v = np.asarray(values, dtype=float)
+        seen = ~np.isnan(v)
+        num = self.num.get(team)
+        if num is None:
+            shape = (len(self.half_lives), len(self.stats))
+            num = self.num[team] = np.zeros(shape)
+            self.den[team] = np.zeros(shape)
+            self.played[team] = 0
+        den = self.den[team]
+        num *= self.decay
+        den *= self.decay
+        num += np.where(seen, v, 0.0)
+        den += seen
+        self.played[team] += 1
+
+    def add_result(self, home: Hashable, away: Hashable, home_goals: float, away_goals: float,
+                   home_xg: float = np.nan, away_xg: float = np.nan) -> None:
+        """Update both teams from one result (for the default stats)."""
+        for team, gf, ga, xg in ((home, home_goals, away_goals, home_xg), (away, away_goals, home_goals, away_xg)):
+            self.update(team, [xg, gf, result_points(gf, ga)])
+
+    def value(self, team: Hashable, min_periods: int = 1) -> np.ndarray:
+        """``(half-lives, stats)`` weighted means; NaN before ``min_periods`` matches."""
+        num = self.num.get(team)
+        if num is None or self.played[team] < min_periods:
+            return np.full((len(self.half_lives), len(self.stats)), np.nan)
+        with np.errstate(invalid='ignore'):
+            return num / self.den[team]
+
+
+class EWMAFamily(RoundFamily):
+    """``home_/away_weighted_<stat>`` from an ``EWMAState`` per group, for
+    each of ``half_lives``; ``features`` needs a single half-life, ``grid``
+    returns them all."""
+
+    def __init__(self, half_lives: Iterable[float] = (2.0,), min_periods: int = 4,
+                 home_goals: str = 'goals_home_count', away_goals: str = 'goals_away_count') -> None:
+        self.half_lives = [float(h) for h in half_lives]
+        self.min_periods = min_periods
+        self.home_goals, self.away_goals = home_goals, away_goals
+        self.columns = [f'{side}_weighted_{stat}' for side in ('home', 'away') for stat in EWMA_STATS]
+
+    def start(self, rounds: MatchRounds) -> None:
+        super().start(rounds)
+        self.out = np.full((2, rounds.n, len(self.half_lives), len(EWMA_STATS)), np.nan)
+        self.hg, self.ag = rounds.values(self.home_goals), rounds.values(self.away_goals)
+        self.hx, self.ax = rounds.values('xG_home'), rounds.values('xG_away')
+
+    def start_group(self, lo: int, hi: int) -> None:
+        self.state = EWMAState(self.half_lives)
+
+    def round(self, start: int, stop: int) -> None:
+        order, home, away, state = self.rounds.order, self.rounds.home, self.rounds.away, self.state
+        for k in range(start, stop):
+            self.out[0, order[k]] = state.value(home[k], self.min_periods)
+            self.out[1, order[k]] = state.value(away[k], self.min_periods)
+        for k in range(start, stop):
+            state.add_result(home[k], away[k], self.hg[k], self.ag[k], self.hx[k], self.ax[k])
+
+    def grid(self, index: pd.Index) -> Dict[float, pd.DataFrame]:
+        grid = {}
+        for i, h in enumerate(self.half_lives):
+            cols = {}
+            for s, side in enumerate(('home', 'away')):
+                for j, stat in enumerate(EWMA_STATS):
+                    cols[f'{side}_weighted_{stat}'] = self.out[s, :, i, j]
+            grid[h] = pd.DataFrame(cols, index=index)
+        return grid
+
+    def features(self, index: pd.Index) -> pd.DataFrame:
+        if len(self.half_lives) != 1:
+            raise ValueError("features() needs a single half-life; use grid() for several")
+        return self.grid(index)[self.half_lives[0]]
+
+
+def ewma_grid(
+    df: pd.DataFrame,
+    half_lives: Iterable[float] = (2.0,),
+    min_periods: int = 4,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> Dict[float, pd.DataFrame]:
+    """``{half_life: features}``; features are ``home_/away_weighted_xG``,
+    ``_weighted_goals`` and ``_weighted_points`` before each match, indexed
+    like ``df``.
+
+    Matches are read round by round: every match of round r sees the state
+    after all rounds < r. NaN until a team has ``min_periods`` matches.
+    ``by`` (e.g. ``['season']``) starts a fresh state per group.
+    """
+    family = EWMAFamily(half_lives, min_periods, home_goals, away_goals)
+    scan_rounds(df, [family], by)
+    return family.grid(df.index)
+
+
+def ewma_features(df: pd.DataFrame, half_life: float = 2.0, **kwargs) -> pd.DataFrame:
+    """``ewma_grid`` for a single half-life."""
+    return ewma_grid(df, [half_life], **kwargs)[float(half_life)]
@@ -0,0 +1,404 @@
+"""
+Feature registry and dependency-aware runner.
+
+Every feature group declares the columns it reads (``inputs``) and the
+columns it produces (``outputs``); a group that reads another group's
+outputs depends on it. ``build_features`` takes a list of wanted feature
+(or group) names, computes only the groups they need, runs groups whose
+dependencies are done side by side, and caches each group's output under a
+key hashed from its code (with the feature modules it calls) and the values
+of its inputs, so an unchanged group is read back instead of recomputed:
+
+    feats = build_features(labels_df, ['points_diff', 'home_win_streak'], cache_dir='feature_tables/cache')
+
+    python feature_registry.py tables/all_rounds.csv feature_tables/selected.csv \\
+        --features points_diff h2h ewma --cache feature_tables/cache --jobs 4
+    python feature_registry.py --list
+
+The base frame is one row per match with the raw per-side stats and labels
+(``tables/all_rounds.csv``). Group functions get the base columns and
+dependency outputs they declared, plus ``KEY_COLUMNS``, and return a frame
+indexed like their input.
+"""
+
+import argparse
+import hashlib
+import inspect
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+from ewma import ewma_features
+from h2h_index import H2H_FEATURES, MEETING_COLUMNS, h2h_features
+from league_so_far import league_so_far
+from standings import standings_features
+from team_long import (
+    EXTREME_INDICATORS, ROLLING_FEATURES, STREAK_PREDICATES, STYLE_FEATURES, FormHistory,
+    extreme_result_features, rolling_team_features, streak_features, style_features,
+)
+from team_strength import STRENGTH_FEATURES, team_strength_features
+from windowed_stats import CONSISTENCY_FEATURES, windowed_features
+
+KEY_COLUMNS = ['matchId', 'round', 'homeTeamId', 'awayTeamId']
+
+
+class FeatureGroup(NamedTuple):
+    name: str
+    inputs: List[str]
+    outputs: List[str]
+    compute: Callable[[pd.DataFrame], pd.DataFrame]
+
+
+REGISTRY: Dict[str, FeatureGroup] = {}
+
+
+def feature_group(name: str, inputs: Sequence[str], outputs: Sequence[str]):
+    """Register the decorated ``compute(df) -> DataFrame`` as group ``name``."""
+    def register(fn: Callable[[pd.DataFrame], pd.DataFrame]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+        if name in REGISTRY:
+            raise ValueError(f"feature group {name!r} is already registered")
+        REGISTRY[name] = FeatureGroup(name, list(inputs), list(outputs), fn)
+        return fn
+    return register
+
+
+def _sides(names: Iterable[str]) -> List[str]:
+    names = list(names)
+    return [f'{side}_{name}' for side in ('home', 'away') for name in names]
+
+
+def _stats(*stats: str) -> List[str]:
+    return [f'{stat}_{side}' for stat in stats for side in ('home', 'away')]
+
+
+GOALS = ['goals_home_count', 'goals_away_count']
+
+
+# ============================================================================
+# GROUPS
+# ============================================================================
+
+@feature_group('rolling_form', _stats('xG', 'sot', 'bigch', 'corners', 'tob'), _sides(ROLLING_FEATURES))
+def _rolling_form(df: pd.DataFrame) -> pd.DataFrame:
+    return rolling_team_features(df, window=5)
+
+
+@feature_group(
+    'composites', _sides(ROLLING_FEATURES),
+    ['TempoSum', 'SoTSum', 'AttackVsDefense', 'xG_att_sum', 'xG_att_min', 'BigCh_sum'],
+)
+def _composites(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'TempoSum': df['home_xG_att_90'] + df['away_xG_att_90'] + df['home_SoT_att_90'] + df['away_SoT_att_90'],
+        'SoTSum': df['home_SoT_att_90'] + df['away_SoT_att_90'],
+        'AttackVsDefense': (df['home_xG_att_90'] - df['away_xGA_def_90']
+                            + df['away_xG_att_90'] - df['home_xGA_def_90']),
+        'xG_att_sum': df['home_xG_att_90'] + df['away_xG_att_90'],
+        'xG_att_min': df[['home_xG_att_90', 'away_xG_att_90']].min(axis=1),
+        'BigCh_sum': df['home_BigCh_att_90'] + df['away_BigCh_att_90'],
+    }, index=df.index)
+
+
+@feature_group(
+    'league_avg', _stats('xG', 'sot', 'corners'),
+    ['LeagueAvg_xG_perMatch_sofar', 'LeagueAvg_SoT_perMatch_sofar', 'LeagueAvg_Corners_perMatch_sofar'],
+)
+def _league_avg(df: pd.DataFrame) -> pd.DataFrame:
+    totals = pd.DataFrame({
+        'round': df['round'],
+        'xG': df['xG_home'] + df['xG_away'],
+        'SoT': df['sot_home'] + df['sot_away'],
+        'Corners': df['corners_home'] + df['corners_away'],
+    })
+    avg = league_so_far(totals, ['xG', 'SoT', 'Corners'])
+    return pd.DataFrame({f'LeagueAvg_{s}_perMatch_sofar': avg[f'{s}_sofar_mean'] for s in ('xG', 'SoT', 'Corners')})
+
+
+@feature_group(
+    'standings', GOALS,
+    _sides(['points_before', 'gd_before', 'wins_before', 'position']) + ['home_home_points', 'away_away_points'],
+)
+def _standings(df: pd.DataFrame) -> pd.DataFrame:
+    return standings_features(df)
+
+
+@feature_group('form', GOALS, _sides(['last3_points', 'prev5_points', 'last3_goals', 'prev5_goals', 'form_trend']))
+def _form(df: pd.DataFrame) -> pd.DataFrame:
+    return FormHistory(df).features(last=3, prev=5)
+
+
+@feature_group(
+    'contextual',
+    _sides(['position', 'points_before', 'gd_before']) + ['home_home_points', 'away_away_points'],
+    ['position_diff', 'points_diff', 'gd_diff', 'home_strength_ratio', 'away_strength_ratio',
+     'both_top6', 'both_bottom6', 'close_positions'],
+)
+def _contextual(df: pd.DataFrame) -> pd.DataFrame:
+    # as in extra_features.py
+    out = pd.DataFrame(index=df.index)
+    out['position_diff'] = df['home_position'] - df['away_position']
+    out['points_diff'] = df['home_points_before'] - df['away_points_before']
+    out['gd_diff'] = df['home_gd_before'] - df['away_gd_before']
+    out['home_strength_ratio'] = df['home_home_points'] / (df['home_points_before'] + 1)
+    out['away_strength_ratio'] = df['away_away_points'] / (df['away_points_before'] + 1)
+    out['both_top6'] = ((df['home_position'] <= 6) & (df['away_position'] <= 6)).astype(int)
+    out['both_bottom6'] = ((df['home_position'] >= 15) & (df['away_position'] >= 15)).astype(int)
+    out['close_positions'] = (abs(out['position_diff']) <= 3).astype(int)
+    return out
+
+
+@feature_group('h2h', [c for c in MEETING_COLUMNS if c not in KEY_COLUMNS], H2H_FEATURES)
+def _h2h(df: pd.DataFrame) -> pd.DataFrame:
+    return h2h_features(df)
+
+
+@feature_group('variance', _stats('xG') + GOALS, _sides(CONSISTENCY_FEATURES))
+def _variance(df: pd.DataFrame) -> pd.DataFrame:
+    return windowed_features(df, CONSISTENCY_FEATURES, window=5, min_periods=3)
+
+
+@feature_group('ewma', _stats('xG') + GOALS, _sides(['weighted_xG', 'weighted_goals', 'weighted_points']))
+def _ewma(df: pd.DataFrame) -> pd.DataFrame:
+    return ewma_features(df, half_life=2.0, min_periods=4)
+
+
+@feature_group('streaks', _stats('xG') + GOALS, _sides(STREAK_PREDICATES))
+def _streaks(df: pd.DataFrame) -> pd.DataFrame:
+    return streak_features(df)
+
+
+@feature_group('style', _stats('shots', 'xG', 'bigch') + GOALS, _sides(STYLE_FEATURES))
+def _style(df: pd.DataFrame) -> pd.DataFrame:
+    return style_features(df, window=5)
+
+
+@feature_group('extremes', _stats('shots', 'xG') + GOALS, _sides(EXTREME_INDICATORS))
+def _extremes(df: pd.DataFrame) -> pd.DataFrame:
+    return extreme_result_features(df, window=10, min_periods=3)
+
+
+@feature_group('team_strength', _stats('xG'), _sides(STRENGTH_FEATURES))
+def _team_strength(df: pd.DataFrame) -> pd.DataFrame:
+    return team_strength_features(df, ridge=5.0)
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def producers() -> Dict[str, str]:
+    """Output column -> name of the group that produces it."""
+    out = {}
+    for group in REGISTRY.values():
+        for col in group.outputs:
+            out[col] = group.name
+    return out
+
+
+def dependencies(group: FeatureGroup) -> List[str]:
+    made_by = producers()
+    return sorted({made_by[c] for c in group.inputs if c in made_by})
+
+
+def resolve(features: Iterable[str]) -> List[str]:
+    """Groups needed for ``features`` (output columns or group names), in
+    dependency order."""
+    made_by = producers()
+    wanted = []
+    for f in features:
+        if f in REGISTRY:
+            wanted.append(f)
+        elif f in made_by:
+            wanted.append(made_by[f])
+        else:
+            raise KeyError(f"no feature group produces {f!r}")
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"feature groups form a cycle through {name!r}")
+        visiting.add(name)
+        for dep in dependencies(REGISTRY[name]):
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in wanted:
+        visit(name)
+    return order
+
+
+def _code_names(code) -> List[str]:
+    """Global names used by ``code`` and the lambdas / comprehensions in it."""
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names += _code_names(const)
+    return names
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return repr(getattr(obj, '__code__', obj))
+
+
+def code_sources(fn: Callable) -> List[str]:
+    """Source of ``fn``, of the helpers it calls in this module, and of
+    every feature module (next to this file) it reaches, directly or
+    through their own imports, so a library change invalidates the cache."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    own = inspect.getmodule(fn)
+    sources = [_source(fn)]
+    modules = {}
+    stack = [fn.__globals__[name] for name in _code_names(fn.__code__) if name in fn.__globals__]
+    while stack:
+        obj = stack.pop()
+        module = inspect.getmodule(obj)
+        path = getattr(module, '__file__', None)
+        if not path or os.path.dirname(os.path.abspath(path)) != here:
+            continue
+        if module is own:
+            if inspect.isfunction(obj) and obj is not fn and _source(obj) not in sources:
+                sources.append(_source(obj))
+                stack += [obj.__globals__[n] for n in _code_names(obj.__code__) if n in obj.__globals__]
+            continue
+        if module.__name__ not in modules:
+            modules[module.__name__] = module
+            stack += list(vars(module).values())
+    return sources + [_source(modules[name]) for name in sorted(modules)]
+
+
+def cache_key(group: FeatureGroup, frame: pd.DataFrame) -> str:
+    """Hash of the group's code (``code_sources``) and the values it would read."""
+    h = hashlib.sha1(group.name.encode())
+    for source in code_sources(group.compute):
+        h.update(source.encode())
+    h.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    h.update(','.join(frame.columns).encode())
+    return h.hexdigest()[:20]
+
+
+def _run_group(group: FeatureGroup, frame: pd.DataFrame, path: Optional[str]) -> pd.DataFrame:
+    out = group.compute(frame)
+    missing = [c for c in group.outputs if c not in out.columns]
+    if missing:
+        raise ValueError(f"feature group {group.name!r} did not produce {missing}")
+    out = out[group.outputs]
+    if path:
+        tmp = path + '.tmp'
+        out.to_parquet(tmp)
+        os.replace(tmp, path)
+    return out
+
+
+def build_features(
+    df: pd.DataFrame,
+    features: Iterable[str],
+    cache_dir: Optional[str] = None,
+    jobs: int = 1,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """``KEY_COLUMNS`` plus every requested feature column (a group name
+    means all its outputs), indexed like ``df``.
+
+    ``jobs`` > 1 runs independent groups in separate processes. With
+    ``cache_dir`` each group's output is stored as
+    ``<cache_dir>/<group>-<key>.parquet`` and reused while the key matches.
+    """
+    features = list(features)
+    order = resolve(features)
+    missing = sorted({c for name in order for c in REGISTRY[name].inputs
+                      if c not in df.columns and c not in producers()} | set(KEY_COLUMNS) - set(df.columns))
+    if missing:
+        raise KeyError(f"input columns missing from the base frame: {missing}")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    done: Dict[str, pd.DataFrame] = {}
+    pending = list(order)
+
+    def frame_for(group: FeatureGroup) -> pd.DataFrame:
+        parts = [df[KEY_COLUMNS + [c for c in group.inputs if c in df.columns and c not in KEY_COLUMNS]]]
+        for dep in dependencies(group):
+            parts.append(done[dep][[c for c in group.inputs if c in done[dep].columns]])
+        return pd.concat(parts, axis=1)
+
+    def start(group: FeatureGroup, submit):
+        frame = frame_for(group)
+        path = os.path.join(cache_dir, f'{group.name}-{cache_key(group, frame)}.parquet') if cache_dir else None
+        if path and os.path.exists(path):
+            if verbose:
+                print(f"  {group.name}: cached")
+            return pd.read_parquet(path)
+        if verbose:
+            print(f"  {group.name}: computing")
+        return submit(_run_group, group, frame, path)
+
+    if jobs <= 1:
+        for name in pending:
+            done[name] = start(REGISTRY[name], lambda fn, *a: fn(*a))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            running = {}
+            while pending or running:
+                ready = [n for n in pending if all(d in done for d in dependencies(REGISTRY[n]))]
+                for name in ready:
+                    pending.remove(name)
+                    result = start(REGISTRY[name], pool.submit)
+                    if isinstance(result, pd.DataFrame):
+                        done[name] = result
+                    else:
+                        running[result] = name
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[running.pop(future)] = future.result()
+
+    columns = []
+    for f in features:
+        for col in (REGISTRY[f].outputs if f in REGISTRY else [f]):
+            if col not in columns:
+                columns.append(col)
+    made_by = producers()
+    out = df[KEY_COLUMNS].copy()
+    cols = {col: done[made_by[col]][col].to_numpy() for col in columns}
+    return pd.concat([out, pd.DataFrame(cols, index=out.index)], axis=1)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compute selected feature groups from the base match table.")
+    ap.add_argument("base", nargs="?", default="tables/all_rounds.csv", help="one row per match (default: %(default)s)")
+    ap.add_argument("out", nargs="?", default="feature_tables/match_features_selected.csv", help="CSV to write")
+    ap.add_argument("--features", nargs="+", default=list(REGISTRY), help="feature columns or group names (default: all)")
+    ap.add_argument("--cache", default=None, help="per-group cache directory")
+    ap.add_argument("--jobs", type=int, default=1, help="groups computed at once")
+    ap.add_argument("--list", action="store_true", help="list the registered groups and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        for group in REGISTRY.values():
+            deps = dependencies(group)
+            print(f"{group.name:15s} {len(group.outputs):3d} features" + (f"  (after {', '.join(deps)})" if deps else ""))
+        return
+
+    print("=" * 80)
+    print("BUILDING SELECTED FEATURES")
+    print("=" * 80)
+    df = pd.read_csv(args.base).sort_values('round').reset_index(drop=True)
+    print(f"Groups: {', '.join(resolve(args.features))}")
+    feats = build_features(df, args.features, cache_dir=args.cache, jobs=args.jobs, verbose=True)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    feats.to_csv(args.out, index=False)
+    print(f"✓ Saved {args.out}: {len(feats)} matches, {len(feats.columns) - len(KEY_COLUMNS)} features")
+
+
+if __name__ == "__main__":
+    main()
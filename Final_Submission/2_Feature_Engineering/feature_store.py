@@ -0,0 +1,198 @@
+"""
+Point-in-time team feature store.
+
+One snapshot per (team, match): the team's rolling means, EWMA form and
+season totals *after* that match, stamped with the match's kick-off. A
+lookup returns the latest snapshot strictly before a given time, i.e. the
+team's features as they stood at kick-off, with a binary search in the
+team's own snapshots:
+
+    store = FeatureStore.from_matches(labels_df, team_key='TeamName')
+    store.save('feature_store.parquet')
+
+    store = FeatureStore.load('feature_store.parquet')
+    store.lookup('Arsenal', '2025-01-15 20:00')              # {feature: value}
+    store.fixture_features('Arsenal', 'Chelsea', kickoff)     # home_* / away_*
+    store.lookup_many(teams, kickoffs)                        # backtests
+
+Snapshots are ordered by kick-off rather than round, so postponed matches
+count when they were played. Rolling means over the last ``window``
+matches equal the ``rolling_team_features`` value of the team's next
+match.
+"""
+
+import bisect
+import os
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ewma import EWMAState
+from team_long import ROLLING_FEATURES, SIDES, history_positions, result_points, to_team_long
+
+FOTMOB_TIME_FORMAT = '%a, %b %d, %Y, %H:%M UTC'
+
+TOTALS = ['played', 'points', 'gd', 'wins']
+
+
+def snapshot_features(ewma_stats: Sequence[str] = ('xG', 'goals', 'points')) -> List[str]:
+    return list(ROLLING_FEATURES) + [f'weighted_{s}' for s in ewma_stats] + TOTALS
+
+
+def parse_kickoff(values) -> pd.Series:
+    """UTC timestamps from FotMob's ``matchTimeUTC`` text or anything
+    ``pd.to_datetime`` reads (naive times are taken as UTC)."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_localize('UTC') if values.dt.tz is None else values.dt.tz_convert('UTC')
+    times = pd.to_datetime(values, format=FOTMOB_TIME_FORMAT, utc=True, errors='coerce')
+    if times.isna().any():
+        times = pd.to_datetime(values, utc=True, format='mixed')
+    return times
+
+
+def _time_ns(value) -> int:
+    return int(parse_kickoff([value]).iloc[0].value)
+
+
+class FeatureStore:
+    """Team snapshots keyed by (team, as-of kick-off)."""
+
+    def __init__(self, snapshots: pd.DataFrame) -> None:
+        self.snapshots = snapshots.sort_values(['team', 'as_of'], kind='stable').reset_index(drop=True)
+        self.features = [c for c in self.snapshots.columns if c not in ('team', 'as_of', 'matchId')]
+        self._values = self.snapshots[self.features].to_numpy(dtype=float)
+        times = self.snapshots['as_of'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        # team -> (first row, sorted kick-off times); plain lists for bisect
+        self._teams: Dict[Hashable, tuple] = {}
+        teams = self.snapshots['team'].to_numpy()
+        bounds = np.flatnonzero(np.r_[True, teams[1:] != teams[:-1], True]) if len(teams) else [0]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            self._teams[teams[lo]] = (lo, times[lo:hi].tolist())
+
+    @classmethod
+    def from_matches(
+        cls,
+        df: pd.DataFrame,
+        team_key: str = 'TeamId',
+        time_col: str = 'matchTimeUTC',
+        window: int = 5,
+        half_life: float = 2.0,
+        home_goals: str = 'goals_home_count',
+        away_goals: str = 'goals_away_count',
+    ) -> 'FeatureStore':
+        """Snapshots after every match of ``df`` (one row per match with the
+        raw per-side stats; teams keyed by ``home<team_key>`` /
+        ``away<team_key>``)."""
+        stats = sorted({stat for stat, _ in ROLLING_FEATURES.values()} | {'goals'})
+        kickoff = parse_kickoff(df[time_col].to_numpy())
+        frame = pd.DataFrame({
+            'homeTeamId': df[f'home{team_key}'].to_numpy(),
+            'awayTeamId': df[f'away{team_key}'].to_numpy(),
+            # kick-off order, not round order
+            'round': kickoff.to_numpy(dtype='datetime64[ns]').astype(np.int64),
+            'goals_home': df[home_goals].to_numpy(dtype=float),
+            'goals_away': df[away_goals].to_numpy(dtype=float),
+        })
+        for stat in stats:
+            if stat != 'goals':
+                for side in SIDES:
+                    frame[f'{stat}_{side}'] = df[f'{stat}_{side}'].to_numpy(dtype=float)
+        long = to_team_long(frame, stats)
+        pos, _ = history_positions(long)
+        n = len(long)
+        idx = np.arange(n)
+
+        out = {}
+        # the window ending at (and including) each match, oldest first
+        for name, (stat, kind) in ROLLING_FEATURES.items():
+            values = long[f'{stat}_{kind}'].to_numpy(dtype=float)
+            lags = np.full((n, window), np.nan)
+            for k in range(window):
+                ok = pos >= k
+                lags[ok, window - 1 - k] = values[idx[ok] - k]
+            out[name] = lags.mean(axis=1)
+
+        gf = long['goals_for'].to_numpy()
+        ga = long['goals_against'].to_numpy()
+        points = result_points(gf, ga)
+        team_start = idx - pos
+        for name, v in (('points', points), ('gd', gf - ga), ('wins', (gf > ga).astype(float))):
+            cum = np.cumsum(v)
+            out[name] = cum - np.where(team_start > 0, cum[team_start - 1], 0.0)
+        out['played'] = pos + 1.0
+
+        state = EWMAState([half_life])
+        ewma = np.empty((n, len(state.stats)))
+        xg = long['xG_for'].to_numpy(dtype=float)
+        teams = long['teamId'].to_numpy()
+        for i in range(n):
+            state.update(teams[i], [xg[i], gf[i], points[i]])
+            ewma[i] = state.value(teams[i])[0]
+        for j, stat in enumerate(state.stats):
+            out[f'weighted_{stat}'] = ewma[:, j]
+
+        snaps = pd.DataFrame({
+            'team': teams,
+            'as_of': pd.to_datetime(long['round'].to_numpy(), utc=True),
+            'matchId': df['matchId'].to_numpy()[long['row'].to_numpy()],
+        })
+        for name in snapshot_features(state.stats):
+            snaps[name] = out[name]
+        return cls(snaps)
+
+    def lookup(self, team: Hashable, as_of) -> Dict[str, float]:
+        """Features of ``team`` from its last match before ``as_of`` (all NaN
+        if it has none)."""
+        i = self._row(team, _time_ns(as_of))
+        if i is None:
+            return dict.fromkeys(self.features, np.nan)
+        return dict(zip(self.features, self._values[i].tolist()))
+
+    def _row(self, team: Hashable, t: int) -> Optional[int]:
+        entry = self._teams.get(team)
+        if entry is None:
+            return None
+        lo, times = entry
+        k = bisect.bisect_left(times, t)
+        return lo + k - 1 if k else None
+
+    def fixture_features(self, home: Hashable, away: Hashable, as_of) -> Dict[str, float]:
+        """``home_<feature>`` / ``away_<feature>`` as of kick-off."""
+        out = {}
+        for side, team in (('home', home), ('away', away)):
+            out.update({f'{side}_{k}': v for k, v in self.lookup(team, as_of).items()})
+        return out
+
+    def lookup_many(self, teams: Sequence[Hashable], as_of: Sequence) -> pd.DataFrame:
+        """``lookup`` for many (team, time) pairs; one row per pair."""
+        times = parse_kickoff(as_of).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        values = np.full((len(times), len(self.features)), np.nan)
+        for k, (team, t) in enumerate(zip(teams, times)):
+            i = self._row(team, int(t))
+            if i is not None:
+                values[k] = self._values[i]
+        return pd.DataFrame(values, columns=self.features)
+
+    def latest(self, team: Hashable) -> Dict[str, float]:
+        """Features after the team's last stored match."""
+        entry = self._teams.get(team)
+        if entry is None:
+            return dict.fromkeys(self.features, np.nan)
+        lo, times = entry
+        return dict(zip(self.features, self._values[lo + len(times) - 1].tolist()))
+
+    @property
+    def teams(self) -> List[Hashable]:
+        return list(self._teams)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        self.snapshots.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeatureStore':
+        return cls(pd.read_parquet(path))
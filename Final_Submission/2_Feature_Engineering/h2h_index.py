@@ -0,0 +1,183 @@
+"""
+Head-to-head index: unordered team pair -> that pair's meetings in order.
+
+Prior meetings of two teams come from a binary search in the pair's own
+(short) history instead of a four-way mask over the whole table per match.
+The index is saved as one Parquet table of meetings and extended in place
+when new results arrive; only the pairs that got new meetings are rebuilt.
+
+    index = H2HIndex.load('feature_tables/h2h_index.parquet', key='kickoff')   # empty if missing
+    index.extend(labels_df, prune=True)       # new / corrected matches in, removed ones out
+    index.save('feature_tables/h2h_index.parquet')
+    feats = h2h_features(labels_df, index)
+
+Meetings are ordered by ``key``. The default ``round`` only orders one
+season; an index kept across runs and seasons should use a key that keeps
+counting across them, such as the kick-off time (``kickoff_key``).
+"""
+
+import bisect
+import math
+import os
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from feature_store import parse_kickoff
+
+H2H_FEATURES = [
+    'h2h_count', 'h2h_avg_goals', 'h2h_avg_xG', 'h2h_avg_liveliness',
+    'h2h_home_win_pct', 'h2h_high_scoring_pct',
+]
+
+# meeting columns kept in the index (source column names of tables/all_rounds.csv)
+MEETING_COLUMNS = [
+    'matchId', 'homeTeamId', 'awayTeamId', 'goals_home_count', 'goals_away_count',
+    'Goals_total', 'xG_total', 'Liveliness_xG',
+]
+
+
+def kickoff_key(df: pd.DataFrame, time_col: str = 'matchTimeUTC') -> np.ndarray:
+    """Kick-off times of ``df`` as int64 UTC nanoseconds: an H2H key that
+    orders meetings across seasons."""
+    return parse_kickoff(df[time_col].to_numpy()).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+def pair_key(a: Hashable, b: Hashable) -> Tuple[Hashable, Hashable]:
+    return (a, b) if a <= b else (b, a)
+
+
+class H2HIndex:
+    """Meetings per unordered team pair, sorted by ``key``."""
+
+    def __init__(self, meetings: Optional[pd.DataFrame] = None, key: str = 'round') -> None:
+        self.key = key
+        self.meetings = pd.DataFrame(columns=MEETING_COLUMNS + [key]) if meetings is None else meetings
+        # plain lists: a pair has a handful of meetings, too few for numpy to pay off
+        self._pairs: Dict[Tuple[Hashable, Hashable], Dict[str, list]] = {}
+        self._rebuild(None)
+
+    def _rebuild(self, pairs) -> None:
+        if pairs is not None:
+            for pair in pairs:
+                self._pairs.pop(pair, None)
+        m = self.meetings
+        if not len(m):
+            return
+        lo = np.minimum(m['homeTeamId'].to_numpy(), m['awayTeamId'].to_numpy())
+        hi = np.maximum(m['homeTeamId'].to_numpy(), m['awayTeamId'].to_numpy())
+        frame = m.assign(_lo=lo, _hi=hi)
+        if pairs is not None:
+            frame = frame[[pair in pairs for pair in zip(lo, hi)]]
+        frame = frame.sort_values(['_lo', '_hi', self.key], kind='stable')
+        for pair, g in frame.groupby(['_lo', '_hi'], sort=False):
+            self._pairs[pair] = {
+                'key': g[self.key].tolist(),
+                'home': g['homeTeamId'].tolist(),
+                'gh': g['goals_home_count'].astype(float).tolist(),
+                'ga': g['goals_away_count'].astype(float).tolist(),
+                'goals': g['Goals_total'].astype(float).tolist(),
+                'xg': g['xG_total'].astype(float).tolist(),
+                'live': g['Liveliness_xG'].astype(float).tolist(),
+            }
+
+    def extend(self, df: pd.DataFrame, prune: bool = False) -> int:
+        """Add (or replace, by ``matchId``) the meetings in ``df``; with
+        ``prune`` also drop meetings whose ``matchId`` is not in ``df``, so
+        the index holds exactly ``df``. Returns how many matches were new,
+        changed or dropped."""
+        cols = [c for c in MEETING_COLUMNS + [self.key] if c in df.columns]
+        new = df[cols].reindex(columns=MEETING_COLUMNS + [self.key])
+        old_ids = self.meetings['matchId']
+        dropped = self.meetings[~old_ids.isin(new['matchId'])] if prune else self.meetings.iloc[:0]
+        if len(self.meetings):
+            old = self.meetings.set_index('matchId')
+            cand = new.set_index('matchId')
+            common = cand.index.intersection(old.index)
+            same = (cand.loc[common].astype(str) == old.loc[common, cand.columns].astype(str)).all(axis=1)
+            changed = new[~new['matchId'].isin(same[same].index)]
+        else:
+            changed = new
+        if not len(changed) and not len(dropped):
+            return 0
+        touched = old_ids.isin(changed['matchId']) | old_ids.isin(dropped['matchId'])
+        # pairs to rebuild: the new meetings' and the replaced / dropped ones'
+        pairs = set()
+        for frame in (changed, self.meetings[touched]):
+            pairs |= set(zip(np.minimum(frame['homeTeamId'], frame['awayTeamId']),
+                             np.maximum(frame['homeTeamId'], frame['awayTeamId'])))
+        kept = self.meetings[~touched]
+        self.meetings = pd.concat([kept, changed], ignore_index=True) if len(kept) else changed.reset_index(drop=True)
+        self._rebuild(pairs)
+        return len(changed) + len(dropped)
+
+    def before(self, home: Hashable, away: Hashable, key) -> Tuple[Optional[Dict[str, list]], int]:
+        """``(pair history, n)``: the first ``n`` meetings are before ``key``."""
+        hist = self._pairs.get(pair_key(home, away))
+        if hist is None:
+            return None, 0
+        return hist, bisect.bisect_left(hist['key'], key)
+
+    def features(self, home: Hashable, away: Hashable, key, last: int = 5) -> Dict[str, float]:
+        """H2H features for ``home`` vs ``away`` before ``key``; averages and
+        rates over the last ``last`` meetings, ``h2h_count`` over all."""
+        hist, n = self.before(home, away, key)
+        if n == 0:
+            return dict(dict.fromkeys(H2H_FEATURES, np.nan), h2h_count=0)
+        lo = max(n - last, 0)
+        k = n - lo
+        goals = hist['goals'][lo:n]
+        wins = sum(
+            (gh > ga) if h == home else (ga > gh)
+            for h, gh, ga in zip(hist['home'][lo:n], hist['gh'][lo:n], hist['ga'][lo:n])
+        )
+        return {
+            'h2h_count': n,
+            'h2h_avg_goals': _nanmean(goals),
+            'h2h_avg_xG': _nanmean(hist['xg'][lo:n]),
+            'h2h_avg_liveliness': _nanmean(hist['live'][lo:n]),
+            'h2h_home_win_pct': wins / k,
+            'h2h_high_scoring_pct': sum(g >= 4 for g in goals) / k,
+        }
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        self.meetings.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, key: str = 'round') -> 'H2HIndex':
+        """Saved index, or an empty one if ``path`` does not exist or was
+        saved under another ``key`` (the next ``extend`` refills it)."""
+        if not os.path.exists(path):
+            return cls(key=key)
+        meetings = pd.read_parquet(path)
+        if key not in meetings.columns:
+            return cls(key=key)
+        return cls(meetings, key=key)
+
+
+def _nanmean(values: list) -> float:
+    # Series.mean: NaNs skipped, values summed in order
+    ok = [v for v in values if not math.isnan(v)]
+    return sum(ok) / len(ok) if ok else np.nan
+
+
+def h2h_features(df: pd.DataFrame, index: Optional['H2HIndex'] = None, last: int = 5) -> pd.DataFrame:
+    """H2H features for every match in ``df`` (indexed like ``df``).
+
+    ``index`` defaults to one built from ``df`` itself; each match only sees
+    meetings with a smaller ``index.key``.
+    """
+    if index is None:
+        index = H2HIndex()
+        index.extend(df)
+    home = df['homeTeamId'].to_numpy()
+    away = df['awayTeamId'].to_numpy()
+    keys = df[index.key].to_numpy()
+    rows = [index.features(h, a, k, last) for h, a, k in zip(home, away, keys)]
+    out = pd.DataFrame(rows, columns=H2H_FEATURES, index=df.index)
+    out['h2h_count'] = out['h2h_count'].astype(int)
+    return out
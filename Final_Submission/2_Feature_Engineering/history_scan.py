@@ -0,0 +1,133 @@
+"""
+One chronological scan over the match history for every feature family.
+
+``scan_features(df, families)`` puts the matches in scan order once
+(``round_groups``: the ``by`` columns, then round) and runs one loop over
+groups and rounds. Every ``RoundFamily`` in the list (standings, EWMA form,
+windowed consistency, team strength) is called in that loop: it reads each
+team's state before the round's matches, then folds the round in. Every
+``team_long.WindowFamily`` (rolling means, form trajectory, streaks, style,
+extreme results, opponent table) reads the teams' previous matches from one
+``TeamHistory`` built for the union of their stats: each team's matches in
+time order, so a window is a slice of the rows before the round.
+
+Adding a feature is one more family in the list, not another pass over the
+table:
+
+    feats = scan_features(labels_df, [StandingsFamily(), FormFamily(last=3, prev=5)])
+
+The builders (``standings_features``, ``ewma_grid``, ``streak_features``,
+...) run their family on its own, so ``scan_features`` returns exactly the
+builders' columns. Head-to-head stays on ``h2h_index``, a pair index
+persisted across runs rather than a per-team history.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from team_long import TeamHistory, WindowFamily, round_groups, team_history
+
+
+class MatchRounds:
+    """``df`` in scan order, shared by the round families of a scan.
+
+    ``order`` / ``groups`` come from ``round_groups``; ``home``, ``away``
+    and ``round_values`` are already in that order, and ``values(column)``
+    reads (once per scan) any other column as ordered floats.
+    """
+
+    def __init__(self, df: pd.DataFrame, by: Optional[List[str]] = None) -> None:
+        self.df = df
+        self.n = len(df)
+        self.order, self.groups = round_groups(df, by)
+        self.home = df['homeTeamId'].to_numpy()[self.order]
+        self.away = df['awayTeamId'].to_numpy()[self.order]
+        self.round_values = df['round'].to_numpy()[self.order]
+        self._values: Dict[str, np.ndarray] = {}
+
+    def values(self, column: str) -> np.ndarray:
+        if column not in self._values:
+            self._values[column] = self.df[column].to_numpy(dtype=float)[self.order]
+        return self._values[column]
+
+    def teams(self, lo: int, hi: int) -> np.ndarray:
+        """Teams of the matches ``lo:hi``, in order of first appearance."""
+        return pd.unique(np.concatenate([self.home[lo:hi], self.away[lo:hi]]))
+
+
+class RoundFamily:
+    """A feature family fed round by round by ``scan_features``.
+
+    ``start(rounds)`` reads the columns it needs from a ``MatchRounds`` and
+    allocates its output, ``start_group(lo, hi)`` gives it a fresh state for
+    the matches ``lo:hi`` (positions in ``rounds.order``), ``round(start,
+    stop)`` records every team's state before the round's matches and then
+    applies them, and ``features(index)`` returns ``columns``.
+    """
+
+    columns: List[str] = []
+
+    def start(self, rounds: MatchRounds) -> None:
+        self.rounds = rounds
+
+    def start_group(self, lo: int, hi: int) -> None:
+        raise NotImplementedError
+
+    def round(self, start: int, stop: int) -> None:
+        raise NotImplementedError
+
+    def features(self, index: pd.Index) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+def scan_rounds(df: pd.DataFrame, families: Sequence[RoundFamily], by: Optional[List[str]] = None) -> None:
+    """Drive ``families`` through the matches of ``df`` in one loop."""
+    rounds = MatchRounds(df, by)
+    for family in families:
+        family.start(rounds)
+    for group in rounds.groups:
+        lo, hi = group[0][0], group[-1][1]
+        for family in families:
+            family.start_group(lo, hi)
+        for start, stop in group:
+            for family in families:
+                family.round(start, stop)
+
+
+def shared_history(df: pd.DataFrame, families: Sequence[WindowFamily],
+                   by: Optional[List[str]] = None) -> TeamHistory:
+    """One ``TeamHistory`` holding the stats of every family."""
+    stats: Dict[str, Tuple[str, str]] = {}
+    for family in families:
+        for stat, columns in family.stats.items():
+            if stats.setdefault(stat, tuple(columns)) != tuple(columns):
+                raise ValueError(f"families read {stat!r} from {stats[stat]} and {tuple(columns)}")
+    return team_history(df, stats, by)
+
+
+def scan_features(df: pd.DataFrame, families: Sequence[object], by: Optional[List[str]] = None) -> pd.DataFrame:
+    """Columns of every family, in family order, indexed like ``df``.
+
+    Round families share one pass over the rounds and window families one
+    team history. ``by`` (e.g. ``['season']``) starts fresh state and
+    histories per group.
+    """
+    for family in families:
+        if not isinstance(family, (RoundFamily, WindowFamily)):
+            raise TypeError(f"{type(family).__name__} is neither a RoundFamily nor a WindowFamily")
+    columns = [col for family in families for col in family.columns]
+    duplicated = sorted({col for col in columns if columns.count(col) > 1})
+    if duplicated:
+        raise ValueError(f"families produce the same columns: {duplicated}")
+
+    round_families = [f for f in families if isinstance(f, RoundFamily)]
+    window_families = [f for f in families if isinstance(f, WindowFamily)]
+    if round_families:
+        scan_rounds(df, round_families, by)
+    history = shared_history(df, window_families, by) if window_families else None
+
+    parts = [family.features(df.index) if isinstance(family, RoundFamily) else family.features(df, history)
+             for family in families]
+    return pd.concat(parts, axis=1) if parts else pd.DataFrame(index=df.index)
@@ -0,0 +1,82 @@
+"""
+"League so far" context features from expanding per-round aggregates.
+
+A match in round r sees every match of rounds < r. Instead of re-slicing
+the table per match, each stat is reduced once per round (count, sum, sum
+of squares) and accumulated over rounds; every match of round r then reads
+the totals up to round r - 1. Any per-match column can get a companion
+feature this way:
+
+    ctx = league_so_far(df, ['xG_total', 'SoT_total'], aggs=('mean', 'std', 'count'))
+    # -> xG_total_sofar_mean, xG_total_sofar_std, xG_total_sofar_count, ...
+
+NaN stats are skipped, as ``Series.mean`` does. ``by`` (e.g.
+``['league', 'season']``) restarts the accumulation per group.
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+AGGS = ('mean', 'std', 'count')
+
+
+def league_so_far(
+    df: pd.DataFrame,
+    columns: Iterable[str],
+    aggs: Iterable[str] = ('mean',),
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``<col>_sofar_<agg>`` over all matches in earlier rounds, indexed like ``df``.
+
+    ``std`` is the sample standard deviation (ddof=1); mean and std are NaN
+    while fewer than one / two earlier values exist.
+    """
+    by = list(by or [])
+    columns = list(columns)
+    aggs = list(aggs)
+    for agg in aggs:
+        if agg not in AGGS:
+            raise ValueError(f"unknown aggregate {agg!r}; expected one of {AGGS}")
+
+    keys = by + ['round']
+    values = df[columns].astype(float)
+    # shift by a per-column constant before squaring so the variance does not
+    # lose precision to cancellation; it does not change the result
+    shift = values.apply(lambda s: s.dropna().iloc[0] if s.notna().any() else 0.0)
+    centered = values - shift
+    grouped = pd.concat([df[keys], centered, centered.pow(2).add_suffix('__sq')], axis=1).groupby(keys, sort=True)
+    per_round = pd.concat([
+        grouped[columns].count().add_suffix('__n'),
+        grouped[columns].sum(),
+        grouped[[f'{c}__sq' for c in columns]].sum(),
+    ], axis=1)
+
+    # totals up to and including each round, then moved one round later
+    if by:
+        totals = per_round.groupby(level=by, sort=False).cumsum()
+        before = totals.groupby(level=by, sort=False).shift(1).fillna(0.0)
+    else:
+        totals = per_round.cumsum()
+        before = totals.shift(1).fillna(0.0)
+
+    out = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for col in columns:
+            n = before[f'{col}__n'].to_numpy()
+            s = before[col].to_numpy()
+            q = before[f'{col}__sq'].to_numpy()
+            mean_c = np.where(n > 0, s / n, np.nan)
+            for agg in aggs:
+                if agg == 'mean':
+                    res = mean_c + shift[col]
+                elif agg == 'std':
+                    var = np.where(n > 1, (q - s * mean_c) / (n - 1), np.nan)
+                    res = np.sqrt(np.maximum(var, 0.0))
+                else:
+                    res = n
+                out[f'{col}_sofar_{agg}'] = res
+    per_round_out = pd.DataFrame(out, index=before.index).reset_index()
+    merged = df[keys].merge(per_round_out, on=keys, how='left')
+    return merged.drop(columns=keys).set_axis(df.index)
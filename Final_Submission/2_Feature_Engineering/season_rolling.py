@@ -0,0 +1,188 @@
+"""
+Rolling pre-match means for the all-seasons feature script, with team
+state carried over between seasons.
+
+For every (league, season) the team histories are one preallocated array
+(team x match index x stat) instead of a dict of Python lists per team:
+the matches of the season are scattered into it at once and each match
+reads its teams' trailing window with one gather per window length. As in
+``01_create_features_ALL_SEASONS.py`` a team's history is the stats in its
+own view (``xG_home`` = its xG, ``xG_away`` = its opponent's), matches
+count in table order, and a team with no history gets 0.0.
+
+    feats, carried = season_rolling_features(df, carry_decay=0.5)
+    df = df.join(feats)          # <stat>_rolling_home / <stat>_rolling_away
+
+Carry-over: a season starts from each team's last ``window`` matches of
+the league's previous season, shrunk toward the league average by
+``carry_decay``. Promoted teams (any team not in the league last season)
+are anchored at the level of the teams they replace, the league's bottom:
+the pooled last ``window`` matches of last season's teams that are gone.
+Their deviation from their previous league's average (when that league is
+in ``df``) is rescaled by the ratio of the two league averages before the
+decay, so a side 20% above the second tier's xG starts 10% above the
+relegated sides' level rather than at the top flight's average plus the
+raw second-tier gap. ``carried`` holds the (league, season) pairs that
+started from a carried state. Means are summed in the same order as
+``np.mean`` over the old lists, so the output is bit-identical to the
+per-row loop.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+ALL_SEASONS_STATS = [
+    'xG_home', 'xG_away', 'shots_home', 'shots_away', 'sot_home', 'sot_away',
+    'bigch_home', 'bigch_away', 'corners_home', 'corners_away',
+]
+
+
+def _opponent_view(stat: str) -> str:
+    base, side = stat.rsplit('_', 1)
+    return f"{base}_{'away' if side == 'home' else 'home'}"
+
+
+def league_average(season_df: pd.DataFrame, stats: Sequence[str] = ALL_SEASONS_STATS) -> np.ndarray:
+    """Per-match average of every stat (both sides pooled), in ``stats`` order."""
+    avg = np.empty(len(stats))
+    for j, stat in enumerate(stats):
+        base = stat.rsplit('_', 1)[0]
+        avg[j] = np.nanmean(season_df[[f'{base}_home', f'{base}_away']].to_numpy(dtype=float))
+    return avg
+
+
+def entry_level(prev_end: Dict[Hashable, np.ndarray], teams: Sequence[Hashable], prev_avg: np.ndarray) -> np.ndarray:
+    """Per-stat mean of the last matches of the teams that left the league
+    (relegated), the starting level of the teams replacing them; the league
+    average where no team left or a stat has no values."""
+    stay = set(teams)
+    gone = [end for team, end in prev_end.items() if team not in stay]
+    level = prev_avg.copy()
+    for j in range(len(level)):
+        values = np.concatenate([end[:, j] for end in gone]) if gone else np.empty(0)
+        if np.isfinite(values).any():
+            level[j] = np.nanmean(values)
+    return level
+
+
+def carried_history(
+    team: Hashable,
+    prev_end: Dict[Hashable, np.ndarray],
+    prev_avg: np.ndarray,
+    promoted_sources: List[Tuple[Dict[Hashable, np.ndarray], np.ndarray]],
+    promoted_level: np.ndarray,
+    window: int,
+    decay: float,
+) -> np.ndarray:
+    """``(matches, stats)`` seed history of one team for a new season: its
+    deviation from the league average at the end of last season, times
+    ``decay``. A promoted team's deviation from its old league's average is
+    scaled by ``prev_avg / source_avg`` and added to ``promoted_level``."""
+    source = prev_end.get(team)
+    if source is not None:
+        return prev_avg + decay * (source[-window:] - prev_avg)
+    source, source_avg = next(((end[team], avg) for end, avg in promoted_sources if team in end),
+                              (None, None))
+    if source is None:
+        return np.tile(promoted_level, (window, 1))
+    scale = np.divide(prev_avg, source_avg, out=np.ones_like(prev_avg), where=source_avg != 0)
+    return promoted_level + decay * scale * (source[-window:] - source_avg)
+
+
+def season_rolling_features(
+    df: pd.DataFrame,
+    stats: Sequence[str] = ALL_SEASONS_STATS,
+    window: int = 5,
+    carry_over: bool = True,
+    carry_decay: float = 0.5,
+) -> Tuple[pd.DataFrame, Set[Tuple[str, str]]]:
+    """``(<stat>_rolling_home / _away for every match, carried seasons)``.
+
+    ``df`` has one row per match with ``league``, ``season``,
+    ``homeTeamId`` / ``awayTeamId`` and the ``stats`` columns, sorted by
+    round within each league and season. Each mean covers the team's
+    previous ``window`` matches (fewer early on, carried seeds included).
+    """
+    stats = list(stats)
+    n, k = len(df), len(stats)
+    own = {'home': df[stats].to_numpy(dtype=float),
+           'away': df[[_opponent_view(s) for s in stats]].to_numpy(dtype=float)}
+    home_ids = df['homeTeamId'].to_numpy()
+    away_ids = df['awayTeamId'].to_numpy()
+    out = np.full((2, n, k), np.nan)
+
+    groups = df.groupby(['season', 'league'], sort=True).indices
+    league_seasons: Dict[str, List[str]] = {}
+    for season, league in sorted(groups):
+        league_seasons.setdefault(league, []).append(season)
+    season_end: Dict[Tuple[str, str], Dict[Hashable, np.ndarray]] = {}
+    season_avg: Dict[Tuple[str, str], np.ndarray] = {}
+    carried: Set[Tuple[str, str]] = set()
+
+    # seasons in order, so every league's previous season is done first
+    for season, league in sorted(groups):
+        rows = groups[(season, league)]
+        m = len(rows)
+        # one entry per (match, side) in the order the old loop appended them
+        ids = np.column_stack([home_ids[rows], away_ids[rows]]).ravel()
+        codes, teams = pd.factorize(ids)
+        n_teams = len(teams)
+
+        seeds: Dict[int, np.ndarray] = {}
+        seasons = league_seasons[league]
+        i = seasons.index(season)
+        prev: Optional[Tuple[str, str]] = (league, seasons[i - 1]) if i else None
+        if carry_over and prev in season_end:
+            promoted_sources = [(season_end[key], season_avg[key]) for key in season_end
+                                if key[1] == prev[1] and key[0] != league]
+            promoted_level = entry_level(season_end[prev], teams, season_avg[prev])
+            for t, team in enumerate(teams):
+                seeds[t] = carried_history(team, season_end[prev], season_avg[prev], promoted_sources,
+                                           promoted_level, window, carry_decay)
+            carried.add((league, season))
+        seed_len = np.zeros(n_teams, dtype=np.int64)
+        for t, seed in seeds.items():
+            seed_len[t] = len(seed)
+
+        # position of every entry in its team's history
+        played = np.bincount(codes, minlength=n_teams)
+        order = np.argsort(codes, kind='stable')
+        occurrence = np.empty(2 * m, dtype=np.int64)
+        occurrence[order] = np.arange(2 * m) - np.repeat(np.cumsum(played) - played, played)
+        pos = seed_len[codes] + occurrence
+
+        history = np.full((n_teams, int((seed_len + played).max()), k), np.nan)
+        for t, seed in seeds.items():
+            history[t, :len(seed)] = seed
+        values = np.empty((2 * m, k))
+        values[0::2] = own['home'][rows]
+        values[1::2] = own['away'][rows]
+        history[codes, pos] = values
+
+        means = np.zeros((2 * m, k))
+        length = np.minimum(pos, window)
+        stat_idx = np.arange(k)[None, :, None]
+        for size in range(1, window + 1):
+            sel = np.flatnonzero(length == size)
+            if not len(sel):
+                continue
+            lag = pos[sel, None] - size + np.arange(size)
+            # (entries, stats, size), oldest first: np.mean's summation order
+            lags = history[codes[sel, None, None], lag[:, None, :], stat_idx]
+            means[sel] = lags.mean(axis=2)
+        out[0, rows] = means[0::2]
+        out[1, rows] = means[1::2]
+
+        # only the season's own matches carry on (and define its average)
+        season_end[(league, season)] = {
+            team: history[t, seed_len[t]:seed_len[t] + played[t]][-window:] for t, team in enumerate(teams)
+        }
+        season_avg[(league, season)] = league_average(df.iloc[rows], stats)
+
+    cols = {}
+    for j, stat in enumerate(stats):
+        cols[f'{stat}_rolling_home'] = out[0, :, j]
+        cols[f'{stat}_rolling_away'] = out[1, :, j]
+    return pd.DataFrame(cols, index=df.index), carried
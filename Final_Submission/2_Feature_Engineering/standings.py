@@ -0,0 +1,201 @@
+"""
+Incremental league table.
+
+``Standings`` keeps one column per team in a small integer array and is
+updated one result at a time, so the same object serves a batch backfill
+(``standings_features``) and the live API (fed finished fixtures as they
+come in). Table positions are ranked once per round, when the round is
+opened, and then read back in O(1):
+
+    table = Standings(team_ids)
+    for rnd, matches in rounds:
+        table.open_round(rnd)               # ranks the table as it stands
+        for home, away, hg, ag in matches:
+            table.position_before(home, rnd)
+            table.add_result(home, away, hg, ag)
+
+Ranking: points, goal difference, goals scored, then the order in which
+teams were first registered (deterministic instead of arbitrary).
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from history_scan import MatchRounds, RoundFamily, scan_rounds
+
+FIELDS = (
+    'played', 'wins', 'draws', 'losses', 'points', 'gf', 'ga',
+    'home_points', 'away_points', 'home_gf', 'home_ga', 'away_gf', 'away_ga',
+)
+TIEBREAKERS = ('points', 'gd', 'gf')
+
+_F = {name: i for i, name in enumerate(FIELDS)}
+
+
+class Standings:
+    """League table keyed by any hashable team key (id or name)."""
+
+    def __init__(self, teams: Iterable[Hashable] = (), tiebreakers: Sequence[str] = TIEBREAKERS) -> None:
+        for key in tiebreakers:
+            if key not in FIELDS and key != 'gd':
+                raise ValueError(f"unknown tiebreaker {key!r}; expected 'gd' or one of {FIELDS}")
+        self.tiebreakers = tuple(tiebreakers)
+        self.index: Dict[Hashable, int] = {}
+        self.teams: List[Hashable] = []
+        self.stats = np.zeros((len(FIELDS), 0), dtype=np.int64)
+        # round -> position per team index, ranked when the round was opened
+        self._positions: Dict[Any, np.ndarray] = {}
+        for team in teams:
+            self.team_index(team)
+
+    def team_index(self, team: Hashable) -> int:
+        """Index of ``team``, registering it (all zeros) on first sight."""
+        i = self.index.get(team)
+        if i is None:
+            i = self.index[team] = len(self.teams)
+            self.teams.append(team)
+            if i >= self.stats.shape[1]:
+                grown = np.zeros((len(FIELDS), max(8, 2 * self.stats.shape[1])), dtype=np.int64)
+                grown[:, : self.stats.shape[1]] = self.stats
+                self.stats = grown
+        return i
+
+    def add_result(self, home: Hashable, away: Hashable, home_goals: int, away_goals: int) -> None:
+        h, a = self.team_index(home), self.team_index(away)
+        s = self.stats
+        s[_F['played'], [h, a]] += 1
+        s[_F['gf'], h] += home_goals
+        s[_F['ga'], h] += away_goals
+        s[_F['home_gf'], h] += home_goals
+        s[_F['home_ga'], h] += away_goals
+        s[_F['gf'], a] += away_goals
+        s[_F['ga'], a] += home_goals
+        s[_F['away_gf'], a] += away_goals
+        s[_F['away_ga'], a] += home_goals
+        if home_goals > away_goals:
+            s[_F['wins'], h] += 1
+            s[_F['losses'], a] += 1
+            s[_F['points'], h] += 3
+            s[_F['home_points'], h] += 3
+        elif home_goals < away_goals:
+            s[_F['wins'], a] += 1
+            s[_F['losses'], h] += 1
+            s[_F['points'], a] += 3
+            s[_F['away_points'], a] += 3
+        else:
+            s[_F['draws'], [h, a]] += 1
+            s[_F['points'], [h, a]] += 1
+            s[_F['home_points'], h] += 1
+            s[_F['away_points'], a] += 1
+
+    def get(self, team: Hashable, field: str) -> int:
+        i = self.team_index(team)
+        if field == 'gd':
+            return int(self.stats[_F['gf'], i] - self.stats[_F['ga'], i])
+        return int(self.stats[_F[field], i])
+
+    def _column(self, field: str) -> np.ndarray:
+        n = len(self.teams)
+        if field == 'gd':
+            return self.stats[_F['gf'], :n] - self.stats[_F['ga'], :n]
+        return self.stats[_F[field], :n]
+
+    def positions(self) -> np.ndarray:
+        """1-based table position per team index, as the table stands now."""
+        n = len(self.teams)
+        # lexsort takes the primary key last
+        keys = [np.arange(n)] + [-self._column(f) for f in reversed(self.tiebreakers)]
+        order = np.lexsort(keys)
+        pos = np.empty(n, dtype=np.int64)
+        pos[order] = np.arange(1, n + 1)
+        return pos
+
+    def open_round(self, rnd: Any) -> None:
+        """Rank the current table as the one standing before round ``rnd``."""
+        self._positions[rnd] = self.positions()
+
+    def position_before(self, team: Hashable, rnd: Any) -> float:
+        """Position of ``team`` in the table before round ``rnd`` (NaN if the
+        team was not registered when the round was opened)."""
+        pos = self._positions[rnd]
+        i = self.index.get(team)
+        return float(pos[i]) if i is not None and i < len(pos) else float('nan')
+
+    def table(self) -> pd.DataFrame:
+        """Current table, sorted by position."""
+        n = len(self.teams)
+        out = pd.DataFrame({f: self.stats[_F[f], :n] for f in FIELDS})
+        out.insert(0, 'team', self.teams)
+        out['gd'] = out['gf'] - out['ga']
+        out.insert(0, 'position', self.positions())
+        return out.sort_values('position').reset_index(drop=True)
+
+
+STANDINGS_COLUMNS = [
+    'home_points_before', 'away_points_before', 'home_gd_before', 'away_gd_before',
+    'home_wins_before', 'away_wins_before', 'home_home_points', 'away_away_points',
+    'home_position', 'away_position',
+]
+
+
+class StandingsFamily(RoundFamily):
+    """Pre-match table columns from a ``Standings`` per group."""
+
+    counts = ('points', 'gd', 'wins')
+
+    def __init__(self, home_goals: str = 'goals_home_count', away_goals: str = 'goals_away_count') -> None:
+        self.home_goals, self.away_goals = home_goals, away_goals
+        self.columns = list(STANDINGS_COLUMNS)
+
+    def start(self, rounds: MatchRounds) -> None:
+        super().start(rounds)
+        n = rounds.n
+        cols = {f'{side}_{f}_before': np.zeros(n, dtype=np.int64) for f in self.counts for side in ('home', 'away')}
+        cols['home_home_points'] = np.zeros(n, dtype=np.int64)
+        cols['away_away_points'] = np.zeros(n, dtype=np.int64)
+        cols['home_position'] = np.full(n, np.nan)
+        cols['away_position'] = np.full(n, np.nan)
+        self.cols = cols
+        self.hg, self.ag = rounds.values(self.home_goals), rounds.values(self.away_goals)
+
+    def start_group(self, lo: int, hi: int) -> None:
+        # every team of the group is in the table from round one, on zero points
+        self.table = Standings(self.rounds.teams(lo, hi))
+
+    def round(self, start: int, stop: int) -> None:
+        rounds, table, cols = self.rounds, self.table, self.cols
+        current = rounds.round_values[start]
+        table.open_round(current)
+        for k in range(start, stop):
+            h, a, row = rounds.home[k], rounds.away[k], rounds.order[k]
+            for side, team in (('home', h), ('away', a)):
+                for f in self.counts:
+                    cols[f'{side}_{f}_before'][row] = table.get(team, f)
+                cols[f'{side}_position'][row] = table.position_before(team, current)
+            cols['home_home_points'][row] = table.get(h, 'home_points')
+            cols['away_away_points'][row] = table.get(a, 'away_points')
+            table.add_result(h, a, int(self.hg[k]), int(self.ag[k]))
+
+    def features(self, index: pd.Index) -> pd.DataFrame:
+        return pd.DataFrame(self.cols, index=index)[self.columns]
+
+
+def standings_features(
+    df: pd.DataFrame,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Pre-match table columns for every match, indexed like ``df``.
+
+    ``home_/away_points_before``, ``_gd_before``, ``_wins_before``,
+    ``home_home_points``, ``away_away_points`` (the team's totals before the
+    match) and ``home_/away_position`` (table before the match's round).
+    Matches are applied round by round; ``by`` (e.g. ``['season']``) starts
+    a fresh table per group.
+    """
+    family = StandingsFamily(home_goals, away_goals)
+    scan_rounds(df, [family], by)
+    return family.features(df.index)
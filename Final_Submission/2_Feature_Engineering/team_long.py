@@ -0,0 +1,548 @@
+"""
+Team-long match table and vectorized pre-match rolling features.
+
+``to_team_long`` turns one row per match into one row per (team, match):
+the team's own stats become ``<stat>_for`` and the opponent's
+``<stat>_against``, sorted by team and round. Every "previous N matches of
+team X before round r" feature is then a shift + window over contiguous
+rows instead of a filter of the whole table per match.
+
+``rolling_team_features`` builds the ``home_*`` / ``away_*`` rolling
+features of ``create_features.py`` for both sides in one pass. Means are
+taken over the same values in the same order as ``np.mean`` over a team's
+last ``window`` matches, so the output is bit-identical to the old per-row
+loop.
+
+    feats = rolling_team_features(df)              # 8 features x 2 sides
+    feats = rolling_team_features(df, window=10)   # any window size
+
+``style_features`` and ``extreme_result_features`` are windowed sums of
+per-row stats and indicators on the same table. ``streak_features`` turns
+per-row result predicates (won, scored, kept a
+clean sheet, ...) into run lengths the same way: one pass, no per-row walk
+back through the team's matches.
+
+Every windowed builder is a ``WindowFamily`` run on a ``TeamHistory`` of
+its own stats; ``history_scan.scan_features`` runs several of them on one
+shared history.
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# feature -> (stat, "for" | "against"); stat is the <stat>_home / <stat>_away column prefix
+ROLLING_FEATURES: Dict[str, Tuple[str, str]] = {
+    'xG_att_90': ('xG', 'for'),
+    'SoT_att_90': ('sot', 'for'),
+    'BigCh_att_90': ('bigch', 'for'),
+    'Corn_att_90': ('corners', 'for'),
+    'ToB_att_90': ('tob', 'for'),
+    'xGA_def_90': ('xG', 'against'),
+    'SoT_agst_90': ('sot', 'against'),
+    'BigCh_agst_90': ('bigch', 'against'),
+}
+
+SIDES = ('home', 'away')
+
+# a match with at least this much xG counts towards the high_xG_streak
+HIGH_XG_MATCH = 1.5
+
+# streak -> predicate over a team-long table with goals_for/against and xG_for/against
+STREAK_PREDICATES: Dict[str, Callable[[pd.DataFrame], np.ndarray]] = {
+    'win_streak': lambda t: t['goals_for'] > t['goals_against'],
+    'unbeaten_streak': lambda t: t['goals_for'] >= t['goals_against'],
+    'winless_streak': lambda t: t['goals_for'] <= t['goals_against'],
+    'scoring_streak': lambda t: t['goals_for'] > 0,
+    'clean_sheet_streak': lambda t: t['goals_against'] == 0,
+    'high_xG_streak': lambda t: t['xG_for'] >= HIGH_XG_MATCH,
+}
+
+# a match with at least this many shots (both sides) counts as a high-shot game
+HIGH_SHOT_GAME = 30
+
+# rate -> indicator over a team-long table with goals_for/against and shots_for/against
+EXTREME_INDICATORS: Dict[str, Callable[[pd.DataFrame], np.ndarray]] = {
+    'blowout_rate': lambda t: (t['goals_for'] - t['goals_against']).abs() >= 3,
+    'close_game_rate': lambda t: (t['goals_for'] - t['goals_against']).abs() <= 1,
+    'high_scoring_rate': lambda t: t['goals_for'] + t['goals_against'] >= 4,
+    'goalless_rate': lambda t: (t['goals_for'] == 0) & (t['goals_against'] == 0),
+    'big_win_rate': lambda t: t['goals_for'] - t['goals_against'] >= 3,
+    'high_shot_rate': lambda t: t['shots_for'] + t['shots_against'] >= HIGH_SHOT_GAME,
+}
+
+STYLE_FEATURES = ['shots_per_xG', 'bigch_conversion', 'shot_efficiency']
+
+
+def to_team_long(df: pd.DataFrame, stats: Iterable[str], by: Optional[List[str]] = None) -> pd.DataFrame:
+    """One row per (team, match), sorted by ``by`` + team + round.
+
+    Columns: ``row`` (position of the match in ``df``), ``side``
+    ("home"/"away"), ``teamId``, ``opponentId``, ``round``, any ``by``
+    columns, and ``<stat>_for`` / ``<stat>_against`` for every stat.
+    ``by`` (e.g. ``['league', 'season']``) keeps histories separate.
+    """
+    by = list(by or [])
+    stats = list(stats)
+    n = len(df)
+    parts = []
+    for side, opp in (SIDES, SIDES[::-1]):
+        part = {
+            'row': np.arange(n),
+            'side': side,
+            'teamId': df[f'{side}TeamId'].to_numpy(),
+            'opponentId': df[f'{opp}TeamId'].to_numpy(),
+            'round': df['round'].to_numpy(),
+        }
+        for col in by:
+            part[col] = df[col].to_numpy()
+        for stat in stats:
+            part[f'{stat}_for'] = df[f'{stat}_{side}'].to_numpy()
+            part[f'{stat}_against'] = df[f'{stat}_{opp}'].to_numpy()
+        parts.append(pd.DataFrame(part))
+    long = pd.concat(parts, ignore_index=True)
+    return long.sort_values(by + ['teamId', 'round', 'side'], kind='stable').reset_index(drop=True)
+
+
+def history_positions(long: pd.DataFrame, by: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """``(pos, run_start)`` for a ``to_team_long`` table.
+
+    ``pos`` is the row's position in its team's history; ``run_start`` is
+    the first row of its (team, round) run, so two matches of one team in
+    the same round both see only earlier rounds.
+    """
+    keys = (by or []) + ['teamId']
+    n = len(long)
+    idx = np.arange(n)
+    new_team = np.ones(n, dtype=bool)
+    new_round = np.ones(n, dtype=bool)
+    if n:
+        same_team = np.ones(n - 1, dtype=bool)
+        for col in keys:
+            v = long[col].to_numpy()
+            same_team &= v[1:] == v[:-1]
+        new_team[1:] = ~same_team
+        r = long['round'].to_numpy()
+        new_round[1:] = ~same_team | (r[1:] != r[:-1])
+    team_start = np.maximum.accumulate(np.where(new_team, idx, 0))
+    run_start = np.maximum.accumulate(np.where(new_round, idx, 0))
+    return idx - team_start, run_start
+
+
+class TeamHistory(NamedTuple):
+    """A ``to_team_long`` table with its ``history_positions``, built once and
+    read by every windowed family (see ``WindowFamily``)."""
+
+    long: pd.DataFrame
+    pos: np.ndarray
+    run_start: np.ndarray
+
+
+def team_history(df: pd.DataFrame, stats: Dict[str, Tuple[str, str]], by: Optional[List[str]] = None) -> TeamHistory:
+    """``TeamHistory`` of the matches in ``df``; ``stats`` maps every stat to
+    its ``(home, away)`` columns, read as floats into ``<stat>_for`` /
+    ``<stat>_against``."""
+    frame = pd.DataFrame({
+        'homeTeamId': df['homeTeamId'].to_numpy(),
+        'awayTeamId': df['awayTeamId'].to_numpy(),
+        'round': df['round'].to_numpy(),
+    })
+    for stat, columns in stats.items():
+        for side, col in zip(SIDES, columns):
+            frame[f'{stat}_{side}'] = df[col].to_numpy(dtype=float)
+    for col in by or []:
+        frame[col] = df[col].to_numpy()
+    long = to_team_long(frame, list(stats), by=by)
+    pos, run_start = history_positions(long, by)
+    return TeamHistory(long, pos, run_start)
+
+
+def sided(*stats: str) -> Dict[str, Tuple[str, str]]:
+    """``team_history`` stats read from ``<stat>_home`` / ``<stat>_away``."""
+    return {stat: (f'{stat}_home', f'{stat}_away') for stat in stats}
+
+
+def trailing_window(values: np.ndarray, pos: np.ndarray, window: int) -> np.ndarray:
+    """``(n, window)`` matrix of the ``window`` previous values per row,
+    oldest first; NaN where the team's history is shorter."""
+    n = len(values)
+    lags = np.full((n, window), np.nan)
+    for k in range(1, window + 1):
+        ok = pos >= k
+        lags[ok, window - k] = values[np.flatnonzero(ok) - k]
+    return lags
+
+
+def shifted_rolling_mean(
+    history: TeamHistory,
+    columns: Iterable[str],
+    window: int = 5,
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """Mean of each column of ``history.long`` over the team's previous
+    ``window`` rounds.
+
+    With ``min_periods`` == ``window`` (default) a missing match or a NaN stat
+    in the window gives NaN, as the old ``np.mean`` loop did; a smaller
+    ``min_periods`` averages the non-NaN values when there are enough.
+    """
+    min_periods = window if min_periods is None else min_periods
+    long, run_start = history.long, history.run_start
+    # every row of a (team, round) run sees the history of the run's first row
+    pos = history.pos[run_start]
+    out = {}
+    for col in columns:
+        lags = trailing_window(long[col].to_numpy(dtype=float), pos, window)
+        if min_periods >= window:
+            mean = lags.mean(axis=1)
+        else:
+            valid = ~np.isnan(lags)
+            count = valid.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count >= min_periods, np.where(valid, lags, 0.0).sum(axis=1) / count, np.nan)
+        out[col] = mean[run_start]
+    return pd.DataFrame(out, index=long.index)
+
+
+def to_match_wide(long: pd.DataFrame, values: pd.DataFrame, n_matches: int, index=None) -> pd.DataFrame:
+    """Scatter per-(team, match) ``values`` back to one row per match as
+    ``home_<col>`` / ``away_<col>``."""
+    out = {}
+    rows = long['row'].to_numpy()
+    for side in SIDES:
+        mask = (long['side'] == side).to_numpy()
+        for col in values.columns:
+            arr = np.full(n_matches, np.nan)
+            arr[rows[mask]] = values[col].to_numpy()[mask]
+            out[f'{side}_{col}'] = arr
+    return pd.DataFrame(out, index=index)
+
+
+def result_points(goals_for, goals_against):
+    """3 / 1 / 0 points for a win / draw / loss, NaN where a score is
+    missing; scalars or arrays."""
+    gf = np.asarray(goals_for, dtype=float)
+    ga = np.asarray(goals_against, dtype=float)
+    points = np.where(gf > ga, 3.0, np.where(gf == ga, 1.0, 0.0))
+    return np.where(np.isnan(gf) | np.isnan(ga), np.nan, points)[()]
+
+
+def round_groups(df: pd.DataFrame, by: Optional[List[str]] = None) -> Tuple[np.ndarray, List[List[Tuple[int, int]]]]:
+    """``(order, groups)`` for builders that read every match of a round
+    before applying any of them.
+
+    ``order`` sorts the positions of ``df`` by the ``by`` columns, then
+    ``round``; each group is a list of ``(start, stop)`` slices of
+    ``order``, one per round. A fresh state starts with every group.
+    """
+    by = list(by or [])
+    n = len(df)
+    codes = [pd.factorize(df[c], sort=True)[0] for c in by]
+    # lexsort takes the primary key last
+    order = np.lexsort([df['round'].to_numpy()] + codes[::-1])
+    rounds = df['round'].to_numpy()[order]
+    new_group = np.zeros(n, dtype=bool)
+    new_round = np.zeros(n, dtype=bool)
+    if n:
+        new_group[0] = True
+        for c in codes:
+            v = c[order]
+            new_group[1:] |= v[1:] != v[:-1]
+        new_round[1:] = rounds[1:] != rounds[:-1]
+    new_round |= new_group
+    starts = np.flatnonzero(new_round).tolist()
+    groups: List[List[Tuple[int, int]]] = []
+    for start, stop in zip(starts, starts[1:] + [n]):
+        if new_group[start]:
+            groups.append([])
+        groups[-1].append((start, stop))
+    return order, groups
+
+
+class WindowFamily:
+    """A feature family read from a ``TeamHistory``.
+
+    ``stats`` maps every stat the family reads to its ``(home, away)``
+    columns and ``columns`` lists its output. ``features(df, history)``
+    returns those columns, indexed like ``df``, from any history that holds
+    at least ``stats``, so ``history_scan.scan_features`` builds one history
+    for all its families; ``frame`` runs the family on its own.
+    """
+
+    stats: Dict[str, Tuple[str, str]] = {}
+    columns: List[str] = []
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def frame(self, df: pd.DataFrame, by: Optional[List[str]] = None) -> pd.DataFrame:
+        """``features`` on a history of just this family's stats."""
+        return self.features(df, team_history(df, self.stats, by))
+
+
+def _wide(history: TeamHistory, values: Dict[str, np.ndarray], df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+    """``to_match_wide`` of per-row ``values``, columns home first."""
+    long = history.long
+    wide = to_match_wide(long, pd.DataFrame(values, index=long.index), len(df), index=df.index)
+    return wide[[f'{side}_{name}' for side in SIDES for name in names]]
+
+
+class RollingFamily(WindowFamily):
+    """Rolling means of ``rolling_team_features``."""
+
+    def __init__(self, window: int = 5, features: Optional[Dict[str, Tuple[str, str]]] = None,
+                 min_periods: Optional[int] = None) -> None:
+        self.window = window
+        self.min_periods = min_periods
+        self.definitions = features or ROLLING_FEATURES
+        self.stats = sided(*sorted({stat for stat, _ in self.definitions.values()}))
+        self.columns = [f'{side}_{name}' for side in SIDES for name in self.definitions]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        cols = {f'{stat}_{kind}' for stat, kind in self.definitions.values()}
+        means = shifted_rolling_mean(history, sorted(cols), window=self.window, min_periods=self.min_periods)
+        return _wide(history, {name: means[f'{stat}_{kind}'].to_numpy()
+                               for name, (stat, kind) in self.definitions.items()}, df, self.definitions)
+
+
+def rolling_team_features(
+    df: pd.DataFrame,
+    window: int = 5,
+    features: Optional[Dict[str, Tuple[str, str]]] = None,
+    min_periods: Optional[int] = None,
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_<feature>`` and ``away_<feature>`` rolling means for every match.
+
+    Each feature is the team's mean ``<stat>_for`` / ``<stat>_against`` over
+    its previous ``window`` matches (rounds strictly before the match's
+    round); NaN until the team has ``window`` of them. Indexed like ``df``.
+    """
+    return RollingFamily(window, features, min_periods).frame(df, by)
+
+
+class FormHistory:
+    """Per-team points / goals prefix sums for last-k vs previous-k form.
+
+    Built once; every ``features(last, prev)`` call is then a few array
+    lookups, so form definitions can be swept cheaply:
+
+        hist = FormHistory(labels_df)
+        for last, prev in [(3, 5), (5, 10), (2, 6)]:
+            feats = hist.features(last, prev)
+
+    ``history`` reuses a ``TeamHistory`` that holds goals.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        home_goals: str = 'goals_home_count',
+        away_goals: str = 'goals_away_count',
+        by: Optional[List[str]] = None,
+        history: Optional[TeamHistory] = None,
+    ) -> None:
+        if history is None:
+            history = team_history(df, {'goals': (home_goals, away_goals)}, by)
+        self.index = df.index
+        self.long = history.long
+        gf = self.long['goals_for'].to_numpy()
+        ga = self.long['goals_against'].to_numpy()
+        points = result_points(gf, ga)
+        pos, run_start = history.pos, history.run_start
+        # matches before the row's round, and the row where the team's history starts
+        self.n_prev = pos[run_start]
+        self.team_start = np.arange(len(self.long)) - pos
+        # exclusive prefix sums over the whole table: cum[i] = sum of rows < i
+        self._cum = {name: np.concatenate([[0.0], np.cumsum(v)]) for name, v in (('points', points), ('goals', gf))}
+
+    def _window(self, name: str, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+        """Sum of history entries ``start .. stop - 1`` of each row's team."""
+        cum = self._cum[name]
+        return cum[self.team_start + stop] - cum[self.team_start + start]
+
+    def features(self, last: int = 3, prev: int = 5) -> pd.DataFrame:
+        """``<side>_last<last>_points/_goals``, ``<side>_prev<prev>_points/_goals``
+        and ``<side>_form_trend`` for both sides, indexed like the input.
+
+        The last ``last`` matches are summed; the up to ``prev`` matches before
+        them are summed and rescaled to ``last`` matches. All NaN until the
+        team has ``last`` matches; prev and trend NaN while there is nothing
+        before them.
+        """
+        n = self.n_prev
+        enough = n >= last
+        m = np.clip(n - last, 0, prev)
+        out = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name in ('points', 'goals'):
+                recent = self._window(name, n - last, n)
+                before = self._window(name, n - last - m, n - last) / m * last
+                out[f'last{last}_{name}'] = np.where(enough, recent, np.nan)
+                out[f'prev{prev}_{name}'] = np.where(enough & (m > 0), before, np.nan)
+        out['form_trend'] = out[f'last{last}_points'] - out[f'prev{prev}_points']
+        values = pd.DataFrame(out, index=self.long.index)
+        return to_match_wide(self.long, values, len(self.index), index=self.index)
+
+
+class FormFamily(WindowFamily):
+    """``FormHistory(...).features(last, prev)``."""
+
+    def __init__(self, last: int = 3, prev: int = 5, home_goals: str = 'goals_home_count',
+                 away_goals: str = 'goals_away_count') -> None:
+        self.last, self.prev = last, prev
+        self.stats = {'goals': (home_goals, away_goals)}
+        names = [f'last{last}_points', f'prev{prev}_points', f'last{last}_goals', f'prev{prev}_goals', 'form_trend']
+        self.columns = [f'{side}_{name}' for side in SIDES for name in names]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        return FormHistory(df, history=history).features(self.last, self.prev)
+
+
+def form_features(df: pd.DataFrame, last: int = 3, prev: int = 5, **kwargs) -> pd.DataFrame:
+    """Shortcut for ``FormHistory(df, **kwargs).features(last, prev)``."""
+    return FormHistory(df, **kwargs).features(last, prev)
+
+
+def run_lengths(flags: np.ndarray, pos: np.ndarray, run_start: np.ndarray) -> np.ndarray:
+    """Length of the run of True ``flags`` ending just before each row's
+    round, within its team (``pos`` / ``run_start`` from ``history_positions``)."""
+    n = len(flags)
+    idx = np.arange(n)
+    team_start = idx - pos
+    # last row <= i that broke the run, or the row before the team's first
+    last_break = np.maximum(np.maximum.accumulate(np.where(flags, -1, idx)), team_start - 1)
+    through = idx - last_break
+    prev = run_start - 1
+    return np.where(pos[run_start] > 0, through[np.maximum(prev, 0)], 0)
+
+
+class StreakFamily(WindowFamily):
+    """Run lengths of ``streak_features``."""
+
+    def __init__(self, predicates: Optional[Dict[str, Callable[[pd.DataFrame], np.ndarray]]] = None,
+                 home_goals: str = 'goals_home_count', away_goals: str = 'goals_away_count') -> None:
+        self.predicates = predicates or STREAK_PREDICATES
+        self.stats = dict({'goals': (home_goals, away_goals)}, **sided('xG'))
+        self.columns = [f'{side}_{name}' for side in SIDES for name in self.predicates]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        runs = {name: run_lengths(np.asarray(pred(history.long), dtype=bool), history.pos, history.run_start)
+                for name, pred in self.predicates.items()}
+        return _wide(history, runs, df, self.predicates).astype(np.int64)
+
+
+def streak_features(
+    df: pd.DataFrame,
+    predicates: Optional[Dict[str, Callable[[pd.DataFrame], np.ndarray]]] = None,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_<name>`` / ``away_<name>`` for every predicate: how many of the
+    team's most recent matches before this round in a row satisfied it (0
+    with no history). Indexed like ``df``.
+
+    A predicate takes the team-long table (``goals_for`` / ``_against``,
+    ``xG_for`` / ``_against``, ``side``, ``opponentId``, ...) and returns one
+    bool per row, so a new streak is one more dict entry:
+
+        preds = dict(STREAK_PREDICATES, away_scoring_streak=lambda t: (t['side'] == 'away') & (t['goals_for'] > 0))
+        feats = streak_features(labels_df, preds)
+    """
+    return StreakFamily(predicates, home_goals, away_goals).frame(df, by)
+
+
+def trailing_sum(history: TeamHistory, values: Dict[str, np.ndarray],
+                 window: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """``({name: sum over the previous window}, matches in it)`` per row of
+    ``history.long``.
+
+    Sums run over the team's last ``window`` matches before the row's round
+    (fewer while its history is shorter), oldest first; a NaN inside the
+    window makes the sum NaN.
+    """
+    run_start = history.run_start
+    pos = history.pos[run_start]
+    count = np.minimum(pos, window)
+    inside = np.arange(window)[None, :] >= window - count[:, None]
+    sums = {}
+    for name, v in values.items():
+        lags = trailing_window(np.asarray(v, dtype=float), pos, window)
+        sums[name] = np.where(inside, lags, 0.0).sum(axis=1)[run_start]
+    return sums, count[run_start]
+
+
+class StyleFamily(WindowFamily):
+    """Windowed ratios of ``style_features``."""
+
+    def __init__(self, window: int = 5, home_goals: str = 'goals_home_count',
+                 away_goals: str = 'goals_away_count') -> None:
+        self.window = window
+        self.stats = dict({'goals': (home_goals, away_goals)}, **sided('shots', 'xG', 'bigch'))
+        self.columns = [f'{side}_{name}' for side in SIDES for name in STYLE_FEATURES]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        long = history.long
+        sums, _ = trailing_sum(history, {s: long[f'{s}_for'].to_numpy() for s in ('shots', 'xG', 'bigch', 'goals')},
+                               self.window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratios = {
+                'shots_per_xG': np.where(sums['xG'] > 0, sums['shots'] / sums['xG'], np.nan),
+                'bigch_conversion': np.where(sums['bigch'] > 0, sums['goals'] / sums['bigch'], np.nan),
+                'shot_efficiency': np.where(sums['shots'] > 0, sums['goals'] / sums['shots'], np.nan),
+            }
+        return _wide(history, ratios, df, STYLE_FEATURES)
+
+
+def style_features(
+    df: pd.DataFrame,
+    window: int = 5,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_/away_shots_per_xG``, ``_bigch_conversion`` (goals per big
+    chance) and ``_shot_efficiency`` (goals per shot) over the team's last
+    ``window`` matches before the round, indexed like ``df``. NaN without
+    history or when the denominator is not positive.
+    """
+    return StyleFamily(window, home_goals, away_goals).frame(df, by)
+
+
+class ExtremeFamily(WindowFamily):
+    """Windowed indicator rates of ``extreme_result_features``."""
+
+    def __init__(self, indicators: Optional[Dict[str, Callable[[pd.DataFrame], np.ndarray]]] = None,
+                 window: int = 10, min_periods: int = 3, home_goals: str = 'goals_home_count',
+                 away_goals: str = 'goals_away_count') -> None:
+        self.indicators = indicators or EXTREME_INDICATORS
+        self.window, self.min_periods = window, min_periods
+        self.stats = dict({'goals': (home_goals, away_goals)}, **sided('shots', 'xG'))
+        self.columns = [f'{side}_{name}' for side in SIDES for name in self.indicators]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        flags = {name: np.asarray(ind(history.long), dtype=float) for name, ind in self.indicators.items()}
+        sums, count = trailing_sum(history, flags, self.window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = {name: np.where(count >= self.min_periods, sums[name] / count, np.nan) for name in self.indicators}
+        return _wide(history, rates, df, self.indicators)
+
+
+def extreme_result_features(
+    df: pd.DataFrame,
+    indicators: Optional[Dict[str, Callable[[pd.DataFrame], np.ndarray]]] = None,
+    window: int = 10,
+    min_periods: int = 3,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_<name>`` / ``away_<name>``: share of the team's last ``window``
+    matches before the round where each indicator held (a NaN stat counts
+    as not holding). NaN until the team has ``min_periods`` matches.
+    Indexed like ``df``; indicators take the team-long table like
+    ``streak_features`` predicates (default ``EXTREME_INDICATORS``).
+    """
+    return ExtremeFamily(indicators, window, min_periods, home_goals, away_goals).frame(df, by)
@@ -0,0 +1,257 @@
+"""
+Opponent-adjusted team strength from a ridge least-squares fit.
+
+Every team-match is one observation of the additive xG model
+
+    xG_for = mu + home_adv * is_home + att[team] - def[opponent]
+
+so a team's ``att`` is the xG it creates above an average side against an
+average defence, and ``def`` the xG it keeps an average attack below its
+norm. The design matrix has four non-zeros per row (intercept, home flag,
+one attack and one defence column), and the fit only needs its normal
+equations, ``p x p`` with ``p = 2 + 2 * teams``. ``TeamStrength`` carries
+``X'X`` / ``X'y`` forward and adds each round's sparse block, so refitting
+before every round costs the same in week 38 as in week 2 instead of
+re-reading the team's past matches per row:
+
+    strength = TeamStrength(team_ids)
+    for rnd, matches in rounds:
+        strength.solve()                     # fit on every earlier round
+        strength.expected_xg(home, away)     # read before kick-off
+        strength.add_round(home_ids, away_ids, home_xg, away_xg)
+
+``ridge`` shrinks attack / defence towards 0 (not the intercept or home
+advantage), which also pins down the otherwise free shift between them.
+``decay`` < 1 down-weights older rounds.
+
+``opponent_table_features`` keeps the table-based opponent quality the
+ratings replaced (mean position / points of the last 5 opponents, share of
+top-6 opponents) as windowed sums on the team-long table.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from history_scan import MatchRounds, RoundFamily, scan_rounds
+from team_long import SIDES, TeamHistory, WindowFamily, to_match_wide, trailing_sum
+
+STRENGTH_FEATURES = ['att_strength', 'def_strength', 'adj_xG']
+
+OPPONENT_TABLE_FEATURES = ['avg_opp_position', 'avg_opp_points', 'tough_schedule_pct']
+
+
+class TeamStrength:
+    """Attack / defence ratings keyed by any hashable team key."""
+
+    def __init__(self, teams: Iterable[Hashable] = (), ridge: float = 5.0, decay: float = 1.0) -> None:
+        self.ridge = float(ridge)
+        self.decay = float(decay)
+        self.index: Dict[Hashable, int] = {}
+        self.teams: List[Hashable] = []
+        self.played = np.zeros(0, dtype=np.int64)
+        self.xtx = np.zeros((2, 2))
+        self.xty = np.zeros(2)
+        # mu, home advantage, attack per team, defence per team
+        self.params = np.zeros(2)
+        for team in teams:
+            self.team_index(team)
+
+    @property
+    def n_params(self) -> int:
+        return 2 + 2 * len(self.teams)
+
+    def team_index(self, team: Hashable) -> int:
+        """Index of ``team``, registering it (rated 0) on first sight."""
+        i = self.index.get(team)
+        if i is None:
+            i = self.index[team] = len(self.teams)
+            self.teams.append(team)
+            self.played = np.append(self.played, 0)
+            self._grow()
+        return i
+
+    def _grow(self) -> None:
+        # parameters are stored [mu, home, att_0..att_n-1, def_0..def_n-1]
+        n_old = (len(self.xty) - 2) // 2
+        n = len(self.teams)
+        keep = np.r_[0, 1, 2:2 + n_old, 2 + n:2 + n + n_old]
+        xtx = np.zeros((self.n_params, self.n_params))
+        xtx[np.ix_(keep, keep)] = self.xtx
+        xty = np.zeros(self.n_params)
+        xty[keep] = self.xty
+        params = np.zeros(self.n_params)
+        params[keep] = self.params
+        self.xtx, self.xty, self.params = xtx, xty, params
+
+    def design(self, home: Sequence[Hashable], away: Sequence[Hashable]) -> sparse.csr_matrix:
+        """Sparse design rows for the matches ``home[k]`` vs ``away[k]``:
+        the home side's attack first, then the away side's."""
+        h = np.array([self.team_index(t) for t in home], dtype=np.int64)
+        a = np.array([self.team_index(t) for t in away], dtype=np.int64)
+        m, n = len(h), len(self.teams)
+        team = np.concatenate([h, a])
+        opp = np.concatenate([a, h])
+        is_home = np.repeat([1.0, 0.0], m)
+        rows = np.repeat(np.arange(2 * m), 4)
+        cols = np.column_stack([np.zeros(2 * m, dtype=np.int64), np.ones(2 * m, dtype=np.int64),
+                                2 + team, 2 + n + opp]).ravel()
+        vals = np.column_stack([np.ones(2 * m), is_home, np.ones(2 * m), -np.ones(2 * m)]).ravel()
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(2 * m, self.n_params))
+
+    def add_round(self, home: Sequence[Hashable], away: Sequence[Hashable],
+                  home_xg: Sequence[float], away_xg: Sequence[float]) -> None:
+        """Add one round of results; NaN xG observations are skipped."""
+        x = self.design(home, away)
+        y = np.concatenate([np.asarray(home_xg, dtype=float), np.asarray(away_xg, dtype=float)])
+        ok = ~np.isnan(y)
+        x, y = x[ok], y[ok]
+        if self.decay != 1.0:
+            self.xtx *= self.decay
+            self.xty *= self.decay
+        self.xtx += (x.T @ x).toarray()
+        self.xty += x.T @ y
+        for t in (home, away):
+            np.add.at(self.played, [self.index[k] for k in t], 1)
+
+    def solve(self) -> np.ndarray:
+        """Refit on everything added so far; returns the parameter vector."""
+        if not self.xtx[0, 0]:
+            self.params = np.zeros(self.n_params)
+            return self.params
+        penalty = np.full(self.n_params, self.ridge)
+        penalty[:2] = 0.0
+        self.params = np.linalg.solve(self.xtx + np.diag(penalty), self.xty)
+        return self.params
+
+    def ratings(self, team: Hashable, min_matches: int = 1) -> np.ndarray:
+        """``[att, def]`` of ``team``; NaN before ``min_matches`` matches."""
+        i = self.index.get(team)
+        if i is None or self.played[i] < min_matches:
+            return np.full(2, np.nan)
+        n = len(self.teams)
+        return self.params[[2 + i, 2 + n + i]]
+
+    def expected_xg(self, home: Hashable, away: Hashable, min_matches: int = 1) -> np.ndarray:
+        """``[home xG, away xG]`` the current fit expects for this fixture."""
+        mu, home_adv = self.params[0], self.params[1]
+        h_att, h_def = self.ratings(home, min_matches)
+        a_att, a_def = self.ratings(away, min_matches)
+        return np.array([mu + home_adv + h_att - a_def, mu + a_att - h_def])
+
+    def table(self) -> pd.DataFrame:
+        """Current ratings, strongest overall (att + def) first."""
+        n = len(self.teams)
+        out = pd.DataFrame({
+            'team': self.teams,
+            'played': self.played,
+            'att_strength': self.params[2:2 + n],
+            'def_strength': self.params[2 + n:2 + 2 * n],
+        })
+        out['net_strength'] = out['att_strength'] + out['def_strength']
+        return out.sort_values('net_strength', ascending=False).reset_index(drop=True)
+
+
+class StrengthFamily(RoundFamily):
+    """``home_/away_<STRENGTH_FEATURES>`` from a ``TeamStrength`` per group."""
+
+    def __init__(self, ridge: float = 5.0, decay: float = 1.0, min_matches: int = 1) -> None:
+        self.ridge, self.decay, self.min_matches = ridge, decay, min_matches
+        self.columns = [f'{side}_{name}' for side in SIDES for name in STRENGTH_FEATURES]
+
+    def start(self, rounds: MatchRounds) -> None:
+        super().start(rounds)
+        self.out = np.full((2, rounds.n, len(STRENGTH_FEATURES)), np.nan)
+        self.hx, self.ax = rounds.values('xG_home'), rounds.values('xG_away')
+
+    def start_group(self, lo: int, hi: int) -> None:
+        # every team of the group is rated from round one
+        self.strength = TeamStrength(self.rounds.teams(lo, hi), ridge=self.ridge, decay=self.decay)
+
+    def round(self, start: int, stop: int) -> None:
+        order, home, away, strength = self.rounds.order, self.rounds.home, self.rounds.away, self.strength
+        strength.solve()
+        for k in range(start, stop):
+            xg = strength.expected_xg(home[k], away[k], self.min_matches)
+            self.out[0, order[k]] = np.r_[strength.ratings(home[k], self.min_matches), xg[0]]
+            self.out[1, order[k]] = np.r_[strength.ratings(away[k], self.min_matches), xg[1]]
+        strength.add_round(home[start:stop], away[start:stop], self.hx[start:stop], self.ax[start:stop])
+
+    def features(self, index: pd.Index) -> pd.DataFrame:
+        cols = {}
+        for s, side in enumerate(SIDES):
+            for j, name in enumerate(STRENGTH_FEATURES):
+                cols[f'{side}_{name}'] = self.out[s, :, j]
+        return pd.DataFrame(cols, index=index)
+
+
+def team_strength_features(
+    df: pd.DataFrame,
+    ridge: float = 5.0,
+    decay: float = 1.0,
+    min_matches: int = 1,
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_/away_att_strength``, ``_def_strength`` and ``_adj_xG`` (the
+    xG the fit expects for that side in this fixture) for every match,
+    indexed like ``df``.
+
+    Matches of round r are rated by a fit on all rounds < r; NaN until a
+    team has ``min_matches`` matches (``adj_xG`` needs both sides). ``by``
+    (e.g. ``['season']``) starts a fresh fit per group.
+    """
+    family = StrengthFamily(ridge, decay, min_matches)
+    scan_rounds(df, [family], by)
+    return family.features(df.index)
+
+
+class OpponentTableFamily(WindowFamily):
+    """Table-based opponent quality of ``opponent_table_features``."""
+
+    def __init__(self, window: int = 5, top: int = 6) -> None:
+        self.window, self.top = window, top
+        self.stats = {
+            'position': ('home_position', 'away_position'),
+            'points': ('home_points_before', 'away_points_before'),
+        }
+        self.columns = [f'{side}_{name}' for side in SIDES for name in OPPONENT_TABLE_FEATURES]
+
+    def features(self, df: pd.DataFrame, history: TeamHistory) -> pd.DataFrame:
+        long = history.long
+        position = long['position_against'].to_numpy()
+        points = long['points_against'].to_numpy()
+        has_position, has_points = ~np.isnan(position), ~np.isnan(points)
+        sums, count = trailing_sum(history, {
+            'position': np.where(has_position, position, 0.0),
+            'n_position': has_position,
+            'points': np.where(has_points, points, 0.0),
+            'n_points': has_points,
+            # as before, a top side only counts when its points are known
+            'tough': has_points & (position <= self.top),
+        }, self.window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            feats = {
+                'avg_opp_position': np.where(sums['n_position'] > 0, sums['position'] / sums['n_position'], np.nan),
+                'avg_opp_points': np.where(sums['n_points'] > 0, sums['points'] / sums['n_points'], np.nan),
+                'tough_schedule_pct': np.where(count > 0, sums['tough'] / count, np.nan),
+            }
+        wide = to_match_wide(long, pd.DataFrame(feats, index=long.index), len(df), index=df.index)
+        return wide[self.columns]
+
+
+def opponent_table_features(
+    df: pd.DataFrame,
+    window: int = 5,
+    top: int = 6,
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_/away_avg_opp_position`` and ``_avg_opp_points`` (the
+    opponents' table position and points before kick-off, averaged over the
+    team's last ``window`` matches before the round, NaN values skipped) and
+    ``_tough_schedule_pct`` (share of those matches against a top-``top``
+    side), indexed like ``df``. Needs ``home_/away_position`` and
+    ``_points_before`` (``standings_features``); NaN without history.
+    """
+    return OpponentTableFamily(window, top).frame(df, by)
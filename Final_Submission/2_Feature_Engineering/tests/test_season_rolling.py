@@ -0,0 +1,101 @@
+"""
+``season_rolling_features(..., carry_over=False)`` against the per-row
+``df.at`` loop that 01_create_features_ALL_SEASONS.py ran before it.
+
+    python -m pytest -q Final_Submission/2_Feature_Engineering/tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from season_rolling import ALL_SEASONS_STATS, season_rolling_features  # noqa: E402
+
+
+def original_rolling(df: pd.DataFrame) -> pd.DataFrame:
+    # the loop of 01_create_features_ALL_SEASONS.py, run per league
+    df = df.copy()
+    rolling_stats = ALL_SEASONS_STATS
+    for stat in rolling_stats:
+        df[f'{stat}_rolling_home'] = np.nan
+        df[f'{stat}_rolling_away'] = np.nan
+
+    for (season, league), season_df in df.groupby(['season', 'league'], sort=True):
+        team_history = {}
+
+        for idx in season_df.index:
+            row = df.loc[idx]
+            home_id = row['homeTeamId']
+            away_id = row['awayTeamId']
+
+            if home_id not in team_history:
+                team_history[home_id] = {stat: [] for stat in rolling_stats}
+            if away_id not in team_history:
+                team_history[away_id] = {stat: [] for stat in rolling_stats}
+
+            for stat in rolling_stats:
+                if len(team_history[home_id][stat]) > 0:
+                    df.at[idx, f'{stat}_rolling_home'] = np.mean(team_history[home_id][stat][-5:])
+                else:
+                    df.at[idx, f'{stat}_rolling_home'] = 0.0
+
+                if len(team_history[away_id][stat]) > 0:
+                    df.at[idx, f'{stat}_rolling_away'] = np.mean(team_history[away_id][stat][-5:])
+                else:
+                    df.at[idx, f'{stat}_rolling_away'] = 0.0
+
+            for base in ('xG', 'shots', 'sot', 'bigch', 'corners'):
+                team_history[home_id][f'{base}_home'].append(row[f'{base}_home'])
+                team_history[home_id][f'{base}_away'].append(row[f'{base}_away'])
+                team_history[away_id][f'{base}_home'].append(row[f'{base}_away'])
+                team_history[away_id][f'{base}_away'].append(row[f'{base}_home'])
+
+    return df[[c for c in df.columns if c.endswith(('_rolling_home', '_rolling_away'))]]
+
+
+def make_seasons(leagues=('PL',), seasons=('2022-23', '2023-24', '2024-25'), n_teams=10, seed=0) -> pd.DataFrame:
+    """Double round-robin seasons per league, sorted by season and round as
+    the script loads them; a few teams swap in and out between seasons."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for li, league in enumerate(leagues):
+        for si, season in enumerate(seasons):
+            teams = 100 * (li + 1) + (np.arange(n_teams) + 2 * si) % (n_teams + 4)
+            half = n_teams // 2
+            for rnd in range(2 * (n_teams - 1)):
+                order = np.concatenate([[0], np.roll(np.arange(1, n_teams), rnd % (n_teams - 1))])
+                for i in range(half):
+                    h, a = order[i], order[-1 - i]
+                    if rnd >= n_teams - 1:
+                        h, a = a, h
+                    rows.append((league, season, rnd, teams[h], teams[a]))
+    df = pd.DataFrame(rows, columns=['league', 'season', 'round', 'homeTeamId', 'awayTeamId'])
+    n = len(df)
+    for side, mu in (('home', 1.5), ('away', 1.2)):
+        df[f'xG_{side}'] = np.round(rng.gamma(3.0, mu / 3.0, n), 2)
+        df[f'shots_{side}'] = rng.poisson(mu * 8, n)
+        df[f'sot_{side}'] = rng.poisson(mu * 3, n)
+        df[f'bigch_{side}'] = rng.poisson(mu * 1.6, n)
+        df[f'corners_{side}'] = rng.poisson(5.0, n)
+    return df.sort_values(['season', 'round'], kind='stable').reset_index(drop=True)
+
+
+@pytest.mark.parametrize('leagues', [('PL',), ('PL', 'ELC')])
+def test_no_carry_over_matches_original_loop(leagues):
+    df = make_seasons(leagues)
+    expected = original_rolling(df)
+    got, carried = season_rolling_features(df, carry_over=False)
+    assert carried == set()
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_exact=True)
+
+
+def test_no_carry_over_with_shuffled_index():
+    df = make_seasons(seed=1)
+    df.index = np.random.default_rng(2).permutation(len(df)) + 1000
+    expected = original_rolling(df)
+    got, _ = season_rolling_features(df, carry_over=False)
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_exact=True)
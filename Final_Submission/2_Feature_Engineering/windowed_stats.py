@@ -0,0 +1,203 @@
+"""
+Per-team windowed statistics with Welford add / remove updates.
+
+Each team keeps a ring buffer of its last ``window`` matches plus a running
+mean and sum of squared deviations per stat. A new match is added and the
+one falling out of the window removed in O(1), so the mean, variance,
+standard deviation and coefficient of variation over the window are always
+ready; min / max are read from the ring buffer (a handful of matches). As
+with ``EWMAState``, the same object serves the offline build
+(``windowed_features``) and a live updater:
+
+    stats = WindowedStats(window=5)
+    stats.add_result(home, away, home_goals, away_goals, home_xg, away_xg)
+    stats.value(team, 'std', min_periods=3)      # one value per stat
+
+Like ``np.std`` over the window, a NaN anywhere in it makes every
+aggregate of that stat NaN until it drops out. ``std`` / ``var`` use
+ddof=0.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from history_scan import MatchRounds, RoundFamily, scan_rounds
+from team_long import result_points
+
+WINDOW_STATS = ('xG', 'goals', 'xGA', 'points')
+AGGREGATES = ('mean', 'var', 'std', 'min', 'max', 'cv')
+
+# feature -> (stat, aggregate); the consistency features of advanced_features.py
+CONSISTENCY_FEATURES: Dict[str, Tuple[str, str]] = {
+    'xG_variance': ('xG', 'std'),
+    'goals_variance': ('goals', 'std'),
+    'xGA_variance': ('xGA', 'std'),
+    'result_consistency': ('points', 'std'),
+}
+
+
+class _Window:
+    __slots__ = ('buf', 'head', 'size', 'count', 'nans', 'mean', 'm2')
+
+    def __init__(self, window: int, k: int) -> None:
+        self.buf: List[List[float]] = [[math.nan] * k for _ in range(window)]
+        self.head = 0   # slot the next match is written to
+        self.size = 0
+        self.count = [0] * k    # non-NaN values in the window
+        self.nans = [0] * k
+        self.mean = [0.0] * k
+        self.m2 = [0.0] * k
+
+
+class WindowedStats:
+    """Rolling mean / variance / min / max per team over its last ``window``
+    matches, for each of ``stats``."""
+
+    def __init__(self, window: int = 5, stats: Sequence[str] = WINDOW_STATS) -> None:
+        self.window = int(window)
+        self.stats = list(stats)
+        self._w: Dict[Hashable, _Window] = {}
+
+    def update(self, team: Hashable, values: Sequence[float]) -> None:
+        """Add one match of ``team``; ``values`` in ``stats`` order."""
+        w = self._w.get(team)
+        if w is None:
+            w = self._w[team] = _Window(self.window, len(self.stats))
+        if w.size == self.window:
+            self._remove(w, w.buf[w.head])
+        else:
+            w.size += 1
+        row = [float(v) for v in values]
+        w.buf[w.head] = row
+        w.head = (w.head + 1) % self.window
+        for j, x in enumerate(row):
+            if math.isnan(x):
+                w.nans[j] += 1
+                continue
+            w.count[j] += 1
+            d = x - w.mean[j]
+            w.mean[j] += d / w.count[j]
+            w.m2[j] += d * (x - w.mean[j])
+
+    @staticmethod
+    def _remove(w: _Window, row: List[float]) -> None:
+        for j, x in enumerate(row):
+            if math.isnan(x):
+                w.nans[j] -= 1
+                continue
+            w.count[j] -= 1
+            if w.count[j] == 0:
+                w.mean[j] = w.m2[j] = 0.0
+                continue
+            d = x - w.mean[j]
+            w.mean[j] -= d / w.count[j]
+            w.m2[j] -= d * (x - w.mean[j])
+
+    def add_result(self, home: Hashable, away: Hashable, home_goals: float, away_goals: float,
+                   home_xg: float = np.nan, away_xg: float = np.nan) -> None:
+        """Update both teams from one result (for the default stats)."""
+        for team, gf, ga, xg, xga in ((home, home_goals, away_goals, home_xg, away_xg),
+                                      (away, away_goals, home_goals, away_xg, home_xg)):
+            self.update(team, [xg, gf, xga, result_points(gf, ga)])
+
+    def played(self, team: Hashable) -> int:
+        """Matches in the team's window."""
+        w = self._w.get(team)
+        return 0 if w is None else w.size
+
+    def value(self, team: Hashable, agg: str = 'std', min_periods: int = 1) -> np.ndarray:
+        """``agg`` of every stat over the window; NaN before ``min_periods``
+        matches or while the window holds a NaN of that stat."""
+        w = self._w.get(team)
+        out = np.full(len(self.stats), np.nan)
+        if w is None or w.size < min_periods:
+            return out
+        for j in range(len(self.stats)):
+            if w.nans[j] or not w.count[j]:
+                continue
+            n = w.count[j]
+            # removals leave round-off in m2 where the window is constant;
+            # sqrt would turn ~1e-16 into ~1e-8, so treat it as exactly 0
+            m2 = w.m2[j] if w.m2[j] > 1e-12 * n * (w.mean[j] * w.mean[j] + 1.0) else 0.0
+            var = m2 / n
+            if agg == 'mean':
+                out[j] = w.mean[j]
+            elif agg == 'var':
+                out[j] = var
+            elif agg == 'std':
+                out[j] = math.sqrt(var)
+            elif agg == 'cv':
+                out[j] = math.sqrt(var) / w.mean[j] if w.mean[j] else np.nan
+            elif agg in ('min', 'max'):
+                vals = [w.buf[(w.head - 1 - i) % self.window][j] for i in range(w.size)]
+                out[j] = min(vals) if agg == 'min' else max(vals)
+            else:
+                raise ValueError(f"unknown aggregate {agg!r}; expected one of {AGGREGATES}")
+        return out
+
+
+class WindowedStatsFamily(RoundFamily):
+    """``home_/away_<feature>`` from a ``WindowedStats`` per group; each
+    feature is a ``(stat, aggregate)`` of ``WINDOW_STATS`` x ``AGGREGATES``."""
+
+    def __init__(self, features: Optional[Dict[str, Tuple[str, str]]] = None, window: int = 5,
+                 min_periods: int = 3, home_goals: str = 'goals_home_count',
+                 away_goals: str = 'goals_away_count') -> None:
+        self.definitions = features or CONSISTENCY_FEATURES
+        for stat, agg in self.definitions.values():
+            if stat not in WINDOW_STATS or agg not in AGGREGATES:
+                raise ValueError(f"unknown feature ({stat!r}, {agg!r})")
+        self.aggs = sorted({agg for _, agg in self.definitions.values()})
+        self.window, self.min_periods = window, min_periods
+        self.home_goals, self.away_goals = home_goals, away_goals
+        self.columns = [f'{side}_{name}' for side in ('home', 'away') for name in self.definitions]
+
+    def start(self, rounds: MatchRounds) -> None:
+        super().start(rounds)
+        self.out = {agg: np.full((2, rounds.n, len(WINDOW_STATS)), np.nan) for agg in self.aggs}
+        self.hg, self.ag = rounds.values(self.home_goals), rounds.values(self.away_goals)
+        self.hx, self.ax = rounds.values('xG_home'), rounds.values('xG_away')
+
+    def start_group(self, lo: int, hi: int) -> None:
+        self.state = WindowedStats(self.window)
+
+    def round(self, start: int, stop: int) -> None:
+        order, home, away, state = self.rounds.order, self.rounds.home, self.rounds.away, self.state
+        for k in range(start, stop):
+            for s, team in enumerate((home[k], away[k])):
+                for agg in self.aggs:
+                    self.out[agg][s, order[k]] = state.value(team, agg, self.min_periods)
+        for k in range(start, stop):
+            state.add_result(home[k], away[k], self.hg[k], self.ag[k], self.hx[k], self.ax[k])
+
+    def features(self, index: pd.Index) -> pd.DataFrame:
+        cols = {}
+        for s, side in enumerate(('home', 'away')):
+            for name, (stat, agg) in self.definitions.items():
+                cols[f'{side}_{name}'] = self.out[agg][s, :, WINDOW_STATS.index(stat)]
+        return pd.DataFrame(cols, index=index)
+
+
+def windowed_features(
+    df: pd.DataFrame,
+    features: Optional[Dict[str, Tuple[str, str]]] = None,
+    window: int = 5,
+    min_periods: int = 3,
+    home_goals: str = 'goals_home_count',
+    away_goals: str = 'goals_away_count',
+    by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """``home_<feature>`` / ``away_<feature>`` for every match, indexed like
+    ``df``; each feature is an ``(stat, aggregate)`` of ``WINDOW_STATS`` x
+    ``AGGREGATES`` over the team's last ``window`` matches before the
+    match's round (default: ``CONSISTENCY_FEATURES``).
+
+    NaN until a team has ``min_periods`` matches. ``by`` (e.g.
+    ``['season']``) starts fresh windows per group.
+    """
+    family = WindowedStatsFamily(features, window, min_periods, home_goals, away_goals)
+    scan_rounds(df, [family], by)
+    return family.features(df.index)
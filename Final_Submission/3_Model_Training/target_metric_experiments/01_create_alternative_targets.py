@@ -14,11 +14,14 @@ Reads from: data/24-25_PL_Data_raw/
 Creates: target_metric_experiments/targets_comparison.csv
 """
 
-import json
 import pandas as pd
 import numpy as np
 import os
-import glob
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'data'))
+from match_store import ensure_store, load_table
+from raw_archive import resolve_raw_source
 
 print("="*80)
 print("CREATING ALTERNATIVE TARGET METRICS")
@@ -55,70 +58,32 @@ print(f"Loaded {len(labels_df)} matches")
 print(f"Columns: {labels_df.columns.tolist()}")
 
 # ============================================================================
-# STEP 2: EXTRACT CARDS DATA FROM JSON
+# STEP 2: LOAD CARDS DATA FROM THE MATCH STORE
 # ============================================================================
-print("\n[2/4] Extracting cards data from raw JSON files...")
-
-data_dir = '../data/24-25_PL_Data_raw'
-cards_data = []
-
-for round_num in range(38):
-    round_dir = os.path.join(data_dir, f'round_{round_num}')
-    
-    if not os.path.exists(round_dir):
-        print(f"  Warning: {round_dir} not found, skipping...")
-        continue
-    
-    json_files = glob.glob(os.path.join(round_dir, '*_matchDetails_*.json'))
-    
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                match_data = json.load(f)
-            
-            match_id = match_data['general']['matchId']
-            
-            # Extract cards from header.events
-            home_yellow = 0
-            home_red = 0
-            away_yellow = 0
-            away_red = 0
-            
-            if 'events' in match_data['header']:
-                # Home team cards
-                if 'homeTeam' in match_data['header']['events']:
-                    for event in match_data['header']['events']['homeTeam']:
-                        if event.get('type') == 'Card':
-                            if event.get('card') == 'Yellow':
-                                home_yellow += 1
-                            elif event.get('card') == 'Red':
-                                home_red += 1
-                
-                # Away team cards
-                if 'awayTeam' in match_data['header']['events']:
-                    for event in match_data['header']['events']['awayTeam']:
-                        if event.get('type') == 'Card':
-                            if event.get('card') == 'Yellow':
-                                away_yellow += 1
-                            elif event.get('card') == 'Red':
-                                away_red += 1
-            
-            cards_data.append({
-                'matchId': match_id,
-                'yellow_cards_home': home_yellow,
-                'yellow_cards_away': away_yellow,
-                'red_cards_home': home_red,
-                'red_cards_away': away_red,
-                'total_cards': home_yellow + away_yellow + home_red + away_red,
-                'total_yellow': home_yellow + away_yellow,
-                'total_red': home_red + away_red
-            })
-            
-        except Exception as e:
-            print(f"  Error processing {json_file}: {e}")
-            continue
-
-cards_df = pd.DataFrame(cards_data)
+print("\n[2/4] Loading cards data from the match store...")
+
+data_dir = resolve_raw_source('../data/24-25_PL_Data_raw')
+store_dir = '../data/24-25_PL_Data_store'
+
+# Card events come from the shared match store instead of re-parsing the JSON
+ensure_store(data_dir, store_dir)
+match_ids = load_table(store_dir, 'matches', columns=['matchId'])
+cards = load_table(store_dir, 'cards')
+
+is_home = cards['teamSide'] == 'home'
+card_counts = pd.DataFrame({
+    'matchId': cards['matchId'],
+    'yellow_cards_home': (is_home & (cards['card'] == 'Yellow')).astype(int),
+    'yellow_cards_away': (~is_home & (cards['card'] == 'Yellow')).astype(int),
+    'red_cards_home': (is_home & (cards['card'] == 'Red')).astype(int),
+    'red_cards_away': (~is_home & (cards['card'] == 'Red')).astype(int),
+}).groupby('matchId', as_index=False).sum()
+
+cards_df = match_ids.merge(card_counts, on='matchId', how='left').fillna(0)
+cards_df['total_yellow'] = cards_df['yellow_cards_home'] + cards_df['yellow_cards_away']
+cards_df['total_red'] = cards_df['red_cards_home'] + cards_df['red_cards_away']
+cards_df['total_cards'] = cards_df['total_yellow'] + cards_df['total_red']
+cards_df['matchId'] = cards_df['matchId'].astype(str)  # labels_df keys matches by string id
 print(f"  Extracted cards for {len(cards_df)} matches")
 print(f"  Average cards per match: {cards_df['total_cards'].mean():.2f}")
 
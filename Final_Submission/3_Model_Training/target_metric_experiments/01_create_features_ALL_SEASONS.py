@@ -1,16 +1,19 @@
 """
 Generate Features for All Seasons (2022/23, 2023/24, 2024/25)
 
-Creates rolling 5-match pre-match features for each team across all seasons.
-Adds season indicator and contextual features.
+Creates rolling 5-match pre-match features for each team across all seasons,
+carrying each team's state over from the previous season (CARRY_OVER,
+CARRY_DECAY). Adds season indicator and contextual features.
 """
 
 import pandas as pd
-import numpy as np
-import json
 import os
-import glob
-from collections import defaultdict
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'data'))
+from datasets import build_partitions, discover_partitions, load_partitions
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '2_Feature_Engineering'))
+from season_rolling import season_rolling_features
 
 print("="*80)
 print("GENERATING FEATURES FOR ALL SEASONS")
@@ -21,92 +24,48 @@ print("="*80)
 # ============================================================================
 print("\n[1/5] Loading data from all seasons...")
 
-seasons = [
-    ('2022-23', '../data/22-23_PL_Data_raw'),
-    ('2023-24', '../data/23-24_PL_Data_raw'),
-    ('2024-25', '../data/24-25_PL_Data_raw')
-]
+# Every <league>/<season> (or legacy 24-25_PL_Data_raw) source under the data
+# root; LEAGUES=PL,ESP selects leagues (default: PL)
+data_root = '../data'
+store_root = '../data/store'
+leagues = os.environ.get('LEAGUES', 'PL').split(',')
+
+partitions = discover_partitions(data_root, leagues=leagues)
+if not partitions:
+    print(f"    Warning: no seasons for {leagues} found under {data_root}")
+
+# Raw JSON is parsed once into one columnar store per league/season partition;
+# partitions are independent, so they are built in parallel
+build_partitions(partitions, store_root, jobs=int(os.environ.get('PARTITION_JOBS', '1')))
 
 all_matches = []
 
-for season_name, data_dir in seasons:
-    print(f"\n  Processing {season_name}...")
-    
-    if not os.path.exists(data_dir):
-        print(f"    Warning: {data_dir} not found, skipping...")
-        continue
+for partition in partitions:
+    print(f"\n  Processing {partition.league} {partition.season}...")
+    season_df = load_partitions(store_root, [partition])
     
-    season_matches = 0
+    season_df = season_df.rename(columns={
+        'goals_home_count': 'goals_home',
+        'goals_away_count': 'goals_away',
+    })
+    season_df = season_df[[
+        'league', 'season', 'round', 'homeTeamName', 'awayTeamName', 'homeTeamId', 'awayTeamId',
+        'goals_home', 'goals_away', 'xG_home', 'xG_away', 'shots_home', 'shots_away',
+        'sot_home', 'sot_away', 'bigch_home', 'bigch_away', 'corners_home', 'corners_away',
+    ]]
+    all_matches.append(season_df)
     
-    for round_num in range(38):
-        round_dir = os.path.join(data_dir, f'round_{round_num}')
-        
-        if not os.path.exists(round_dir):
-            continue
-        
-        json_files = glob.glob(os.path.join(round_dir, '*_matchDetails_*.json'))
-        
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    match_data = json.load(f)
-                
-                general = match_data['general']
-                header = match_data['header']
-                stats_all = match_data['content']['stats']['Periods']['All']['stats']
-                
-                # Helper function
-                def get_stat(stats_list, key):
-                    for category in stats_list:
-                        for stat in category['stats']:
-                            if stat['key'] == key:
-                                return stat['stats']
-                    return [None, None]
-                
-                # Extract stats
-                xg = get_stat(stats_all, 'expected_goals')
-                sot = get_stat(stats_all, 'ShotsOnTarget')
-                bigch = get_stat(stats_all, 'big_chance')
-                corners = get_stat(stats_all, 'corners')
-                shots = get_stat(stats_all, 'total_shots')
-                
-                match = {
-                    'season': season_name,
-                    'round': round_num,
-                    'homeTeamName': general['homeTeam']['name'],
-                    'awayTeamName': general['awayTeam']['name'],
-                    'homeTeamId': general['homeTeam']['id'],
-                    'awayTeamId': general['awayTeam']['id'],
-                    'goals_home': header['teams'][0]['score'],
-                    'goals_away': header['teams'][1]['score'],
-                    'xG_home': float(xg[0]) if xg[0] is not None else 0.0,
-                    'xG_away': float(xg[1]) if xg[1] is not None else 0.0,
-                    'shots_home': int(shots[0]) if shots[0] is not None else 0,
-                    'shots_away': int(shots[1]) if shots[1] is not None else 0,
-                    'sot_home': int(sot[0]) if sot[0] is not None else 0,
-                    'sot_away': int(sot[1]) if sot[1] is not None else 0,
-                    'bigch_home': int(bigch[0]) if bigch[0] is not None else 0,
-                    'bigch_away': int(bigch[1]) if bigch[1] is not None else 0,
-                    'corners_home': int(corners[0]) if corners[0] is not None else 0,
-                    'corners_away': int(corners[1]) if corners[1] is not None else 0,
-                }
-                
-                all_matches.append(match)
-                season_matches += 1
-                
-            except Exception as e:
-                continue
-    
-    print(f"    ✓ Processed {season_matches} matches from {season_name}")
+    print(f"    ✓ Processed {len(season_df)} matches from {partition.league} {partition.season}")
 
-df = pd.DataFrame(all_matches)
-df = df.sort_values(['season', 'round']).reset_index(drop=True)
+df = pd.concat(all_matches, ignore_index=True)
+df = df.sort_values(['league', 'season', 'round'], kind='stable').reset_index(drop=True)
 
 print(f"\n  Total matches: {len(df)}")
+print(f"  Leagues: {df['league'].unique().tolist()}")
 print(f"  Seasons: {df['season'].unique().tolist()}")
 
 # ============================================================================
-# STEP 2: CREATE ROLLING FEATURES (WITHIN EACH SEASON)
+# STEP 2: CREATE ROLLING FEATURES (CARRIED OVER BETWEEN SEASONS)
 # ============================================================================
 print("\n[2/5] Creating rolling 5-match pre-match features...")
 
@@ -115,64 +74,28 @@ rolling_stats = ['xG_home', 'xG_away', 'shots_home', 'shots_away',
                  'sot_home', 'sot_away', 'bigch_home', 'bigch_away', 
                  'corners_home', 'corners_away']
 
-# Initialize feature columns
-for stat in rolling_stats:
-    df[f'{stat}_rolling_home'] = np.nan
-    df[f'{stat}_rolling_away'] = np.nan
-
-# Track team histories PER SEASON
-for season in df['season'].unique():
-    season_df = df[df['season'] == season].copy()
-    team_history = {}
-    
-    for idx in season_df.index:
-        row = df.loc[idx]
-        home_id = row['homeTeamId']
-        away_id = row['awayTeamId']
-        
-        # Initialize team history if needed
-        if home_id not in team_history:
-            team_history[home_id] = {stat: [] for stat in rolling_stats}
-        if away_id not in team_history:
-            team_history[away_id] = {stat: [] for stat in rolling_stats}
-        
-        # Compute rolling averages from PAST matches only
-        for stat in rolling_stats:
-            # Home team's rolling average
-            if len(team_history[home_id][stat]) > 0:
-                df.at[idx, f'{stat}_rolling_home'] = np.mean(team_history[home_id][stat][-5:])
-            else:
-                df.at[idx, f'{stat}_rolling_home'] = 0.0
-            
-            # Away team's rolling average
-            if len(team_history[away_id][stat]) > 0:
-                df.at[idx, f'{stat}_rolling_away'] = np.mean(team_history[away_id][stat][-5:])
-            else:
-                df.at[idx, f'{stat}_rolling_away'] = 0.0
-        
-        # Update team history AFTER computing features
-        team_history[home_id]['xG_home'].append(row['xG_home'])
-        team_history[home_id]['xG_away'].append(row['xG_away'])
-        team_history[home_id]['shots_home'].append(row['shots_home'])
-        team_history[home_id]['shots_away'].append(row['shots_away'])
-        team_history[home_id]['sot_home'].append(row['sot_home'])
-        team_history[home_id]['sot_away'].append(row['sot_away'])
-        team_history[home_id]['bigch_home'].append(row['bigch_home'])
-        team_history[home_id]['bigch_away'].append(row['bigch_away'])
-        team_history[home_id]['corners_home'].append(row['corners_home'])
-        team_history[home_id]['corners_away'].append(row['corners_away'])
-        
-        team_history[away_id]['xG_home'].append(row['xG_away'])
-        team_history[away_id]['xG_away'].append(row['xG_home'])
-        team_history[away_id]['shots_home'].append(row['shots_away'])
-        team_history[away_id]['shots_away'].append(row['shots_home'])
-        team_history[away_id]['sot_home'].append(row['sot_away'])
-        team_history[away_id]['sot_away'].append(row['sot_home'])
-        team_history[away_id]['bigch_home'].append(row['bigch_away'])
-        team_history[away_id]['bigch_away'].append(row['bigch_home'])
-        team_history[away_id]['corners_home'].append(row['corners_away'])
-        team_history[away_id]['corners_away'].append(row['corners_home'])
-
+# A team's history starts each season seeded with its last WINDOW matches of
+# the previous season, shrunk toward the league average by CARRY_DECAY
+# (1 = carry as is, 0 = league average). Promoted teams start from the level
+# of the teams they replace (the relegated sides' last WINDOW matches), plus
+# their deviation in another loaded league (e.g. LEAGUES=PL,ELC) rescaled by
+# the ratio of the two league averages, so a second-tier gap is not carried
+# into the top flight unadjusted. Seeds drop out of
+# the window after WINDOW matches. Seasons with a carried state keep their
+# early rounds; CARRY_OVER=0 restores the per-season reset (first matches 0.0,
+# rounds < MIN_ROUND dropped everywhere).
+WINDOW = 5
+MIN_ROUND = 5
+CARRY_OVER = os.environ.get('CARRY_OVER', '1') != '0'
+CARRY_DECAY = float(os.environ.get('CARRY_DECAY', '0.5'))
+
+# Team histories live in one (team x match x stat) array per league season
+rolling, carried = season_rolling_features(df, rolling_stats, window=WINDOW,
+                                           carry_over=CARRY_OVER, carry_decay=CARRY_DECAY)
+df = df.join(rolling)
+
+if carried:
+    print(f"  Carried team state into {len(carried)} season(s) (decay {CARRY_DECAY})")
 print(f"  Created {len([c for c in df.columns if 'rolling' in c])} rolling features")
 
 # ============================================================================
@@ -192,7 +115,7 @@ df['xG_diff'] = df['xG_home_rolling_home'] - df['xG_away_rolling_away']
 df['shots_diff'] = df['shots_home_rolling_home'] - df['shots_away_rolling_away']
 
 # Season encoding
-season_map = {'2022-23': 0, '2023-24': 1, '2024-25': 2}
+season_map = {season: i for i, season in enumerate(sorted(df['season'].unique()))}
 df['season_encoded'] = df['season'].map(season_map)
 
 print(f"  Total features: {len([c for c in df.columns if 'rolling' in c or 'combined' in c or 'diff' in c])}")
@@ -215,8 +138,9 @@ print(f"  Std: {df['target_simple_xg'].std():.2f}")
 # ============================================================================
 print("\n[5/5] Saving results...")
 
-# Remove early matches with insufficient history
-df_clean = df[df['round'] >= 5].copy()
+# Remove early matches with insufficient history (seasons without a carried state)
+has_prior = pd.MultiIndex.from_frame(df[['league', 'season']]).isin(list(carried))
+df_clean = df[(df['round'] >= MIN_ROUND) | has_prior].copy()
 
 output_path = 'all_seasons_features.csv'
 df_clean.to_csv(output_path, index=False)
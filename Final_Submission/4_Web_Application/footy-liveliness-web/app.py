@@ -11,9 +11,14 @@ import numpy as np
 import pandas as pd
 import json
 import os
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '2_Feature_Engineering'))
+from feature_store import FeatureStore
+from standings import Standings
+
 app = Flask(__name__)
 CORS(app)
 
@@ -31,6 +36,10 @@ with open('feature_names.pkl', 'rb') as f:
 with open('team_stats.pkl', 'rb') as f:
     team_stats = pickle.load(f)
 
+# Team features as of any kick-off (written by train_and_save_model.py);
+# without it every fixture falls back to the latest team_stats
+FEATURE_STORE = FeatureStore.load('feature_store.parquet') if os.path.exists('feature_store.parquet') else None
+
 print(f"✓ Model loaded ({len(feature_names)} features)")
 
 # Load fixtures from scraped data (try all_fixtures.json first, then upcoming_fixtures.json)
@@ -85,13 +94,45 @@ def load_fixtures():
 
 ALL_FIXTURES = load_fixtures()
 
-def create_features_for_match(home_team, away_team):
+# League table fed finished fixtures as they come in; each match is applied once
+STANDINGS = Standings()
+STANDINGS_APPLIED = set()
+
+def update_standings(fixtures):
+    """Add newly finished fixtures (in kick-off order) to STANDINGS"""
+    finished = [
+        f for f in fixtures
+        if f.get('status') == 'finished' and f.get('actualScore')
+        and f.get('matchId', (f['home'], f['away'], f.get('date'))) not in STANDINGS_APPLIED
+    ]
+    for fixture in sorted(finished, key=lambda f: (f.get('date', ''), f.get('time', ''))):
+        STANDINGS.add_result(fixture['home'], fixture['away'],
+                             int(fixture['actualScore']['home']), int(fixture['actualScore']['away']))
+        STANDINGS_APPLIED.add(fixture.get('matchId', (fixture['home'], fixture['away'], fixture.get('date'))))
+    return STANDINGS
+
+update_standings(ALL_FIXTURES)
+
+def fixture_kickoff(fixture):
+    """Kick-off of a scraped fixture as 'YYYY-MM-DD HH:MM' (None if undated)"""
+    date = fixture.get('date')
+    if not date or date == 'TBD':
+        return None
+    time = fixture.get('time')
+    return f"{date} {time}" if time and time != 'TBD' else date
+
+def create_features_for_match(home_team, away_team, kickoff=None):
     """
-    Create feature vector for a match using latest team stats
+    Create feature vector for a match from each team's stats as of kick-off
+    (latest stats if no kick-off is given)
     """
     # Get team stats (use league average if team not found)
     home_stats = team_stats.get(home_team, {})
     away_stats = team_stats.get(away_team, {})
+    if FEATURE_STORE is not None:
+        when = kickoff or datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')
+        home_stats = dict(home_stats, **{f'Home_{k}': v for k, v in FEATURE_STORE.lookup(home_team, when).items() if not np.isnan(v)})
+        away_stats = dict(away_stats, **{f'Away_{k}': v for k, v in FEATURE_STORE.lookup(away_team, when).items() if not np.isnan(v)})
     
     # Create feature vector with defaults
     features = {}
@@ -106,14 +147,21 @@ def create_features_for_match(home_team, away_team):
         elif feat == 'DaysRestDiff':
             features[feat] = 0.0
         elif feat == 'LeagueAvg_xG_perMatch_sofar':
-            features[feat] = 2.8
+            features[feat] = home_stats.get(feat, 2.8)
         elif feat == 'LeagueAvg_Corners_perMatch_sofar':
-            features[feat] = 10.0
+            features[feat] = home_stats.get(feat, 10.0)
         elif feat == 'HomeFlag':
             features[feat] = 1.0
         else:
             features[feat] = 0.0
     
+    # Composites as in create_features.py
+    if 'SoTSum' in features:
+        features['SoTSum'] = features.get('Home_SoT_att_90', 1.5) + features.get('Away_SoT_att_90', 1.5)
+    if 'TempoSum' in features:
+        features['TempoSum'] = (features.get('Home_xG_att_90', 1.5) + features.get('Away_xG_att_90', 1.5)
+                                + features.get('Home_SoT_att_90', 1.5) + features.get('Away_SoT_att_90', 1.5))
+    
     return np.array([features[f] for f in feature_names]).reshape(1, -1)
 
 @app.route('/', methods=['GET'])
@@ -128,6 +176,7 @@ def root():
             "upcoming_fixtures": "/api/upcoming",
             "predict_match": "/api/predict (POST)",
             "model_stats": "/api/stats",
+            "standings": "/api/standings",
             "refresh_fixtures": "/api/refresh-fixtures (POST)"
         },
         "frontend": "https://footy-liveliness.vercel.app",
@@ -149,8 +198,8 @@ def predict():
     if not home_team or not away_team:
         return jsonify({"error": "Missing home or away team"}), 400
     
-    # Create features
-    X = create_features_for_match(home_team, away_team)
+    # Create features (as of the optional 'date' / 'time' of the match)
+    X = create_features_for_match(home_team, away_team, fixture_kickoff(data))
     X_scaled = scaler.transform(X)
     
     # Predict
@@ -172,8 +221,8 @@ def upcoming():
     predictions = []
     
     for fixture in ALL_FIXTURES:
-        # Create features
-        X = create_features_for_match(fixture['home'], fixture['away'])
+        # Create features as of the fixture's kick-off
+        X = create_features_for_match(fixture['home'], fixture['away'], fixture_kickoff(fixture))
         X_scaled = scaler.transform(X)
         
         # Predict
@@ -209,6 +258,13 @@ def upcoming():
     
     return jsonify(predictions)
 
+@app.route('/api/standings', methods=['GET'])
+def standings():
+    """Current league table from finished fixtures"""
+    table = update_standings(load_fixtures()).table()
+    return jsonify(table[['position', 'team', 'played', 'wins', 'draws', 'losses',
+                          'gf', 'ga', 'gd', 'points']].to_dict(orient='records'))
+
 @app.route('/api/refresh-fixtures', methods=['POST'])
 def refresh_fixtures():
     """Manually trigger fixture refresh (useful after running scraper)"""
@@ -244,6 +300,7 @@ if __name__ == '__main__':
     print("  GET  /api/health           - Health check")
     print("  GET  /api/upcoming         - Get ranked upcoming fixtures")
     print("  POST /api/predict          - Predict single match")
+    print("  GET  /api/standings        - Current league table")
     print("  POST /api/refresh-fixtures - Reload fixtures from file")
     print("  GET  /api/stats            - Model statistics")
     print("\n" + "="*80)
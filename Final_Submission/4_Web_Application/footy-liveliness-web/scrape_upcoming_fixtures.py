@@ -14,12 +14,26 @@ import requests
 from datetime import datetime
 from typing import List, Dict, Optional
 
+try:
+    import orjson  # optional: ~2x faster on the 1.6 MB league response
+except ImportError:
+    orjson = None
+
 # Configuration
 LEAGUE_ID = 47  # Premier League
 FOTMOB_BASE_URL = "https://www.fotmob.com"
 OUTPUT_FILE = "../data/current_season/upcoming_fixtures.json"
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127 Safari/537.36"
 
+def parse_json(content: bytes):
+    """Decode a response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
 def fetch_league_overview(league_id: int = LEAGUE_ID) -> Optional[Dict]:
     """
     Fetch league overview data from FotMob API
@@ -38,7 +52,7 @@ def fetch_league_overview(league_id: int = LEAGUE_ID) -> Optional[Dict]:
         print(f"Fetching league data from FotMob...")
         response = requests.get(url, headers=headers, timeout=20)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response.content)
         print(f"✓ Successfully fetched league data")
         return data
     except requests.exceptions.RequestException as e:
@@ -161,7 +175,7 @@ def fetch_fixtures_alternative() -> List[Dict]:
         print(f"Trying alternative fixtures endpoint...")
         response = requests.get(url, headers=headers, timeout=20)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response.content)
         
         fixtures = []
         today = datetime.now().date()
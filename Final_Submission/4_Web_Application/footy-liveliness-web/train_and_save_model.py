@@ -7,10 +7,15 @@ Saves model and scaler for deployment
 
 import pandas as pd
 import numpy as np
+import os
 import pickle
+import sys
 from sklearn.linear_model import ElasticNetCV
 from sklearn.preprocessing import StandardScaler
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '2_Feature_Engineering'))
+from feature_store import FeatureStore
+
 print("="*80)
 print("TRAINING AND SAVING BEST MODEL FOR WEB APP")
 print("="*80)
@@ -75,19 +80,41 @@ with open('scaler.pkl', 'wb') as f:
 with open('feature_names.pkl', 'wb') as f:
     pickle.dump(feature_cols, f)
 
-# Save team statistics for predictions
+# Point-in-time team snapshots (state after every match, keyed by team and
+# kick-off) so the API reads each team's features as of the fixture instead
+# of one frozen row per team
+store = FeatureStore.from_matches(pd.read_csv('../data/tables/all_rounds.csv'), team_key='TeamName')
+store.save('feature_store.parquet')
+
+# Latest values per team in the model's Home_/Away_ naming (fallback for the
+# API when feature_store.parquet is missing): rest days, occupancy,
+# attack-vs-defense and league averages from the team's last training match
+# (either side, under both prefixes), the store's latest snapshot on top
+league_cols = [col for col in feature_cols if col.startswith('LeagueAvg_')]
+sides = []
+for side, team_col in (('Home_', 'homeTeamName'), ('Away_', 'awayTeamName')):
+    cols = [col for col in feature_cols if col.startswith(side)]
+    sides.append(df[[team_col, 'round'] + cols + league_cols]
+                 .rename(columns={team_col: 'team', **{col: col[5:] for col in cols}}))
+latest_match = pd.concat(sides, ignore_index=True).sort_values('round', kind='stable').groupby('team').last()
+
 team_stats = {}
-for team in set(df['homeTeamName'].unique()) | set(df['awayTeamName'].unique()):
-    # Get latest stats for this team
-    home_matches = df[df['homeTeamName'] == team].sort_values('round', ascending=False)
-    away_matches = df[df['awayTeamName'] == team].sort_values('round', ascending=False)
-    
-    if len(home_matches) > 0:
-        latest_home = home_matches.iloc[0]
-        team_stats[team] = {col: latest_home[col] for col in feature_cols if 'Home_' in col or col in ['Home_days_rest', 'LeagueAvg_xG_perMatch_sofar', 'LeagueAvg_Corners_perMatch_sofar']}
-    elif len(away_matches) > 0:
-        latest_away = away_matches.iloc[0]
-        team_stats[team] = {col: latest_away[col] for col in feature_cols if 'Away_' in col}
+for team, row in latest_match.iterrows():
+    team_stats[team] = {col: row[col[5:]] for col in feature_cols
+                        if col[:5] in ('Home_', 'Away_') and col[5:] in row and pd.notna(row[col[5:]])}
+    team_stats[team].update({col: row[col] for col in league_cols if pd.notna(row[col])})
+for team in store.teams:
+    latest = store.latest(team)
+    team_stats.setdefault(team, {}).update({col: latest[col[5:]] for col in feature_cols
+                                            if col[:5] in ('Home_', 'Away_') and col[5:] in latest
+                                            and not np.isnan(latest[col[5:]])})
+
+# Every per-team feature must resolve, or the API silently serves defaults
+team_cols = [col for col in feature_cols if col.startswith(('Home_', 'Away_', 'LeagueAvg_'))]
+missing = {team: [col for col in team_cols if col not in values] for team, values in team_stats.items()}
+missing = {team: cols for team, cols in missing.items() if cols}
+if missing:
+    raise ValueError(f"team_stats.pkl is missing features: {missing}")
 
 with open('team_stats.pkl', 'wb') as f:
     pickle.dump(team_stats, f)
@@ -96,6 +123,7 @@ print("✓ Saved model.pkl")
 print("✓ Saved scaler.pkl")
 print("✓ Saved feature_names.pkl")
 print("✓ Saved team_stats.pkl")
+print(f"✓ Saved feature_store.parquet ({len(store.snapshots)} team snapshots)")
 
 print("\n" + "="*80)
 print("MODEL READY FOR DEPLOYMENT!")
@@ -109,4 +137,5 @@ print("  - model.pkl (trained model)")
 print("  - scaler.pkl (feature scaler)")
 print("  - feature_names.pkl (feature list)")
 print("  - team_stats.pkl (latest team stats)")
+print("  - feature_store.parquet (team features as of every match)")
 print("="*80)
@@ -0,0 +1,286 @@
+"""
+Ingestion micro-benchmarks.
+
+Runs on a real season folder (``--data data/24-25_PL_Data_raw``) or, by
+default, on synthetic matches shaped like FotMob ``matchDetails`` payloads.
+The JSON reader section also times ``data/current_season/raw_api_response.json``
+when present; each (file, reader) pair runs in a fresh subprocess so its peak
+RSS is not hidden by an earlier run.
+
+    python data/bench_ingest.py
+    python data/bench_ingest.py --data data/24-25_PL_Data_raw --n 200
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if "--read-one" in sys.argv:
+    # keep the reader child small so its RSS is mostly the parse itself;
+    # convert_raw_to_csv treats pandas as optional
+    sys.modules["pandas"] = None  # type: ignore
+
+from convert_raw_to_csv import (  # noqa: E402
+    build_stats_index,
+    discover_match_jobs,
+    extract_from_match,
+    MATCH_SUBTREES,
+    find_pair_stat,
+    find_stats_groups,
+    orjson,
+    read_json,
+    read_json_subtrees,
+)
+from raw_archive import read_bytes, repack  # noqa: E402
+
+STAT_GROUPS = [
+    ("top_stats", ["BallPossesion", "expected_goals", "total_shots", "ShotsOnTarget", "big_chance",
+                   "big_chance_missed_title", "accurate_passes", "fouls", "corners"]),
+    ("shots", ["ShotsOffTarget", "blocked_shots", "shots_woodwork", "shots_inside_box",
+               "shots_outside_box"]),
+    ("expected_goals", ["expected_goals_open_play", "expected_goals_set_play",
+                        "expected_goals_non_penalty", "expected_goals_on_target"]),
+    ("passes", ["passes", "own_half_passes", "opposition_half_passes", "long_balls_accurate",
+                "accurate_crosses", "player_throws", "touches_opp_box"]),
+    ("defence", ["tackles_succeeded", "interceptions", "shot_blocks", "clearances", "keeper_saves"]),
+    ("duels", ["duel_won", "ground_duels_won", "aerials_won", "dribbles_succeeded"]),
+    ("discipline", ["yellow_cards", "red_cards"]),
+]
+
+WANTED_KEYS = ["expected_goals", "total_shots", "ShotsOnTarget", "big_chance", "corners", "touches_opp_box"]
+
+
+def make_match(match_id: int, rng: random.Random) -> Dict[str, Any]:
+    """A synthetic match with the same nesting as a FotMob matchDetails file."""
+
+    def period() -> Dict[str, Any]:
+        return {"stats": [
+            {"title": title, "key": title, "stats": [
+                {"title": key, "key": key, "type": "text",
+                 "stats": [str(rng.randint(0, 20)), str(rng.randint(0, 20))]}
+                for key in keys
+            ]}
+            for title, keys in STAT_GROUPS
+        ]}
+
+    def shots(team_id: int) -> List[Dict[str, Any]]:
+        return [
+            {"teamId": team_id, "min": rng.randint(1, 95), "x": rng.random() * 105, "y": rng.random() * 68,
+             "expectedGoals": rng.random() * 0.5, "expectedGoalsOnTarget": rng.random(),
+             "situation": "RegularPlay", "shotType": "RightFoot", "isOnTarget": rng.random() < 0.4,
+             "eventType": "Miss", "period": "FirstHalf", "playerName": f"Player {rng.randint(1, 30)}"}
+            for _ in range(rng.randint(5, 20))
+        ]
+
+    def squad(team_id: int) -> Dict[str, Any]:
+        return {
+            "id": team_id, "name": f"Team {team_id}", "formation": "4-3-3",
+            "starters": [{"id": team_id * 100 + i, "name": f"Starter {i}", "positionId": i,
+                          "shirtNumber": str(i)} for i in range(11)],
+            "subs": [{"id": team_id * 100 + 20 + i, "name": f"Sub {i}", "shirtNumber": str(20 + i)}
+                     for i in range(9)],
+        }
+
+    home_id, away_id = 8455, 9825
+    return {
+        "general": {"matchId": str(match_id), "matchRound": "1", "leagueId": 47, "leagueName": "Premier League",
+                    "homeTeam": {"name": "Home", "id": home_id}, "awayTeam": {"name": "Away", "id": away_id},
+                    "started": True, "finished": True},
+        "header": {"teams": [{"id": home_id, "score": rng.randint(0, 4)}, {"id": away_id, "score": rng.randint(0, 4)}],
+                   "status": {"finished": True}, "events": {}},
+        "content": {
+            "stats": {"Periods": {"All": period(), "FirstHalf": period(), "SecondHalf": period()}},
+            "lineup": {"homeTeam": squad(home_id), "awayTeam": squad(away_id)},
+            "shotmap": {"shots": shots(home_id) + shots(away_id)},
+            # matchFacts / playByPlay make up most of a real payload
+            "matchFacts": {"events": [{"text": "x" * 200} for _ in range(150)]},
+        },
+    }
+
+
+def load_matches(data_dir: str, n: int) -> List[Dict[str, Any]]:
+    if data_dir:
+        return [read_json(p) for _, p in discover_match_jobs(data_dir)[:n]]
+    rng = random.Random(0)
+    return [make_match(4800000 + i, rng) for i in range(n)]
+
+
+def per_match_us(fn: Callable[[Dict[str, Any]], Any], matches: List[Dict[str, Any]], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for m in matches:
+            fn(m)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(matches) * 1e6
+
+
+def linear_lookup(m: Dict[str, Any]) -> List[Any]:
+    groups = find_stats_groups(m)
+    return [find_pair_stat(groups, k) for k in WANTED_KEYS]
+
+
+def indexed_lookup(m: Dict[str, Any]) -> List[Any]:
+    stats_all = build_stats_index(m, periods=["All"]).get("All", {})
+    return [stats_all.get(k, (None, None)) for k in WANTED_KEYS]
+
+
+def linear_all_keys(m: Dict[str, Any]) -> List[Any]:
+    # what exposing every stat would cost with the per-key scan
+    groups = find_stats_groups(m)
+    keys = [it.get("key") for g in groups for it in g.get("stats", [])]
+    return [find_pair_stat(groups, k) for k in keys]
+
+
+def bench_stats_lookup(matches: List[Dict[str, Any]]) -> None:
+    index = build_stats_index(matches[0])
+    print(f"\n[stats lookup] {len(matches)} matches, {len(index.get('All', {}))} stat keys in 'All', "
+          f"{sum(len(v) for v in index.values())} across {len(index)} periods")
+    rows = [
+        (f"before: find_pair_stat x{len(WANTED_KEYS)} keys, All", linear_lookup),
+        (f"after:  index All + {len(WANTED_KEYS)} lookups", indexed_lookup),
+        ("before: find_pair_stat for every All key", linear_all_keys),
+        ("after:  build_stats_index, All", lambda m: build_stats_index(m, periods=["All"])),
+        ("after:  build_stats_index, all periods", build_stats_index),
+        ("extract_from_match", extract_from_match),
+    ]
+    for label, fn in rows:
+        print(f"  {label:<44s} {per_match_us(fn, matches):8.1f} us/match")
+
+
+# the subtrees the fixture scrapers read from a league response
+LEAGUE_SUBTREES = ["details", "fixtures.allMatches"]
+
+
+def _read_stdlib(path: str, prefixes: List[str]) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+JSON_READERS: Dict[str, Callable[[str, List[str]], Any]] = {
+    "json.load": _read_stdlib,
+    "orjson": lambda path, prefixes: read_json(path),
+    "ijson subtrees": read_json_subtrees,
+}
+
+
+def _maxrss_mb() -> float:
+    # VmHWM is per address space; ru_maxrss survives exec on Linux and would
+    # report the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def read_one(reader: str, path: str, prefixes: List[str], repeat: int = 5) -> None:
+    """Child-process side of ``bench_json_readers``: prints one JSON line."""
+    fn = JSON_READERS[reader]
+    rss_before = _maxrss_mb()
+    fn(path, prefixes)
+    rss_after = _maxrss_mb()
+
+    tracemalloc.start()
+    fn(path, prefixes)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path, prefixes)
+        best = min(best, time.perf_counter() - t0)
+    print(json.dumps({"ms": best * 1e3, "rss_before_mb": rss_before, "rss_mb": rss_after,
+                      "py_peak_mb": traced_peak / 2 ** 20}))
+
+
+def bench_json_readers(files: List[Tuple[str, str, List[str]]]) -> None:
+    print("\n[json readers] wall = best of 5; peak RSS = child's max RSS after the first read"
+          "\n               (before it in brackets); py peak = tracemalloc peak of Python allocations")
+    readers = [r for r in JSON_READERS if r != "orjson" or orjson is not None]
+    for label, path, prefixes in files:
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"  {label} ({size_mb:.2f} MB), subtrees: {', '.join(prefixes)}")
+        for reader in readers:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--read-one", reader, path, ",".join(prefixes)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"    {reader:<16s} {r['ms']:8.2f} ms   peak RSS {r['rss_mb']:6.1f} MB ({r['rss_before_mb']:.1f})   "
+                  f"py peak {r['py_peak_mb']:6.1f} MB")
+
+
+def reader_bench_files(data_dir: str, tmp_dir: str) -> List[Tuple[str, str, List[str]]]:
+    files = []
+    if data_dir:
+        jobs = discover_match_jobs(data_dir)
+        if jobs:
+            files.append((os.path.basename(jobs[0][1]), jobs[0][1], MATCH_SUBTREES))
+    else:
+        path = os.path.join(tmp_dir, "synthetic_matchDetails.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_match(4800000, random.Random(0)), f)
+        files.append(("synthetic matchDetails", path, MATCH_SUBTREES))
+    league = os.path.join(os.path.dirname(os.path.abspath(__file__)), "current_season", "raw_api_response.json")
+    if os.path.exists(league):
+        files.append(("current_season/raw_api_response.json", league, LEAGUE_SUBTREES))
+    return files
+
+
+def bench_raw_sources(data_dir: str, tmp_dir: str) -> None:
+    """Read every match file of a season from the folder and from repacked archives."""
+    print(f"\n[raw sources] {data_dir} (warm page cache; run after dropping caches for cold numbers)")
+    sources = [("folder", data_dir)]
+    for ext in ("zip", "tar"):
+        path = os.path.join(tmp_dir, f"season.{ext}")
+        repack(data_dir, path)
+        sources.append((ext, path))
+    for label, src in sources:
+        t0 = time.perf_counter()
+        jobs = discover_match_jobs(src)
+        n_bytes = sum(len(read_bytes(p)) for _, p in jobs)
+        dt = time.perf_counter() - t0
+        files = len(jobs) if label == "folder" else 1
+        print(f"  {label:<8s} {dt * 1e3:8.1f} ms for {len(jobs)} matches ({n_bytes / 2 ** 20:.1f} MB), {files} files on disk")
+
+
+def main() -> None:
+    if len(sys.argv) == 5 and sys.argv[1] == "--read-one":
+        read_one(sys.argv[2], sys.argv[3], sys.argv[4].split(","))
+        return
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--data", default="", help="raw season folder (default: synthetic matches)")
+    ap.add_argument("--n", type=int, default=380, help="number of matches")
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("INGESTION BENCHMARKS")
+    print("=" * 80)
+    matches = load_matches(args.data, args.n)
+    bench_stats_lookup(matches)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_json_readers(reader_bench_files(args.data, tmp_dir))
+        if args.data:
+            bench_raw_sources(args.data, tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
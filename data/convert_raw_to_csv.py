@@ -2,44 +2,135 @@ import os
 import json
 import math
 import csv
-from collections import defaultdict
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import glob
+import io
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 try:
     import pandas as pd  # type: ignore
 except Exception:  # pragma: no cover
     pd = None
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover
+    ijson = None
+
+from manifest import (
+    DIGEST_KEY, MANIFEST_NAME, digest_and_extract, load_manifest, plan_update, save_manifest, stale_match_ids,
+)
+from raw_archive import (
+    is_archive,
+    open_archive,
+    read_bytes,
+    source_exists,
+    source_join,
+    source_relpath,
+    split_member,
+)
+from schemas import Column, coerce_float, coerce_row, get_schema, missing_required
+
 
 def read_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    raw = read_bytes(path)
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN literals or huge ints, which json accepts
+    return json.loads(raw)
+
+
+# the parts of a matchDetails payload the extractors read; matchFacts,
+# playByPlay, h2h etc. make up most of the file and are never used
+MATCH_SUBTREES = ["general", "header", "content.stats", "content.lineup", "content.shotmap"]
+
+
+def _set_path(obj: Dict[str, Any], dotted: str, value: Any) -> None:
+    *parents, leaf = dotted.split(".")
+    for key in parents:
+        obj = obj.setdefault(key, {})
+    obj[leaf] = value
+
+
+def pick_subtrees(doc: Any, prefixes: Iterable[str]) -> Dict[str, Any]:
+    """Copy only the dotted ``prefixes`` of an already parsed document."""
+    out: Dict[str, Any] = {}
+    for dotted in prefixes:
+        node = doc
+        for key in dotted.split("."):
+            if not isinstance(node, dict) or key not in node:
+                break
+            node = node[key]
+        else:
+            _set_path(out, dotted, node)
+    return out
+
+
+def read_json_subtrees(path: str, prefixes: Iterable[str]) -> Dict[str, Any]:
+    """Parse ``path`` incrementally and build only the dotted ``prefixes``.
+
+    Everything else is skipped as a stream of parser events, so peak memory is
+    bounded by the wanted subtrees instead of the whole payload, and parsing
+    stops once every prefix has been seen. Falls back to a full load +
+    ``pick_subtrees`` when ijson is not installed.
+    """
+    wanted = set(prefixes)
+    if ijson is None:
+        return pick_subtrees(read_json(path), wanted)
+
+    out: Dict[str, Any] = {}
+    builder = None
+    current = None
+    f = open(path, "rb") if split_member(path) is None else io.BytesIO(read_bytes(path))
+    with f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == current and event in ("end_map", "end_array"):
+                    _set_path(out, current, builder.value)
+                    wanted.discard(current)
+                    builder = None
+                    if not wanted:
+                        break
+                continue
+            if prefix in wanted:
+                if event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    current = prefix
+                elif event not in ("map_key", "end_map", "end_array"):
+                    _set_path(out, prefix, value)
+                    wanted.discard(prefix)
+                    if not wanted:
+                        break
+    return out
 
 
-def ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
+# "full": whole file (orjson when installed), "stream": only MATCH_SUBTREES
+MATCH_JSON_READERS = ("full", "stream")
 
 
-def coerce_float(v: Any) -> Optional[float]:
-    if v is None:
-        return None
-    if isinstance(v, (int, float)):
-        return float(v)
-    s = str(v).strip()
-    if s == "":
-        return None
-    try:
-        return float(s)
-    except ValueError:
-        for ch in [" ", "(", ")", "%"]:
-            s = s.replace(ch, " ")
-        parts = [p for p in s.split() if p]
-        for p in parts:
-            try:
-                return float(p)
-            except ValueError:
-                continue
-    return None
+def read_match_json(path: str, reader: Optional[str] = None) -> Dict[str, Any]:
+    """Read a matchDetails file with the reader named by ``MATCH_JSON_READER``."""
+    reader = reader or os.environ.get("MATCH_JSON_READER", "full")
+    if reader == "stream":
+        return read_json_subtrees(path, MATCH_SUBTREES)
+    if reader == "full":
+        return read_json(path)
+    raise ValueError(f"unknown MATCH_JSON_READER {reader!r}; expected one of {MATCH_JSON_READERS}")
+
+
+def ensure_dir(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
 
 
 def to_name(x: Any) -> Optional[str]:
@@ -78,6 +169,66 @@ def find_pair_stat(stats_groups: List[Dict[str, Any]], key: str) -> Tuple[Option
     return None, None
 
 
+StatsIndex = Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]]
+
+
+def _period_groups(period: Any) -> List[Dict[str, Any]]:
+    sg = period.get("stats", []) if isinstance(period, dict) else period
+    return sg if isinstance(sg, list) else []
+
+
+def _stat_float(v: Any) -> Optional[float]:
+    # most stat values are plain numeric strings; only fall back to the
+    # tolerant parser for things like "123 (45%)"
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return coerce_float(v)
+
+
+def build_stats_index(match_json: Dict[str, Any], periods: Optional[Iterable[str]] = None) -> StatsIndex:
+    """Walk ``content.stats.Periods`` once and map period -> key -> (home, away).
+
+    Covers every period FotMob provides (All, FirstHalf, SecondHalf) and every
+    stat key in it, or only ``periods`` if given. As with ``find_pair_stat``,
+    the first occurrence of a key within a period wins.
+    """
+    content = match_json.get("content") or {}
+    all_periods = (content.get("stats") or {}).get("Periods") or {}
+    index: StatsIndex = {}
+    if not isinstance(all_periods, dict):
+        return index
+    wanted = set(periods) if periods is not None else None
+    for period_name, period in all_periods.items():
+        if wanted is not None and period_name not in wanted:
+            continue
+        stats: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        for group in _period_groups(period):
+            items = group.get("stats") if isinstance(group, dict) else None
+            if not isinstance(items, list):
+                continue
+            for it in items:
+                if not isinstance(it, dict):
+                    continue
+                key = it.get("key")
+                if key is None or key in stats:
+                    continue
+                vals = it.get("stats", [])
+                if isinstance(vals, list) and len(vals) >= 2:
+                    stats[key] = (_stat_float(vals[0]), _stat_float(vals[1]))
+        index[period_name] = stats
+    return index
+
+
+def stats_index_rows(match_id: Any, index: StatsIndex) -> List[Dict[str, Any]]:
+    """Long-format rows (one per period and stat key) for a stats index."""
+    return [
+        {"matchId": match_id, "period": period, "key": key, "home": hv, "away": av}
+        for period, stats in index.items()
+        for key, (hv, av) in stats.items()
+    ]
+
+
 def extract_index_rows(index_path: str) -> List[Dict[str, Any]]:
     raw = read_json(index_path)
     rows: List[Dict[str, Any]] = []
@@ -97,7 +248,7 @@ def extract_index_rows(index_path: str) -> List[Dict[str, Any]]:
     return rows
 
 
-def extract_from_match(match_json: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+def extract_from_match(match_json: Dict[str, Any], stats_index: Optional[StatsIndex] = None) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
     general = match_json.get("general", {})
     header = match_json.get("header", {})
     match_id = general.get("matchId") or header.get("matchId")
@@ -132,13 +283,15 @@ def extract_from_match(match_json: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict
         "statusScoreStr": (header.get("status") or {}).get("scoreStr"),
     }
 
-    stats_groups = find_stats_groups(match_json)
-    xG_h, xG_a = find_pair_stat(stats_groups, "expected_goals")
-    sh_h, sh_a = find_pair_stat(stats_groups, "total_shots")
-    sot_h, sot_a = find_pair_stat(stats_groups, "ShotsOnTarget")
-    bc_h, bc_a = find_pair_stat(stats_groups, "big_chance")
-    c_h, c_a = find_pair_stat(stats_groups, "corners")
-    tob_h, tob_a = find_pair_stat(stats_groups, "touches_opp_box")
+    if stats_index is None:
+        stats_index = build_stats_index(match_json, periods=["All"])
+    stats_all = stats_index.get("All", {})
+    xG_h, xG_a = stats_all.get("expected_goals", (None, None))
+    sh_h, sh_a = stats_all.get("total_shots", (None, None))
+    sot_h, sot_a = stats_all.get("ShotsOnTarget", (None, None))
+    bc_h, bc_a = stats_all.get("big_chance", (None, None))
+    c_h, c_a = stats_all.get("corners", (None, None))
+    tob_h, tob_a = stats_all.get("touches_opp_box", (None, None))
 
     stats_row: Dict[str, Any] = {
         "matchId": match_id,
@@ -223,142 +376,454 @@ def extract_from_match(match_json: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict
     return match_row, stats_row, goal_rows, lineup_rows
 
 
-def convert(input_dir: str, output_dir: str) -> None:
-    index_path = os.path.join(input_dir, "index.json")
-    if not os.path.exists(index_path):
-        raise FileNotFoundError(f"index.json not found in {input_dir}")
+def resolve_match_path(input_dir: str, json_rel: Optional[str]) -> Optional[str]:
+    if not json_rel:
+        return None
+    if is_archive(input_dir):
+        rel = open_archive(input_dir).resolve(json_rel)
+        return source_join(input_dir, rel) if rel is not None else None
+    fpath = os.path.join(input_dir, json_rel)
+    if not os.path.exists(fpath):
+        fpath = os.path.join(input_dir, os.path.basename(json_rel))
+    if not os.path.exists(fpath):
+        return None
+    return fpath
 
-    ensure_dir(output_dir)
 
-    index_rows = extract_index_rows(index_path)
+def extract_card_rows(match_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per ``header.events`` card, for the ``cards`` store table that
+    01_create_alternative_targets.py reads its card counts from."""
+    general = match_json.get("general", {})
+    match_id = general.get("matchId") or (match_json.get("header") or {}).get("matchId")
+    try:
+        match_id = int(match_id)
+    except Exception:
+        pass
 
-    matches_rows: List[Dict[str, Any]] = []
-    stats_rows: List[Dict[str, Any]] = []
-    goals_rows: List[Dict[str, Any]] = []
-    lineup_rows: List[Dict[str, Any]] = []
+    card_rows: List[Dict[str, Any]] = []
+    ev = (match_json.get("header") or {}).get("events") or {}
+    for side_key, side_flag in [("homeTeam", "home"), ("awayTeam", "away")]:
+        items = ev.get(side_key) or []
+        if not isinstance(items, list):
+            continue
+        for e in items:
+            if not isinstance(e, dict) or e.get("type") != "Card":
+                continue
+            card_rows.append(
+                {
+                    "matchId": match_id,
+                    "teamSide": side_flag,
+                    "time": e.get("time"),
+                    "card": e.get("card"),
+                    "playerId": e.get("playerId"),
+                    "playerName": e.get("fullName") or e.get("nameStr"),
+                }
+            )
+    return card_rows
 
-    for row in index_rows:
-        round_no = row.get("round")
-        json_rel = row.get("jsonPath")
-        if not json_rel:
+
+def extract_shot_rows(match_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per ``content.shotmap.shots`` entry."""
+    general = match_json.get("general", {})
+    header = match_json.get("header") or {}
+    match_id = general.get("matchId") or header.get("matchId")
+    try:
+        match_id = int(match_id)
+    except Exception:
+        pass
+
+    teams = header.get("teams") if isinstance(header.get("teams"), list) else []
+    home_id = (general.get("homeTeam") or {}).get("id") or (teams[0].get("id") if teams else None)
+    away_id = (general.get("awayTeam") or {}).get("id") or (teams[1].get("id") if len(teams) > 1 else None)
+    sides = {str(home_id): "home", str(away_id): "away"}
+
+    shotmap = (match_json.get("content") or {}).get("shotmap") or {}
+    shots = shotmap.get("shots") if isinstance(shotmap, dict) else None
+    shot_rows: List[Dict[str, Any]] = []
+    for sh in shots if isinstance(shots, list) else []:
+        if not isinstance(sh, dict):
             continue
-        fpath = os.path.join(input_dir, json_rel)
-        if not os.path.exists(fpath):
-            fpath = os.path.join(input_dir, os.path.basename(json_rel))
-        if not os.path.exists(fpath):
+        shot_rows.append(
+            {
+                "matchId": match_id,
+                "shotId": sh.get("id"),
+                "teamId": sh.get("teamId"),
+                "teamSide": sides.get(str(sh.get("teamId"))),
+                "playerId": sh.get("playerId"),
+                "playerName": sh.get("playerName"),
+                "minute": sh.get("min"),
+                "minuteAdded": sh.get("minAdded"),
+                "period": sh.get("period"),
+                "x": sh.get("x"),
+                "y": sh.get("y"),
+                "expectedGoals": sh.get("expectedGoals"),
+                "expectedGoalsOnTarget": sh.get("expectedGoalsOnTarget"),
+                "situation": sh.get("situation"),
+                "shotType": sh.get("shotType"),
+                "isOnTarget": sh.get("isOnTarget"),
+                "eventType": sh.get("eventType"),
+            }
+        )
+    return shot_rows
+
+
+def xg_timeline_rows(match_id: Any, shot_rows: List[Dict[str, Any]], full_time: int = 90) -> List[Dict[str, Any]]:
+    """Cumulative xG and shot counts per side at the end of every minute.
+
+    One row per minute from 0 to ``max(full_time, last shot minute)``;
+    stoppage-time shots count towards the minute they are listed under
+    (45 for 45+2).
+    """
+    per_minute: Dict[int, List[float]] = {}
+    last = full_time
+    for r in shot_rows:
+        side = r.get("teamSide")
+        minute = coerce_float(r.get("minute"))
+        if side not in ("home", "away") or minute is None:
             continue
+        m = int(minute)
+        last = max(last, m)
+        acc = per_minute.setdefault(m, [0.0, 0.0, 0, 0])
+        i = 0 if side == "home" else 1
+        acc[i] += coerce_float(r.get("expectedGoals")) or 0.0
+        acc[2 + i] += 1
 
-        m = read_json(fpath)
-        match_row, stats_row, goal_rows, lu_rows = extract_from_match(m)
-        match_row["round"] = round_no
-        stats_row["round"] = round_no
-        for gr in goal_rows:
-            gr["round"] = round_no
-        for lr in lu_rows:
-            lr["round"] = round_no
-
-        matches_rows.append(match_row)
-        stats_rows.append(stats_row)
-        goals_rows.extend(goal_rows)
-        lineup_rows.extend(lu_rows)
-
-    def write_csv(name: str, rows: List[Dict[str, Any]]) -> None:
-        out_path = os.path.join(output_dir, name)
-        if not rows:
-            # still write an empty file with no rows but ensure it exists
-            with open(out_path, "w", newline="", encoding="utf-8") as f:
-                pass
-            return
-        # stable column order
-        cols = list({k for r in rows for k in r.keys()})
-        # prefer common keys first
-        preferred = [
-            "round",
-            "matchId",
-            "homeTeamName",
-            "awayTeamName",
-        ]
-        # only include preferred keys that actually exist in this table
-        ordered = [c for c in preferred if c in cols] + [c for c in cols if c not in preferred]
-        if pd is not None:
-            df = pd.DataFrame(rows)
-            df = df.reindex(columns=ordered)
-            df.to_csv(out_path, index=False)
-        else:
-            with open(out_path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=ordered)
-                w.writeheader()
-                for r in rows:
-                    w.writerow(r)
-
-    write_csv("index.csv", index_rows)
-    write_csv("matches.csv", matches_rows)
-    write_csv("team_stats.csv", stats_rows)
-    write_csv("goals.csv", goals_rows)
-    write_csv("lineup_players.csv", lineup_rows)
-
-    # Build a single consolidated table: one row per match
-    matches_by_id = {r.get("matchId"): r for r in matches_rows}
-    stats_by_id = {r.get("matchId"): r for r in stats_rows}
-
-    goals_by_id = defaultdict(lambda: {
-        "home": {"count": 0, "timeline": []},
-        "away": {"count": 0, "timeline": []},
-    })
-    for g in goals_rows:
-        mid = g.get("matchId")
-        side = g.get("teamSide")
-        if mid is None or side not in ("home", "away"):
+    rows: List[Dict[str, Any]] = []
+    xg_h = xg_a = 0.0
+    n_h = n_a = 0
+    for m in range(last + 1):
+        acc = per_minute.get(m)
+        if acc is not None:
+            xg_h += acc[0]
+            xg_a += acc[1]
+            n_h += acc[2]
+            n_a += acc[3]
+        rows.append(
+            {
+                "matchId": match_id,
+                "minute": m,
+                "xG_home": xg_h,
+                "xG_away": xg_a,
+                "shots_home": n_h,
+                "shots_away": n_a,
+            }
+        )
+    return rows
+
+
+Record = Tuple[Any, ...]
+
+
+def load_and_extract(fpath: str) -> Record:
+    return extract_from_match(read_match_json(fpath))
+
+
+def _extract_batch(batch: List[Tuple[Any, str]], extractor: Callable[[str], Record]) -> List[Tuple[Any, Record]]:
+    # top-level so it can be pickled into worker processes
+    return [(round_no, extractor(fpath)) for round_no, fpath in batch]
+
+
+def iter_match_jobs(input_dir: str, index_rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, str]]:
+    for row in index_rows:
+        fpath = resolve_match_path(input_dir, row.get("jsonPath"))
+        if fpath is not None:
+            yield row.get("round"), fpath
+
+
+def discover_match_jobs(input_dir: str) -> List[Tuple[Any, str]]:
+    """(round, path) jobs for a season folder or season archive.
+
+    Uses ``index.json`` when present, otherwise globs ``round_N`` folders.
+    """
+    index_path = source_join(input_dir, "index.json")
+    if source_exists(index_path):
+        return list(iter_match_jobs(input_dir, extract_index_rows(index_path)))
+
+    jobs: List[Tuple[Any, str]] = []
+    if is_archive(input_dir):
+        for rel in sorted(open_archive(input_dir).names()):
+            head, _, name = rel.partition("/")
+            num = head[len("round_"):]
+            if head.startswith("round_") and num.isdigit() and "_matchDetails_" in name and name.endswith(".json"):
+                jobs.append((int(num), source_join(input_dir, rel)))
+        return sorted(jobs, key=lambda j: j[0])
+
+    rounds = []
+    for name in os.listdir(input_dir):
+        if name.startswith("round_") and name[len("round_"):].isdigit():
+            rounds.append(int(name[len("round_"):]))
+    for rnd in sorted(rounds):
+        round_dir = os.path.join(input_dir, f"round_{rnd}")
+        for fpath in sorted(glob.glob(os.path.join(round_dir, "*_matchDetails_*.json"))):
+            jobs.append((rnd, fpath))
+    return jobs
+
+
+def iter_match_records(
+    jobs: Iterable[Tuple[Any, str]],
+    workers: int = 1,
+    batch_size: int = 16,
+    max_pending: Optional[int] = None,
+    extractor: Callable[[str], Record] = load_and_extract,
+) -> Iterator[Record]:
+    """Yield extracted rows for each (round, path) job, in job order.
+
+    ``extractor`` maps a file path to a tuple of row dicts / lists of row
+    dicts; every row gets the job's ``round`` attached. With workers > 1 the
+    files are parsed in a process pool. Jobs are sent in batches and at most
+    ``max_pending`` batches are in flight at once, so the memory held by the
+    pipeline is bounded regardless of archive size.
+    """
+
+    def tag(round_no: Any, record: Record) -> Record:
+        for part in record:
+            for row in (part if isinstance(part, list) else [part]):
+                row["round"] = round_no
+        return record
+
+    if workers <= 1:
+        for round_no, fpath in jobs:
+            yield tag(round_no, extractor(fpath))
+        return
+
+    if max_pending is None:
+        max_pending = workers * 4
+
+    def batches() -> Iterator[List[Tuple[Any, str]]]:
+        batch: List[Tuple[Any, str]] = []
+        for job in jobs:
+            batch.append(job)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for batch in batches():
+            pending.append(pool.submit(_extract_batch, batch, extractor))
+            while len(pending) >= max_pending:
+                for round_no, record in pending.popleft().result():
+                    yield tag(round_no, record)
+        while pending:
+            for round_no, record in pending.popleft().result():
+                yield tag(round_no, record)
+
+
+class CsvSink:
+    """Append-only CSV writer for one declared table schema.
+
+    Rows are typed with ``coerce_row`` and written in ``columns`` order in
+    batches of ``batch_rows``, so the output is byte-identical for the same
+    input. The header is written even when no rows are.
+    """
+
+    def __init__(self, out_path: str, columns: List[Column], batch_rows: int = 1000) -> None:
+        self.out_path = out_path
+        self.columns = columns
+        self.batch_rows = batch_rows
+        self.table = os.path.basename(out_path)
+        self.rows: List[List[Any]] = []
+        self._f = open(out_path, "w", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+        self._w.writerow([c.name for c in columns])
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.rows.append(coerce_row(row, self.columns, self.table))
+        if len(self.rows) >= self.batch_rows:
+            self.flush()
+
+    def write_many(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for r in rows:
+            self.write(r)
+
+    def flush(self) -> None:
+        if self.rows:
+            self._w.writerows(self.rows)
+            self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+
+
+def consolidate_match(
+    match_row: Dict[str, Any],
+    stats_row: Dict[str, Any],
+    goal_rows: List[Dict[str, Any]],
+    lineup_rows: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Build the one-row-per-match ``all_in_one`` record for a single match."""
+    out = dict(match_row)  # start with match metadata
+    # merge team stats
+    for k, v in stats_row.items():
+        if k == "matchId":
             continue
-        goals_by_id[mid][side]["count"] += 1
-        goals_by_id[mid][side]["timeline"].append((g.get("time"), g.get("playerName")))
+        out[k] = v
 
-    lineup_by_id = defaultdict(lambda: {
-        "home": {"starters": 0, "subs": 0},
-        "away": {"starters": 0, "subs": 0},
-    })
+    # add goals aggregates
+    timeline: Dict[str, List[Tuple[Any, Any]]] = {"home": [], "away": []}
+    for g in goal_rows:
+        side = g.get("teamSide")
+        if side in timeline:
+            timeline[side].append((g.get("time"), g.get("playerName")))
+    h_tl = sorted(timeline["home"], key=lambda x: (x[0] is None, x[0]))
+    a_tl = sorted(timeline["away"], key=lambda x: (x[0] is None, x[0]))
+    out["goals_home_count"] = len(h_tl)
+    out["goals_away_count"] = len(a_tl)
+    out["goals_total_count"] = len(h_tl) + len(a_tl)
+    out["scorers_home"] = ";".join([p for _, p in h_tl if p]) if h_tl else ""
+    out["scorers_away"] = ";".join([p for _, p in a_tl if p]) if a_tl else ""
+
+    # add lineup aggregates
+    counts = {"home": {"starters": 0, "subs": 0}, "away": {"starters": 0, "subs": 0}}
     for lr in lineup_rows:
-        mid = lr.get("matchId")
         side = lr.get("teamSide")
-        if mid is None or side not in ("home", "away"):
+        if side not in counts:
             continue
-        if lr.get("isStarter"):
-            lineup_by_id[mid][side]["starters"] += 1
-        else:
-            lineup_by_id[mid][side]["subs"] += 1
-
-    consolidated_rows: List[Dict[str, Any]] = []
-    for mid, mrow in matches_by_id.items():
-        out = dict(mrow)  # start with match metadata
-        srow = stats_by_id.get(mid, {})
-        # merge team stats
-        for k, v in srow.items():
-            if k == "matchId":
-                continue
-            out[k] = v
+        counts[side]["starters" if lr.get("isStarter") else "subs"] += 1
+    out["starters_home_count"] = counts["home"]["starters"]
+    out["starters_away_count"] = counts["away"]["starters"]
+    out["subs_home_count"] = counts["home"]["subs"]
+    out["subs_away_count"] = counts["away"]["subs"]
+    out["players_home_count"] = counts["home"]["starters"] + counts["home"]["subs"]
+    out["players_away_count"] = counts["away"]["starters"] + counts["away"]["subs"]
+    return out
+
+
+OUTPUT_TABLES = ["matches.csv", "team_stats.csv", "goals.csv", "lineup_players.csv", "all_in_one.csv"]
+
+
+def _records_to_tables(records: Iterable[Record]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    seen_ids = set()
+    for match_row, stats_row, goal_rows, lu_rows in records:
+        yield "matches.csv", [match_row]
+        yield "team_stats.csv", [stats_row]
+        yield "goals.csv", goal_rows
+        yield "lineup_players.csv", lu_rows
+
+        # Build a single consolidated table: one row per match
+        mid = match_row.get("matchId")
+        if mid in seen_ids:
+            continue
+        seen_ids.add(mid)
+        yield "all_in_one.csv", [consolidate_match(match_row, stats_row, goal_rows, lu_rows)]
+
+
+def _round_key(row: Dict[str, Any]) -> Tuple[bool, float]:
+    r = coerce_float(row.get("round"))
+    return r is None, r if r is not None else 0.0
+
+
+def merge_csv(path: str, new_rows: List[Dict[str, Any]], drop_ids: set) -> None:
+    """Rewrite ``path`` without the ``drop_ids`` matches and with ``new_rows`` added.
+
+    Rows are kept in (stable) round order; unchanged rows are copied as-is.
+    """
+    kept: List[Dict[str, Any]] = []
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            drop = {str(i) for i in drop_ids}
+            kept = [r for r in csv.DictReader(f) if r.get("matchId") not in drop]
+    # kept rows are re-typed by the sink, so they are written exactly as before
+    sink = CsvSink(path, get_schema(path))
+    sink.write_many(sorted(kept + new_rows, key=_round_key))
+    sink.close()
+
+
+def write_quarantine(output_dir: str, entries: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Write ``quarantine.csv``: one ``parse_error`` row (the store's
+    quarantine columns) per manifest entry that was skipped, and return them."""
+    rows = [
+        {"matchId": e.get("matchId"), "round": e.get("round"), "source": rel, "check": "parse_error",
+         "detail": e["error"]}
+        for rel, e in sorted(entries.items()) if e.get("error")
+    ]
+    sink = CsvSink(os.path.join(output_dir, "quarantine.csv"), get_schema("quarantine"))
+    sink.write_many(rows)
+    sink.close()
+    return rows
+
+
+def convert(input_dir: str, output_dir: str, workers: int = 1, incremental: bool = False) -> List[Dict[str, Any]]:
+    """Convert a raw season folder or archive into CSV tables.
 
-        # add goals aggregates
-        ginfo = goals_by_id.get(mid, {"home": {"count": 0, "timeline": []}, "away": {"count": 0, "timeline": []}})
-        h_tl = sorted(ginfo["home"]["timeline"], key=lambda x: (x[0] is None, x[0]))
-        a_tl = sorted(ginfo["away"]["timeline"], key=lambda x: (x[0] is None, x[0]))
-        out["goals_home_count"] = ginfo["home"]["count"]
-        out["goals_away_count"] = ginfo["away"]["count"]
-        out["goals_total_count"] = ginfo["home"]["count"] + ginfo["away"]["count"]
-        out["scorers_home"] = ";".join([p for _, p in h_tl if p]) if h_tl else ""
-        out["scorers_away"] = ";".join([p for _, p in a_tl if p]) if a_tl else ""
+    Matches are taken from ``index.json``, or from the ``round_N`` folders
+    when there is none (see ``discover_match_jobs``).
 
-        # add lineup aggregates
-        linfo = lineup_by_id.get(mid, {"home": {"starters": 0, "subs": 0}, "away": {"starters": 0, "subs": 0}})
-        out["starters_home_count"] = linfo["home"]["starters"]
-        out["starters_away_count"] = linfo["away"]["starters"]
-        out["subs_home_count"] = linfo["home"]["subs"]
-        out["subs_away_count"] = linfo["away"]["subs"]
-        out["players_home_count"] = linfo["home"]["starters"] + linfo["home"]["subs"]
-        out["players_away_count"] = linfo["away"]["starters"] + linfo["away"]["subs"]
+    Rows are streamed to disk as each match is extracted, so only one match
+    (per worker) is held in memory at a time. Pass ``workers > 1`` to parse
+    the match files in a process pool; output row order is unchanged.
 
-        consolidated_rows.append(out)
+    With ``incremental`` the manifest in ``output_dir`` is used to re-extract
+    only new or changed match files, and their rows are merged into the
+    existing CSVs (replacing older rows of the same matchId).
 
-    write_csv("all_in_one.csv", consolidated_rows)
+    Match files whose rows lack a key are skipped; they are listed in
+    ``quarantine.csv``, which is also returned.
+    """
+    # seasons with only round_N folders are discovered like the match store
+    # does; their index.csv is header-only
+    index_path = source_join(input_dir, "index.json")
+    has_index = source_exists(index_path)
+    index_rows = extract_index_rows(index_path) if has_index else []
+    jobs = list(iter_match_jobs(input_dir, index_rows)) if has_index else discover_match_jobs(input_dir)
+    if not has_index and not jobs:
+        raise FileNotFoundError(f"no index.json or round_N match files in {input_dir}")
+
+    ensure_dir(output_dir)
+
+    index_sink = CsvSink(os.path.join(output_dir, "index.csv"), get_schema("index"))
+    index_sink.write_many(index_rows)
+    index_sink.close()
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    merge = incremental and all(os.path.exists(os.path.join(output_dir, n)) for n in OUTPUT_TABLES)
+    old_manifest = load_manifest(manifest_path) if merge else {}
+    changed, removed, entries = plan_update(input_dir, jobs, old_manifest)
+
+    def record_ids(records: Iterable[Record]) -> Iterator[Record]:
+        for (_, fpath), record in zip(changed, records):
+            entry = entries[source_relpath(fpath, input_dir)]
+            entry["sha256"] = record[0].pop(DIGEST_KEY)
+            # a null key would fail the CsvSink write and abort the conversion;
+            # skip the match and keep the reason in the manifest instead
+            error = missing_required(zip(OUTPUT_TABLES, record))
+            if error:
+                print(f"Skipping {fpath}: {error}")
+                entry["matchId"] = None
+                entry["error"] = error
+                continue
+            entry.pop("error", None)
+            entry["matchId"] = record[0].get("matchId")
+            yield record
+
+    # files are hashed by the workers that parse them, so each is read once per run
+    extractor = partial(digest_and_extract, load_and_extract)
+    records = record_ids(iter_match_records(changed, workers=workers, extractor=extractor))
+
+    if merge:
+        new_rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in OUTPUT_TABLES}
+        for name, rows in _records_to_tables(records):
+            new_rows[name].extend(rows)
+        if changed or removed:
+            new_ids = {r.get("matchId") for r in new_rows["matches.csv"]}
+            drop_ids = stale_match_ids(input_dir, changed, removed, old_manifest) | new_ids
+            for name in OUTPUT_TABLES:
+                merge_csv(os.path.join(output_dir, name), new_rows[name], drop_ids)
+        save_manifest(manifest_path, entries)
+        return write_quarantine(output_dir, entries)
+
+    sinks = {name: CsvSink(os.path.join(output_dir, name), get_schema(name)) for name in OUTPUT_TABLES}
+    try:
+        for name, rows in _records_to_tables(records):
+            sinks[name].write_many(rows)
+    finally:
+        for sink in sinks.values():
+            sink.close()
+    save_manifest(manifest_path, entries)
+    return write_quarantine(output_dir, entries)
 
 
 def main() -> None:
@@ -368,8 +833,12 @@ def main() -> None:
 
     in_dir = os.environ.get("RAW_PL_DATA_DIR", default_in)
     out_dir = os.environ.get("PL_DATA_CSV_DIR", default_out)
-    convert(in_dir, out_dir)
+    workers = int(os.environ.get("CONVERT_WORKERS", "1"))
+    incremental = os.environ.get("CONVERT_INCREMENTAL", "0") == "1"
+    skipped = convert(in_dir, out_dir, workers=workers, incremental=incremental)
     print(f"CSV written to: {out_dir}")
+    if skipped:
+        print(f"Skipped {len(skipped)} match files (see quarantine.csv)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""
+Multi-league, multi-season discovery and partitioned builds.
+
+``discover_partitions(root)`` scans ``root`` for season sources in either
+layout and returns one ``Partition`` per (league, season):
+
+    <root>/<league>/<season>/round_N/...     any league, any number of rounds
+    <root>/<league>/<season>.zip             (or .tar / .tar.zst, see raw_archive)
+    <root>/24-25_PL_Data_raw[/24-25_PL_Data_raw]/round_N/...
+                                             the original single-league naming;
+                                             league "PL", season "2024-25"
+
+``build_partitions`` builds one match store (or CSV folder) per partition
+under ``<out_root>/league=<league>/season=<season>/``. Partitions share
+nothing, so they can be built in parallel (``jobs``) and rebuilt or loaded on
+their own; ``load_partitions`` concatenates any subset with ``league`` and
+``season`` columns.
+
+    python data/datasets.py data data/store --jobs 4
+    python data/datasets.py data data/csv --csv
+"""
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    import pandas as pd  # type: ignore
+except Exception:  # pragma: no cover
+    pd = None
+
+from convert_raw_to_csv import convert
+from match_store import build_store, load_matches
+from raw_archive import ARCHIVE_SUFFIXES, is_archive
+
+_LEGACY_RE = re.compile(r"^(\d{2})-(\d{2})_(\w+?)_Data_raw$")
+_ROUND_RE = re.compile(r"^round_\d+$")
+
+
+class Partition(NamedTuple):
+    league: str
+    season: str
+    source: str  # season folder or archive
+
+
+def _strip_archive_suffix(name: str) -> str:
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _is_season_dir(path: str) -> bool:
+    if os.path.exists(os.path.join(path, "index.json")):
+        return True
+    return any(_ROUND_RE.match(n) and os.path.isdir(os.path.join(path, n)) for n in os.listdir(path))
+
+
+def _season_source(path: str) -> Optional[str]:
+    """``path`` if it holds a season, or its same-named child (the layout an
+    unzipped ``X.zip`` leaves behind), else None."""
+    if os.path.isfile(path):
+        return path if is_archive(path) else None
+    if not os.path.isdir(path):
+        return None
+    if _is_season_dir(path):
+        return path
+    nested = os.path.join(path, os.path.basename(path))
+    if os.path.isdir(nested) and _is_season_dir(nested):
+        return nested
+    return None
+
+
+def discover_partitions(root: str, leagues: Optional[Iterable[str]] = None) -> List[Partition]:
+    """All (league, season) sources under ``root``, sorted by league then season.
+
+    When a season exists both unpacked and as an archive the folder wins.
+    """
+    wanted = set(leagues) if leagues is not None else None
+    found: Dict[tuple, Partition] = {}
+
+    def add(league: str, season: str, source: Optional[str]) -> None:
+        if source is None or (wanted is not None and league not in wanted):
+            return
+        key = (league, season)
+        if key not in found or (is_archive(found[key].source) and not is_archive(source)):
+            found[key] = Partition(league, season, source)
+
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        m = _LEGACY_RE.match(_strip_archive_suffix(name))
+        if m:
+            add(m.group(3), f"20{m.group(1)}-{m.group(2)}", _season_source(path))
+            continue
+        if not os.path.isdir(path) or _is_season_dir(path):
+            continue
+        for season_name in sorted(os.listdir(path)):
+            add(name, _strip_archive_suffix(season_name), _season_source(os.path.join(path, season_name)))
+
+    return [found[k] for k in sorted(found)]
+
+
+def partition_dir(out_root: str, partition: Partition) -> str:
+    return os.path.join(out_root, f"league={partition.league}", f"season={partition.season}")
+
+
+def _build_one(partition: Partition, out_dir: str, kind: str, workers: int) -> Dict[str, int]:
+    # top-level so it can run in a worker process
+    if kind == "csv":
+        return {"quarantined": len(convert(partition.source, out_dir, workers=workers, incremental=True))}
+    return build_store(partition.source, out_dir, workers=workers, incremental=True)
+
+
+def build_partitions(
+    partitions: List[Partition],
+    out_root: str,
+    kind: str = "store",
+    jobs: int = 1,
+    workers: int = 1,
+) -> Dict[Partition, Dict[str, int]]:
+    """Build (incrementally) every partition's store or CSV folder.
+
+    ``jobs`` partitions are built at once in separate processes; ``workers``
+    is the per-partition file parallelism passed on to the builder.
+    """
+    if kind not in ("store", "csv"):
+        raise ValueError(f"unknown partition output {kind!r}; expected 'store' or 'csv'")
+    if jobs <= 1:
+        return {p: _build_one(p, partition_dir(out_root, p), kind, workers) for p in partitions}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {p: pool.submit(_build_one, p, partition_dir(out_root, p), kind, workers) for p in partitions}
+        return {p: f.result() for p, f in futures.items()}
+
+
+def load_partitions(
+    out_root: str,
+    partitions: List[Partition],
+    loader: Optional[Callable[[str], "pd.DataFrame"]] = None,
+) -> "pd.DataFrame":
+    """Concatenate ``loader(partition_dir)`` (default ``load_matches``) over
+    ``partitions``, with ``league`` and ``season`` as the first columns."""
+    frames = []
+    for p in partitions:
+        df = (loader or load_matches)(partition_dir(out_root, p))
+        df.insert(0, "season", p.season)
+        df.insert(0, "league", p.league)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", help="folder to scan for <league>/<season> sources")
+    ap.add_argument("out_root", help="output root; partitions go to league=<l>/season=<s>/")
+    ap.add_argument("--csv", action="store_true", help="write CSV tables instead of the Parquet match store")
+    ap.add_argument("--league", action="append", help="only these leagues (repeatable)")
+    ap.add_argument("--jobs", type=int, default=1, help="partitions built in parallel")
+    ap.add_argument("--workers", type=int, default=1, help="file-parsing processes per partition")
+    args = ap.parse_args()
+
+    partitions = discover_partitions(args.root, leagues=args.league)
+    print(f"Found {len(partitions)} partitions under {args.root}")
+    for p in partitions:
+        print(f"  {p.league:<12s} {p.season:<10s} {p.source}")
+    build_partitions(partitions, args.out_root, kind="csv" if args.csv else "store", jobs=args.jobs,
+                     workers=args.workers)
+    print(f"Partitions written to: {args.out_root}")
+
+
+if __name__ == "__main__":
+    main()
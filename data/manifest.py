@@ -0,0 +1,114 @@
+"""
+Content-hash manifest for raw match files.
+
+The manifest records (path, size, mtime, sha256, matchId) for every
+``*_matchDetails_*.json`` that has been ingested (paths are relative to the
+season folder, or member names when reading from a ``raw_archive``). ``plan_update`` compares it
+against the files currently on disk so that only new or changed files are
+re-extracted; size + mtime are checked first and the content hash is only
+computed when they differ. Files without an entry are re-extracted anyway,
+so their hash is taken by the worker that parses them
+(``digest_and_extract``) instead of in a serial pass up front.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Tuple
+
+from raw_archive import read_bytes, source_relpath, source_stat, split_member
+
+MANIFEST_NAME = "manifest.json"
+
+# key under which digest_and_extract passes the file hash in a record's first row
+DIGEST_KEY = "_sha256"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    if split_member(path) is not None:
+        return hashlib.sha256(read_bytes(path)).hexdigest()
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def digest_and_extract(extractor: Callable[[str], Tuple[Any, ...]], fpath: str) -> Tuple[Any, ...]:
+    """``extractor(fpath)`` with the file's sha256 under ``DIGEST_KEY`` in the
+    first row; top-level so it can run in the worker that parses the file.
+    The caller pops it into the file's manifest entry."""
+    digest = file_digest(fpath)
+    record = extractor(fpath)
+    record[0][DIGEST_KEY] = digest
+    return record
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def plan_update(
+    input_dir: str,
+    jobs: List[Tuple[Any, str]],
+    manifest: Dict[str, Dict[str, Any]],
+) -> Tuple[List[Tuple[Any, str]], List[str], Dict[str, Dict[str, Any]]]:
+    """Split ``jobs`` into work to redo.
+
+    Returns ``(changed_jobs, removed_paths, entries)`` where ``entries`` is the
+    new manifest: unchanged files keep their old entry (with a refreshed
+    mtime), changed/new files get an entry whose ``matchId`` is still ``None``
+    and must be filled in once the file has been extracted, as must the
+    ``sha256`` of new files (not hashed here; see ``digest_and_extract``).
+    Paths are stored relative to ``input_dir``.
+    """
+    changed: List[Tuple[Any, str]] = []
+    entries: Dict[str, Dict[str, Any]] = {}
+    for round_no, fpath in jobs:
+        rel = source_relpath(fpath, input_dir)
+        size, mtime = source_stat(fpath)
+        old = manifest.get(rel)
+        if old is not None and old.get("size") == size and old.get("mtime") == mtime:
+            entries[rel] = old
+            continue
+        # a new file is extracted whatever its hash
+        digest = file_digest(fpath) if old is not None else None
+        if old is not None and old.get("sha256") == digest and old.get("round") == round_no:
+            entries[rel] = dict(old, size=size, mtime=mtime)
+            continue
+        entries[rel] = {
+            "size": size,
+            "mtime": mtime,
+            "sha256": digest,
+            "round": round_no,
+            "matchId": None,
+        }
+        changed.append((round_no, fpath))
+    removed = [rel for rel in manifest if rel not in entries]
+    return changed, removed, entries
+
+
+def stale_match_ids(
+    input_dir: str,
+    changed_jobs: List[Tuple[Any, str]],
+    removed_paths: List[str],
+    manifest: Dict[str, Dict[str, Any]],
+) -> set:
+    """matchIds whose previously ingested rows must be dropped."""
+    ids = set()
+    rels = [source_relpath(p, input_dir) for _, p in changed_jobs] + list(removed_paths)
+    for rel in rels:
+        old = manifest.get(rel)
+        if old is not None and old.get("matchId") is not None:
+            ids.add(old["matchId"])
+    return ids
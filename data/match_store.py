@@ -0,0 +1,319 @@
+"""
+Columnar match store built from raw FotMob match JSON.
+
+One ingestion pass (``build_store``) parses every ``*_matchDetails_*.json``
+of a season folder once and writes typed Parquet tables keyed by ``matchId``:
+
+    matches.parquet         one row per match (metadata + score)
+    team_stats.parquet      one row per match (home/away team stats)
+    goals.parquet           one row per goal event
+    cards.parquet           one row per card event (card-count targets)
+    lineup_players.parquet  one row per player in the match squad
+    match_stats.parquet     one row per (period, stat key): every stat FotMob
+                            reports, for All / FirstHalf / SecondHalf
+    shots.parquet           one row per shotmap shot (minute, x, y, xG, xGOT, ...)
+    xg_timeline.parquet     one row per (match, minute): cumulative xG and
+                            shots per side
+
+Every build is followed by a validation pass (see ``validation``) that
+writes ``quarantine.parquet`` (matches failing a check, with the reason) and
+``validation.json`` (counts and null rates). Files that cannot be parsed, or
+whose rows lack a key (``matchId`` / ``round``), are quarantined instead of
+aborting the build.
+
+The label / feature scripts read from the store through ``load_matches`` and
+``load_table`` instead of re-globbing and re-parsing the raw JSON.
+
+Requires pyarrow.
+"""
+
+import json
+import os
+import re
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pandas as pd  # type: ignore
+except Exception:  # pragma: no cover
+    pd = None
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover
+    pa = None
+    pc = None
+    pq = None
+
+from convert_raw_to_csv import (
+    build_stats_index,
+    discover_match_jobs,
+    ensure_dir,
+    extract_card_rows,
+    extract_from_match,
+    extract_shot_rows,
+    iter_match_records,
+    read_match_json,
+    stats_index_rows,
+    xg_timeline_rows,
+)
+from manifest import (
+    DIGEST_KEY, MANIFEST_NAME, digest_and_extract, load_manifest, plan_update, save_manifest, stale_match_ids,
+)
+from raw_archive import source_relpath
+from schemas import STAT_COLUMNS, coerce_row, get_schema, missing_required
+from validation import build_quarantine, format_report, validate_tables
+
+
+def _require_pyarrow() -> None:
+    if pa is None or pd is None:
+        raise ImportError("the match store needs pandas and pyarrow (pip install pandas pyarrow)")
+
+
+_ARROW_TYPES = {
+    "int32": "int32",
+    "int64": "int64",
+    "float64": "float64",
+    "bool": "bool_",
+    "string": "string",
+}
+
+
+def arrow_schema(name: str) -> "pa.Schema":
+    """Arrow schema of store table ``name``, from the declared ``schemas``."""
+    return pa.schema([(c.name, getattr(pa, _ARROW_TYPES[c.dtype])()) for c in get_schema(name)])
+
+
+# order of the row groups returned by the store extractor
+TABLES = ["matches", "team_stats", "goals", "cards", "lineup_players", "match_stats", "shots", "xg_timeline"]
+
+
+def rows_to_table(rows: List[Dict[str, Any]], name: str) -> "pa.Table":
+    columns = get_schema(name)
+    values = [coerce_row(r, columns, name) for r in rows]
+    data = {c.name: [v[i] for v in values] for i, c in enumerate(columns)}
+    return pa.Table.from_pydict(data, schema=arrow_schema(name))
+
+
+def load_and_extract_store(fpath: str) -> Tuple[Any, ...]:
+    m = read_match_json(fpath)
+    stats_index = build_stats_index(m)
+    match_row, stats_row, goal_rows, lineup_rows = extract_from_match(m, stats_index)
+    stat_rows = stats_index_rows(match_row["matchId"], stats_index)
+    shot_rows = extract_shot_rows(m)
+    timeline = xg_timeline_rows(match_row["matchId"], shot_rows)
+    return match_row, stats_row, goal_rows, extract_card_rows(m), lineup_rows, stat_rows, shot_rows, timeline
+
+
+_MATCH_ID_RE = re.compile(r"(\d+)_matchDetails_")
+
+
+def _guarded_extract(extractor: Callable[[str], Tuple[Any, ...]], fpath: str) -> Tuple[Any, ...]:
+    # a malformed file becomes an empty record carrying the error, so one bad
+    # file neither aborts the build nor reaches the tables
+    try:
+        return extractor(fpath)
+    except Exception as e:
+        return ({"_error": f"{type(e).__name__}: {e}"},) + tuple([] for _ in TABLES[1:])
+
+
+class _TableWriter:
+    """Buffers rows for one table and flushes them as Parquet row groups."""
+
+    def __init__(self, path: str, name: str, batch_rows: int = 5000) -> None:
+        self.path = path
+        self.name = name
+        self.batch_rows = batch_rows
+        self.rows: List[Dict[str, Any]] = []
+        self._writer = pq.ParquetWriter(path, arrow_schema(name))
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self.rows.extend(rows)
+        if len(self.rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            self._writer.write_table(rows_to_table(self.rows, self.name))
+            self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def _merge_table(final_path: str, new_path: str, drop_ids: set) -> None:
+    """Replace ``drop_ids`` rows of ``final_path`` with the rows in ``new_path``."""
+    old = pq.read_table(final_path, partitioning=None)
+    if drop_ids:
+        keep = pc.invert(pc.is_in(old["matchId"], value_set=pa.array(sorted(drop_ids), pa.int64())))
+        old = old.filter(keep)
+    merged = pa.concat_tables([old, pq.read_table(new_path, partitioning=None).cast(old.schema)])
+    # arrow sorts are stable, so rows keep their order within a round
+    merged = merged.sort_by([("round", "ascending")])
+    pq.write_table(merged, new_path)
+
+
+def build_store(
+    input_dir: str,
+    store_dir: str,
+    workers: int = 1,
+    incremental: bool = False,
+    extractor: Callable[[str], Tuple[Any, ...]] = load_and_extract_store,
+) -> Dict[str, int]:
+    """Parse a raw season folder and write the Parquet tables.
+
+    With ``incremental`` and an existing store, only files that are new or
+    changed according to the store's manifest are parsed; their rows replace
+    any previous rows for the same matchId and rows of deleted files are
+    dropped. Returns the number of rows (re)extracted per table.
+    """
+    _require_pyarrow()
+    ensure_dir(store_dir)
+    jobs = discover_match_jobs(input_dir)
+
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    merge = incremental and store_exists(store_dir)
+    old_manifest = load_manifest(manifest_path) if merge else {}
+    changed, removed, entries = plan_update(input_dir, jobs, old_manifest)
+    counts = {name: 0 for name in TABLES}
+    if merge and not changed and not removed and os.path.exists(os.path.join(store_dir, "validation.json")):
+        save_manifest(manifest_path, entries)
+        return counts
+
+    # write to temp files first so a failed run never leaves a half-built store
+    writers = {
+        name: _TableWriter(os.path.join(store_dir, f"{name}.parquet.tmp"), name)
+        for name in TABLES
+    }
+    new_ids = set()
+    try:
+        guarded = partial(digest_and_extract, partial(_guarded_extract, extractor))
+        records = iter_match_records(changed, workers=workers, extractor=guarded)
+        for (_, fpath), record in zip(changed, records):
+            entry = entries[source_relpath(fpath, input_dir)]
+            entry["sha256"] = record[0].pop(DIGEST_KEY)
+            # a null key would only fail when its row group is flushed
+            error = record[0].get("_error") or missing_required(zip(TABLES, record))
+            if error:
+                m = _MATCH_ID_RE.match(os.path.basename(fpath))
+                entry["matchId"] = int(m.group(1)) if m else None
+                entry["error"] = error
+                continue
+            match_id = record[0].get("matchId")
+            entry["matchId"] = match_id
+            entry.pop("error", None)
+            new_ids.add(match_id)
+            for name, part in zip(TABLES, record):
+                rows = part if isinstance(part, list) else [part]
+                writers[name].write(rows)
+                counts[name] += len(rows)
+    finally:
+        for w in writers.values():
+            w.close()
+
+    if merge:
+        drop_ids = stale_match_ids(input_dir, changed, removed, old_manifest) | new_ids
+        drop_ids = {i for i in drop_ids if isinstance(i, int)}
+        for name in TABLES:
+            _merge_table(
+                os.path.join(store_dir, f"{name}.parquet"),
+                os.path.join(store_dir, f"{name}.parquet.tmp"),
+                drop_ids,
+            )
+
+    for name in TABLES:
+        os.replace(
+            os.path.join(store_dir, f"{name}.parquet.tmp"),
+            os.path.join(store_dir, f"{name}.parquet"),
+        )
+    save_manifest(manifest_path, entries)
+    counts["quarantined"] = validate_store(store_dir, entries)["quarantined_matches"]
+    return counts
+
+
+def validate_store(store_dir: str, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Run the bulk checks over the store and write the quarantine table + report."""
+    if entries is None:
+        entries = load_manifest(os.path.join(store_dir, MANIFEST_NAME))
+    parse_errors = [
+        {"matchId": e.get("matchId"), "round": e.get("round"), "source": rel, "detail": e["error"]}
+        for rel, e in sorted(entries.items()) if e.get("error")
+    ]
+    matches = load_table(store_dir, "matches")
+    flags, null_rates = validate_tables(
+        matches,
+        load_table(store_dir, "team_stats"),
+        load_table(store_dir, "goals", columns=["matchId", "teamSide"]),
+    )
+    quarantine, report = build_quarantine(flags, parse_errors, len(matches), null_rates)
+
+    rows = quarantine.astype(object).where(quarantine.notna(), None).to_dict("records")
+    pq.write_table(rows_to_table(rows, "quarantine"), os.path.join(store_dir, "quarantine.parquet"))
+    tmp = os.path.join(store_dir, "validation.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    os.replace(tmp, os.path.join(store_dir, "validation.json"))
+    return report
+
+
+def load_validation_report(store_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(store_dir, "validation.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def store_exists(store_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(store_dir, f"{name}.parquet")) for name in TABLES)
+
+
+def ensure_store(input_dir: str, store_dir: str, workers: int = 1) -> str:
+    """Build the store for ``input_dir``, or bring an existing one up to date.
+
+    Only files added or modified since the last run are parsed, so calling
+    this at the start of every script is cheap.
+    """
+    build_store(input_dir, store_dir, workers=workers, incremental=True)
+    return store_dir
+
+
+def validation_summary(store_dir: str) -> str:
+    """Console summary of the store's last validation run."""
+    return format_report(load_validation_report(store_dir))
+
+
+def load_table(store_dir: str, name: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+    _require_pyarrow()
+    if name not in TABLES and name != "quarantine":
+        raise ValueError(f"unknown store table {name!r}; expected one of {TABLES + ['quarantine']}")
+    # partitioning=None: a store under league=X/season=Y/ must not grow those columns
+    path = os.path.join(store_dir, f"{name}.parquet")
+    return pq.read_table(path, columns=columns, partitioning=None).to_pandas()
+
+
+def load_matches(store_dir: str, fill_missing: bool = True, drop_quarantined: bool = True) -> "pd.DataFrame":
+    """One row per match with metadata, score and team stats.
+
+    Column names follow ``tables/all_rounds.csv`` (``goals_home_count``,
+    ``xG_home``, ...). With ``drop_quarantined`` matches that failed
+    validation are left out. With ``fill_missing`` the remaining missing
+    stats (``partial_stats`` warnings) become 0 and the count stats are cast
+    to int, as the label/feature scripts expect.
+    """
+    matches = load_table(store_dir, "matches")
+    stats = load_table(store_dir, "team_stats", columns=["matchId"] + STAT_COLUMNS)
+    if drop_quarantined and os.path.exists(os.path.join(store_dir, "quarantine.parquet")):
+        bad = load_table(store_dir, "quarantine", columns=["matchId"])["matchId"]
+        matches = matches[~matches["matchId"].isin(bad)]
+
+    df = matches.merge(stats, on="matchId", how="left")
+    df = df.rename(columns={"homeScore": "goals_home_count", "awayScore": "goals_away_count"})
+    df = df.sort_values("round", kind="stable").reset_index(drop=True)
+
+    if fill_missing:
+        for col in STAT_COLUMNS:
+            df[col] = df[col].fillna(0.0)
+            if not col.startswith("xG_"):
+                df[col] = df[col].astype(int)
+    return df
@@ -0,0 +1,273 @@
+"""
+Read raw season data straight from a zip / tar / tar.zst archive.
+
+A season folder (``index.json`` + ``round_N/*_matchDetails_*.json``) is
+thousands of small files; packed into one archive it is a single inode and a
+single sequential read on a cold cache. Files inside an archive are addressed
+as ``<archive>::<member>``, e.g.
+
+    data/24-25_PL_Data_raw.zip::round_3/4813040_matchDetails_Team-A-vs-Team-B.json
+
+and ``convert_raw_to_csv`` / ``match_store`` / ``manifest`` accept such paths
+(and an archive path in place of a season folder) wherever they take a file.
+
+    zip       random access through the central directory
+    tar       random access through the member offsets tarfile records
+    tar.zst   needs ``zstandard``; the archive is decompressed once into memory
+              per process (zstd has no random access), then read like a tar
+
+Repack a season folder into one archive:
+
+    python data/raw_archive.py data/24-25_PL_Data_raw/24-25_PL_Data_raw data/24-25_PL_Data_raw.zip
+"""
+
+import io
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover
+    zstandard = None
+
+MEMBER_SEP = "::"
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.zst", ".tzst")
+
+_MATCH_ID_RE = re.compile(r"(\d+)_matchDetails_")
+
+
+def is_archive(path: str) -> bool:
+    return MEMBER_SEP not in path and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_member(path: str) -> Optional[Tuple[str, str]]:
+    """``(archive, member)`` for an ``<archive>::<member>`` path, else None."""
+    if MEMBER_SEP not in path:
+        return None
+    archive, member = path.split(MEMBER_SEP, 1)
+    return archive, member
+
+
+def member_path(archive: str, member: str) -> str:
+    return f"{archive}{MEMBER_SEP}{member}"
+
+
+def _is_zst(path: str) -> bool:
+    return path.lower().endswith((".tar.zst", ".tzst"))
+
+
+class MatchArchive:
+    """One opened season archive.
+
+    Member names are normalised to be relative to the folder holding
+    ``index.json`` (archives made by zipping the season folder itself carry
+    it as a prefix).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if path.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(path)
+            names = [n for n in self._zip.namelist() if not n.endswith("/")]
+        else:
+            if _is_zst(path):
+                if zstandard is None:
+                    raise ImportError(f"reading {path} needs zstandard (pip install zstandard)")
+                with open(path, "rb") as f:
+                    raw = zstandard.ZstdDecompressor().stream_reader(f).read()
+                self._tar = tarfile.open(fileobj=io.BytesIO(raw), mode="r:")
+            else:
+                self._tar = tarfile.open(path, mode="r:")
+            self._members = {m.name: m for m in self._tar.getmembers() if m.isfile()}
+            names = list(self._members)
+
+        index_names = sorted((n for n in names if n.rsplit("/", 1)[-1] == "index.json"), key=lambda n: n.count("/"))
+        self.prefix = index_names[0][: -len("index.json")] if index_names else ""
+        self._by_rel = {n[len(self.prefix):]: n for n in names if n.startswith(self.prefix)}
+        self._by_base: Dict[str, str] = {}
+        self._by_match: Dict[int, str] = {}
+        for rel in self._by_rel:
+            base = rel.rsplit("/", 1)[-1]
+            self._by_base.setdefault(base, rel)
+            m = _MATCH_ID_RE.match(base)
+            if m:
+                self._by_match.setdefault(int(m.group(1)), rel)
+
+    def names(self) -> List[str]:
+        return list(self._by_rel)
+
+    def resolve(self, rel: str) -> Optional[str]:
+        """Member for ``rel``, falling back to a match on the file name alone."""
+        if rel in self._by_rel:
+            return rel
+        return self._by_base.get(rel.rsplit("/", 1)[-1])
+
+    def member_for_match(self, match_id: Any) -> Optional[str]:
+        return self._by_match.get(int(match_id))
+
+    def read_bytes(self, rel: str) -> bytes:
+        name = self._by_rel.get(rel)
+        if name is None:
+            raise FileNotFoundError(member_path(self.path, rel))
+        if self._zip is not None:
+            return self._zip.read(name)
+        f = self._tar.extractfile(self._members[name])
+        return f.read()
+
+    def read_match(self, match_id: Any) -> Any:
+        """Parsed matchDetails JSON for ``match_id``."""
+        rel = self.member_for_match(match_id)
+        if rel is None:
+            raise KeyError(f"matchId {match_id} not in {self.path}")
+        return json.loads(self.read_bytes(rel))
+
+    def stat(self, rel: str) -> Tuple[int, float]:
+        """(size, mtime) of a member, for the manifest."""
+        name = self._by_rel[rel]
+        if self._zip is not None:
+            info = self._zip.getinfo(name)
+            return info.file_size, time.mktime(info.date_time + (0, 0, -1))
+        info = self._members[name]
+        return info.size, float(info.mtime)
+
+
+# one handle per (process, archive): worker processes must not share the
+# parent's file offset
+_OPEN: Dict[Tuple[int, str], MatchArchive] = {}
+
+
+def open_archive(path: str) -> MatchArchive:
+    key = (os.getpid(), os.path.abspath(path))
+    arc = _OPEN.get(key)
+    if arc is None:
+        arc = _OPEN[key] = MatchArchive(path)
+    return arc
+
+
+def read_bytes(path: str) -> bytes:
+    """Contents of a plain file or an ``<archive>::<member>`` path."""
+    parts = split_member(path)
+    if parts is None:
+        with open(path, "rb") as f:
+            return f.read()
+    archive, rel = parts
+    return open_archive(archive).read_bytes(rel)
+
+
+def source_exists(path: str) -> bool:
+    parts = split_member(path)
+    if parts is None:
+        return os.path.exists(path)
+    archive, rel = parts
+    return os.path.exists(archive) and open_archive(archive).resolve(rel) == rel
+
+
+def source_stat(path: str) -> Tuple[int, float]:
+    parts = split_member(path)
+    if parts is None:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    archive, rel = parts
+    return open_archive(archive).stat(rel)
+
+
+def source_join(root: str, rel: str) -> str:
+    """``os.path.join`` that also works when ``root`` is an archive."""
+    if is_archive(root):
+        return member_path(root, rel)
+    return os.path.join(root, rel)
+
+
+def source_relpath(path: str, root: str) -> str:
+    parts = split_member(path)
+    if parts is not None and is_archive(root):
+        return parts[1]
+    return os.path.relpath(path, root)
+
+
+def resolve_raw_source(season_dir: str) -> str:
+    """``season_dir`` if it exists, else a repacked archive next to it.
+
+    Tries ``<season_dir><suffix>`` and ``<parent of season_dir><suffix>`` for
+    every archive suffix, so ``data/24-25_PL_Data_raw.zip`` stands in for
+    ``data/24-25_PL_Data_raw/24-25_PL_Data_raw``.
+    """
+    if os.path.isdir(season_dir):
+        return season_dir
+    stem = season_dir.rstrip("/\\")
+    for base in (stem, os.path.dirname(stem)):
+        for suffix in ARCHIVE_SUFFIXES:
+            if base and os.path.exists(base + suffix):
+                return base + suffix
+    return season_dir
+
+
+def _season_files(season_dir: str) -> List[str]:
+    """Relative paths of a season folder: index.json first, then rounds in order."""
+    rels = []
+    if os.path.exists(os.path.join(season_dir, "index.json")):
+        rels.append("index.json")
+    rounds = sorted(
+        int(n[len("round_"):]) for n in os.listdir(season_dir)
+        if n.startswith("round_") and n[len("round_"):].isdigit()
+    )
+    for rnd in rounds:
+        round_dir = os.path.join(season_dir, f"round_{rnd}")
+        for name in sorted(os.listdir(round_dir)):
+            if name.endswith(".json"):
+                rels.append(f"round_{rnd}/{name}")
+    return rels
+
+
+def repack(season_dir: str, out_path: str, level: int = 6) -> int:
+    """Pack a season folder into one archive; returns the number of files.
+
+    The format follows the suffix of ``out_path`` (.zip, .tar, .tar.zst).
+    Member order is index.json, then round by round, so a sequential read
+    of the archive visits matches in pipeline order.
+    """
+    rels = _season_files(season_dir)
+    tmp = out_path + ".tmp"
+    if out_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+            for rel in rels:
+                zf.write(os.path.join(season_dir, rel), rel)
+    elif out_path.lower().endswith(ARCHIVE_SUFFIXES):
+        if _is_zst(out_path):
+            if zstandard is None:
+                raise ImportError("writing .tar.zst needs zstandard (pip install zstandard)")
+            buf = io.BytesIO()
+            with tarfile.open(fileobj=buf, mode="w:") as tf:
+                for rel in rels:
+                    tf.add(os.path.join(season_dir, rel), rel)
+            with open(tmp, "wb") as f:
+                f.write(zstandard.ZstdCompressor(level=level).compress(buf.getvalue()))
+        else:
+            with tarfile.open(tmp, mode="w:") as tf:
+                for rel in rels:
+                    tf.add(os.path.join(season_dir, rel), rel)
+    else:
+        raise ValueError(f"unsupported archive type for {out_path!r}; expected one of {ARCHIVE_SUFFIXES}")
+    os.replace(tmp, out_path)
+    return len(rels)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+    season_dir, out_path = sys.argv[1], sys.argv[2]
+    n = repack(season_dir, out_path)
+    print(f"Packed {n} files from {season_dir} into {out_path} ({os.path.getsize(out_path) / 2 ** 20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
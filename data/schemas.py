@@ -0,0 +1,302 @@
+"""
+Declared schemas for the tables produced from raw FotMob match JSON.
+
+Every table written by ``convert_raw_to_csv`` (CSV) and ``match_store``
+(Parquet) is described here once, as an ordered list of ``Column``s. The
+writers take column order and types from these lists, so output is
+byte-reproducible across runs, and readers can load a CSV with a fixed
+``dtype=`` map (``csv_dtypes`` / ``read_csv_table``) instead of relying on
+pandas type inference.
+
+dtypes: ``int32``, ``int64``, ``float64``, ``bool``, ``string``.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import pandas as pd  # type: ignore
+except Exception:  # pragma: no cover
+    pd = None
+
+
+class Column(NamedTuple):
+    name: str
+    dtype: str
+    nullable: bool = True
+
+
+DTYPES = ("int32", "int64", "float64", "bool", "string")
+
+_MATCH_KEY = [
+    Column("matchId", "int64", nullable=False),
+    Column("round", "int32", nullable=False),
+]
+
+MATCHES = _MATCH_KEY + [
+    Column("leagueId", "int64"),
+    Column("leagueName", "string"),
+    Column("matchRound", "string"),
+    Column("coverageLevel", "string"),
+    Column("matchTimeUTC", "string"),
+    Column("matchTimeUTCDate", "string"),
+    Column("started", "bool"),
+    Column("finished", "bool"),
+    Column("homeTeamId", "int64"),
+    Column("homeTeamName", "string"),
+    Column("awayTeamId", "int64"),
+    Column("awayTeamName", "string"),
+    Column("homeScore", "int32"),
+    Column("awayScore", "int32"),
+    Column("statusUtcTime", "string"),
+    Column("statusFinished", "bool"),
+    Column("statusScoreStr", "string"),
+]
+
+TEAM_STATS = _MATCH_KEY + [
+    Column("homeTeamName", "string"),
+    Column("awayTeamName", "string"),
+    Column("xG_home", "float64"),
+    Column("xG_away", "float64"),
+    Column("shots_home", "float64"),
+    Column("shots_away", "float64"),
+    Column("sot_home", "float64"),
+    Column("sot_away", "float64"),
+    Column("bigch_home", "float64"),
+    Column("bigch_away", "float64"),
+    Column("corners_home", "float64"),
+    Column("corners_away", "float64"),
+    Column("tob_home", "float64"),
+    Column("tob_away", "float64"),
+]
+
+# the team_stats columns the label / feature scripts use, in tables/all_rounds.csv order
+STAT_COLUMNS = [
+    "xG_home", "xG_away",
+    "sot_home", "sot_away",
+    "bigch_home", "bigch_away",
+    "corners_home", "corners_away",
+    "tob_home", "tob_away",
+    "shots_home", "shots_away",
+]
+
+GOALS = _MATCH_KEY + [
+    Column("teamSide", "string", nullable=False),
+    Column("time", "int32"),
+    Column("type", "string"),
+    Column("playerId", "int64"),
+    Column("playerName", "string"),
+    Column("assistPlayerId", "int64"),
+    Column("assistPlayer", "string"),
+    Column("newScore_home", "int32"),
+    Column("newScore_away", "int32"),
+    Column("x", "float64"),
+    Column("y", "float64"),
+    Column("expectedGoals", "float64"),
+    Column("expectedGoalsOnTarget", "float64"),
+    Column("shotType", "string"),
+    Column("situation", "string"),
+    Column("period", "string"),
+    Column("isFromInsideBox", "bool"),
+]
+
+CARDS = _MATCH_KEY + [
+    Column("teamSide", "string", nullable=False),
+    Column("time", "int32"),
+    Column("card", "string"),
+    Column("playerId", "int64"),
+    Column("playerName", "string"),
+]
+
+LINEUP_PLAYERS = _MATCH_KEY + [
+    Column("teamSide", "string", nullable=False),
+    Column("teamName", "string"),
+    Column("isStarter", "bool", nullable=False),
+    Column("playerId", "int64"),
+    Column("playerName", "string"),
+    Column("positionId", "int32"),
+    Column("shirtNumber", "string"),
+]
+
+MATCH_STATS = _MATCH_KEY + [
+    Column("period", "string", nullable=False),
+    Column("key", "string", nullable=False),
+    Column("home", "float64"),
+    Column("away", "float64"),
+]
+
+SHOTS = _MATCH_KEY + [
+    Column("shotId", "int64"),
+    Column("teamId", "int64"),
+    Column("teamSide", "string"),
+    Column("playerId", "int64"),
+    Column("playerName", "string"),
+    Column("minute", "int32"),
+    Column("minuteAdded", "int32"),
+    Column("period", "string"),
+    Column("x", "float64"),
+    Column("y", "float64"),
+    Column("expectedGoals", "float64"),
+    Column("expectedGoalsOnTarget", "float64"),
+    Column("situation", "string"),
+    Column("shotType", "string"),
+    Column("isOnTarget", "bool"),
+    Column("eventType", "string"),
+]
+
+# cumulative totals at the end of each minute, one row per (match, minute)
+XG_TIMELINE = _MATCH_KEY + [
+    Column("minute", "int32", nullable=False),
+    Column("xG_home", "float64", nullable=False),
+    Column("xG_away", "float64", nullable=False),
+    Column("shots_home", "int32", nullable=False),
+    Column("shots_away", "int32", nullable=False),
+]
+
+QUARANTINE = [
+    Column("matchId", "int64"),
+    Column("round", "int32"),
+    Column("source", "string"),
+    Column("check", "string", nullable=False),
+    Column("detail", "string"),
+]
+
+INDEX = [
+    Column("round", "int32"),
+    Column("matchId", "int64"),
+    Column("home", "string"),
+    Column("away", "string"),
+    Column("matchUrl", "string"),
+    Column("jsonPath", "string"),
+]
+
+# one row per match: metadata, team stats, goal and lineup aggregates
+ALL_IN_ONE = MATCHES + TEAM_STATS[4:] + [
+    Column("goals_home_count", "int32", nullable=False),
+    Column("goals_away_count", "int32", nullable=False),
+    Column("goals_total_count", "int32", nullable=False),
+    Column("scorers_home", "string"),
+    Column("scorers_away", "string"),
+    Column("starters_home_count", "int32", nullable=False),
+    Column("starters_away_count", "int32", nullable=False),
+    Column("subs_home_count", "int32", nullable=False),
+    Column("subs_away_count", "int32", nullable=False),
+    Column("players_home_count", "int32", nullable=False),
+    Column("players_away_count", "int32", nullable=False),
+]
+
+SCHEMAS: Dict[str, List[Column]] = {
+    "index": INDEX,
+    "matches": MATCHES,
+    "team_stats": TEAM_STATS,
+    "goals": GOALS,
+    "cards": CARDS,
+    "lineup_players": LINEUP_PLAYERS,
+    "match_stats": MATCH_STATS,
+    "shots": SHOTS,
+    "xg_timeline": XG_TIMELINE,
+    "quarantine": QUARANTINE,
+    "all_in_one": ALL_IN_ONE,
+}
+
+
+def get_schema(name: str) -> List[Column]:
+    """Columns of table ``name``; ``name`` may carry a ``.csv``/``.parquet`` suffix."""
+    base = name.rsplit("/", 1)[-1].split(".", 1)[0]
+    if base not in SCHEMAS:
+        raise ValueError(f"no schema for table {name!r}; expected one of {sorted(SCHEMAS)}")
+    return SCHEMAS[base]
+
+
+def coerce_float(v: Any) -> Optional[float]:
+    if v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    s = str(v).strip()
+    if s == "":
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        for ch in [" ", "(", ")", "%"]:
+            s = s.replace(ch, " ")
+        parts = [p for p in s.split() if p]
+        for p in parts:
+            try:
+                return float(p)
+            except ValueError:
+                continue
+    return None
+
+
+def coerce_value(value: Any, dtype: str) -> Any:
+    """Convert a raw JSON / CSV value to the Python type for ``dtype``."""
+    if value is None:
+        return None
+    if dtype in ("int32", "int64"):
+        f = coerce_float(value)
+        return int(f) if f is not None and math.isfinite(f) else None
+    if dtype == "float64":
+        return coerce_float(value)
+    if dtype == "bool":
+        if isinstance(value, str):
+            s = value.strip().lower()
+            return None if s == "" else s == "true"
+        return bool(value)
+    if dtype == "string":
+        return value if isinstance(value, str) else str(value)
+    raise ValueError(f"unknown dtype {dtype!r}; expected one of {DTYPES}")
+
+
+def coerce_row(row: Dict[str, Any], columns: List[Column], table: str = "") -> List[Any]:
+    """Values of ``row`` in column order, typed; raises on a null in a non-nullable column."""
+    out = []
+    for col in columns:
+        v = coerce_value(row.get(col.name), col.dtype)
+        if v is None and not col.nullable:
+            raise ValueError(f"{table or 'row'}: column {col.name!r} is not nullable (matchId={row.get('matchId')!r})")
+        out.append(v)
+    return out
+
+
+def missing_required(tables: Iterable[Tuple[str, Any]]) -> Optional[str]:
+    """The error ``coerce_row`` would raise for the first null in a
+    non-nullable column of ``(table, row or rows)`` pairs, or None. Lets a
+    caller reject one record up front instead of failing a whole batch at
+    write time."""
+    for name, part in tables:
+        required = [c for c in get_schema(name) if not c.nullable]
+        for row in (part if isinstance(part, list) else [part]):
+            for col in required:
+                if coerce_value(row.get(col.name), col.dtype) is None:
+                    return (f"ValueError: {name}: column {col.name!r} is not nullable "
+                            f"(matchId={row.get('matchId')!r})")
+    return None
+
+
+_PANDAS_DTYPES = {
+    # (dtype, nullable) -> pandas dtype; nullable ints/bools need the extension types
+    ("int32", False): "int32",
+    ("int32", True): "Int32",
+    ("int64", False): "int64",
+    ("int64", True): "Int64",
+    ("float64", False): "float64",
+    ("float64", True): "float64",
+    ("bool", False): "bool",
+    ("bool", True): "boolean",
+    ("string", False): "string",
+    ("string", True): "string",
+}
+
+
+def csv_dtypes(name: str) -> Dict[str, str]:
+    """``dtype=`` map for ``pd.read_csv`` of table ``name``."""
+    return {c.name: _PANDAS_DTYPES[(c.dtype, c.nullable)] for c in get_schema(name)}
+
+
+def read_csv_table(path: str, name: Optional[str] = None) -> "pd.DataFrame":
+    """Read a CSV written by ``convert_raw_to_csv`` with its declared dtypes."""
+    if pd is None:
+        raise ImportError("read_csv_table needs pandas")
+    return pd.read_csv(path, dtype=csv_dtypes(name or path), keep_default_na=False, na_values=[""])
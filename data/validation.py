@@ -0,0 +1,192 @@
+"""
+Bulk validation of the match store.
+
+``validate_tables`` runs every check as a vectorized mask over the ingested
+tables (no per-row Python); ``build_quarantine`` turns the flags into
+
+    quarantine  one row per (match, failed check) for checks of severity
+                "error"; these matches are dropped by ``load_matches``
+    report      counts per check, null rates per stat column, totals
+
+``match_store.build_store`` runs both after every (incremental) build and
+saves ``quarantine.parquet`` + ``validation.json`` in the store, so the
+label/feature scripts read already-validated rows.
+
+Checks (severity):
+    parse_error           file could not be read / extracted         (error)
+    duplicate_matchId     matchId appears more than once             (error)
+    missing_score         finished match without a score             (error)
+    same_team             home and away team are the same            (error)
+    team_mismatch         team_stats names differ from matches       (error)
+    no_stats              every team stat is missing                 (error)
+    out_of_range          a stat outside its plausible range         (error)
+    sot_gt_shots          shots on target > total shots              (error)
+    goals_score_mismatch  goal events per side differ from score     (warning)
+    partial_stats         some (not all) team stats are missing      (warning)
+"""
+
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+except Exception:  # pragma: no cover
+    np = None
+    pd = None
+
+from schemas import STAT_COLUMNS
+
+# inclusive plausible range per stat (both sides)
+STAT_RANGES: Dict[str, Tuple[float, float]] = {
+    "xG": (0.0, 10.0),
+    "shots": (0, 60),
+    "sot": (0, 40),
+    "bigch": (0, 30),
+    "corners": (0, 30),
+    "tob": (0, 150),
+}
+
+SEVERITY = {
+    "parse_error": "error",
+    "duplicate_matchId": "error",
+    "missing_score": "error",
+    "same_team": "error",
+    "team_mismatch": "error",
+    "no_stats": "error",
+    "out_of_range": "error",
+    "sot_gt_shots": "error",
+    "goals_score_mismatch": "warning",
+    "partial_stats": "warning",
+}
+
+QUARANTINE_COLUMNS = ["matchId", "round", "source", "check", "detail"]
+
+
+def _flag(df: "pd.DataFrame", mask: "pd.Series", check: str, detail: Any) -> "pd.DataFrame":
+    hit = df.loc[mask.fillna(False).to_numpy(dtype=bool)]
+    out = pd.DataFrame({
+        "matchId": hit["matchId"].to_numpy(),
+        "round": hit["round"].to_numpy(),
+        "source": None,
+        "check": check,
+    })
+    out["detail"] = detail.loc[hit.index].to_numpy() if isinstance(detail, pd.Series) else detail
+    return out
+
+
+def validate_tables(
+    matches: "pd.DataFrame",
+    team_stats: "pd.DataFrame",
+    goals: "pd.DataFrame",
+) -> Tuple["pd.DataFrame", Dict[str, Any]]:
+    """Run the table checks; returns ``(flags, null_rates)``.
+
+    ``flags`` has one row per (match, failed check) for both severities.
+    """
+    stats = team_stats.drop(columns=["round"], errors="ignore").rename(
+        columns={"homeTeamName": "statsHomeTeamName", "awayTeamName": "statsAwayTeamName"}
+    )
+    # duplicates are flagged on the raw tables; the join below must stay 1:1
+    dup = matches["matchId"].duplicated(keep=False)
+    df = matches.merge(stats.drop_duplicates("matchId"), on="matchId", how="left")
+
+    flags: List["pd.DataFrame"] = [_flag(matches, dup, "duplicate_matchId", "")]
+
+    finished = df["finished"].fillna(True).astype(bool) | df["statusFinished"].fillna(False).astype(bool)
+    flags.append(_flag(df, finished & (df["homeScore"].isna() | df["awayScore"].isna()), "missing_score", ""))
+
+    same = (df["homeTeamId"] == df["awayTeamId"]) | (df["homeTeamName"] == df["awayTeamName"])
+    flags.append(_flag(df, same, "same_team", df["homeTeamName"].astype(str)))
+
+    has_stats = df["statsHomeTeamName"].notna() | df["statsAwayTeamName"].notna()
+    mismatch = has_stats & (
+        (df["statsHomeTeamName"] != df["homeTeamName"]) | (df["statsAwayTeamName"] != df["awayTeamName"])
+    )
+    flags.append(_flag(
+        df, mismatch, "team_mismatch",
+        df["statsHomeTeamName"].astype(str) + " vs " + df["statsAwayTeamName"].astype(str),
+    ))
+
+    nulls = df[STAT_COLUMNS].isna()
+    n_null = nulls.sum(axis=1)
+    flags.append(_flag(df, n_null == len(STAT_COLUMNS), "no_stats", ""))
+    # bool @ names concatenates the names of the null columns per row
+    missing = nulls.dot(nulls.columns + ",").str.rstrip(",")
+    flags.append(_flag(df, n_null.between(1, len(STAT_COLUMNS) - 1), "partial_stats", missing))
+
+    for prefix, (lo, hi) in STAT_RANGES.items():
+        for side in ("home", "away"):
+            col = f"{prefix}_{side}"
+            v = df[col]
+            bad = v.notna() & ((v < lo) | (v > hi))
+            flags.append(_flag(df, bad, "out_of_range", col + "=" + v.astype(str)))
+
+    for side in ("home", "away"):
+        bad = df[f"sot_{side}"] > df[f"shots_{side}"]
+        flags.append(_flag(
+            df, bad, "sot_gt_shots",
+            f"sot_{side}=" + df[f"sot_{side}"].astype(str) + " shots_" + side + "=" + df[f"shots_{side}"].astype(str),
+        ))
+
+    if len(goals):
+        per_side = goals.groupby(["matchId", "teamSide"]).size().unstack(fill_value=0)
+        for side in ("home", "away"):
+            if side not in per_side:
+                per_side[side] = 0
+        counted = df[["matchId"]].join(per_side[["home", "away"]], on="matchId").fillna(0)
+    else:
+        counted = pd.DataFrame({"home": np.zeros(len(df)), "away": np.zeros(len(df))}, index=df.index)
+    off = df["homeScore"].notna() & (
+        (counted["home"] != df["homeScore"]) | (counted["away"] != df["awayScore"])
+    )
+    flags.append(_flag(
+        df, off, "goals_score_mismatch",
+        "events " + counted["home"].astype(int).astype(str) + "-" + counted["away"].astype(int).astype(str)
+        + ", score " + df["homeScore"].astype(str) + "-" + df["awayScore"].astype(str),
+    ))
+
+    null_rates = {c: round(float(df[c].isna().mean()), 6) if len(df) else 0.0 for c in STAT_COLUMNS}
+    return pd.concat(flags, ignore_index=True), null_rates
+
+
+def build_quarantine(
+    flags: "pd.DataFrame",
+    parse_errors: List[Dict[str, Any]],
+    n_matches: int,
+    null_rates: Dict[str, float],
+) -> Tuple["pd.DataFrame", Dict[str, Any]]:
+    """Quarantine table (errors only) and report from ``validate_tables`` flags.
+
+    ``parse_errors`` are ``{"matchId", "round", "source", "detail"}`` dicts
+    for files the extractor could not handle.
+    """
+    if parse_errors:
+        flags = pd.concat([pd.DataFrame([dict(e, check="parse_error") for e in parse_errors]), flags],
+                          ignore_index=True)
+    flags = flags.reindex(columns=QUARANTINE_COLUMNS)
+    severity = flags["check"].map(SEVERITY)
+
+    quarantine = flags[severity == "error"].reset_index(drop=True)
+    counts = flags.groupby("check").size()
+    report = {
+        "matches": int(n_matches),
+        "quarantined_matches": int(quarantine["matchId"].nunique() + quarantine["matchId"].isna().sum()),
+        "errors": {c: int(counts.get(c, 0)) for c, sev in SEVERITY.items() if sev == "error"},
+        "warnings": {c: int(counts.get(c, 0)) for c, sev in SEVERITY.items() if sev == "warning"},
+        "null_rates": null_rates,
+    }
+    return quarantine, report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """A few lines for the pipeline scripts' console output."""
+    errors = {k: v for k, v in report["errors"].items() if v}
+    warnings = {k: v for k, v in report["warnings"].items() if v}
+    worst = max(report["null_rates"].items(), key=lambda kv: kv[1]) if report["null_rates"] else ("-", 0.0)
+    lines = [
+        f"  Validated {report['matches']} matches: {report['quarantined_matches']} quarantined",
+        f"    errors:   {errors or 'none'}",
+        f"    warnings: {warnings or 'none'}",
+        f"    highest stat null rate: {worst[0]} {worst[1]:.1%}",
+    ]
+    return "\n".join(lines)